@@ -4,25 +4,109 @@ Chat API module for the RAG Assistant.
 This module defines the main chat endpoint that handles user questions,
 manages session state, and interacts with the RAG engine to generate answers.
 """
-from fastapi import APIRouter, Header, HTTPException
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+
+from app.api.ingest import ingestion_jobs
 from app.core import utils
+from app.core.admission import AdmissionController, AdmissionRejected
 from app.core.rag_engine import RAGEngine
+from app.core.tenants import get_tenant_registry, parse_tenants
+from app.logging.profiling import get_request_profiler
+from app.logging.tracing import current_trace
 from app.sessions.manager import SessionManager
-from app.models.requests import ChatRequest
-from app.models.responses import ChatResponse
+from app.models.requests import ChatBatchRequest, ChatRequest
+from app.models.responses import ChatBatchResponse, ChatResponse
 
 router = APIRouter()
 
 rag_engine = RAGEngine()
 session_manager = SessionManager()
+admission = AdmissionController()
+profiler = get_request_profiler()
+
+# Largest number of questions or queries accepted by one batch request
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+
+
+@contextmanager
+def admitted(http_request: Request, session_id: Optional[str], cost: int = 1) -> Iterator[None]:
+    """
+    Runs a request through admission control and the ingestion chat throttle.
+
+    Args:
+        http_request (Request): The incoming request, for the client IP.
+        session_id (str, optional): The client-provided x-session-id, if any.
+        cost (int): Rate limit tokens to take, e.g. the number of batch questions.
+
+    Raises:
+        HTTPException: 429 if the client is rate limited, 503 if the service is
+                       overloaded or an ingestion job is throttling chat.
+    """
+    client_ip = http_request.client.host if http_request.client else None
+    started = time.perf_counter()
+    try:
+        with admission.admit(session_id=session_id, client_ip=client_ip, cost=cost):
+            # Chat shares CPU with the embedder while a background ingestion runs
+            with ingestion_jobs.chat_slot() as slot:
+                if not slot:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Ingestion in progress, please retry shortly",
+                        headers={"Retry-After": str(int(ingestion_jobs.chat_wait_seconds))},
+                    )
+                trace = current_trace()
+                if trace is not None:
+                    trace.add("queue", time.perf_counter() - started)
+                yield
+    except AdmissionRejected as e:
+        detail = "Too many requests" if e.status_code == 429 else "Service overloaded"
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"{detail}, please retry shortly ({e.reason})",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@contextmanager
+def tenant_scope(x_tenant_id: Optional[str]) -> Iterator[Any]:
+    """
+    Opens the collection(s) selected by an X-Tenant-ID header for one request.
+
+    Args:
+        x_tenant_id (str, optional): One tenant ID, several comma-separated for a
+                                     fan-out search, or None for the default collection.
+
+    Yields:
+        VectorDB | FanoutVectorDB: The collection to search.
+
+    Raises:
+        HTTPException: 400 if the header is invalid or fan-out is not allowed.
+    """
+    registry = get_tenant_registry()
+    try:
+        tenants = parse_tenants(x_tenant_id)
+        registry.check(tenants)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with registry.open(tenants, default=rag_engine.vector_db) as vector_db:
+        yield vector_db
 
 
 @router.post("/", response_model=ChatResponse)
 def chat(
     request: ChatRequest,
+    http_request: Request,
+    response: Response,
     x_session_id: str | None = Header(default=None),
     x_new_session: bool = Header(default=False),
+    x_tenant_id: str | None = Header(default=None),
+    x_profile: bool = Header(default=False),
 ):
     """
     Main chat endpoint that processes user questions and returns AI-generated responses.
@@ -31,19 +115,34 @@ def chat(
     1. Validates the input question.
     2. Manages the user session (either reusing an existing one or creating a new one).
     3. Checks if the question is a simple greeting and provides a predefined response if so.
-    4. Delegates the retrieval and generation logic to the RAG engine.
+    4. Delegates the retrieval and generation logic to the RAG engine, behind
+       admission control (rate limits and a concurrency cap) and throttled while
+       a background ingestion job is running.
     5. Returns the generated answer along with session information and source citations.
 
+    The request is timed per stage and recorded if slower than
+    SLOW_QUERY_THRESHOLD_MS; a profiled request (X-Profile, when
+    PROFILING_ENABLED, or sampled) returns its profile ID in X-Profile-Id.
+
     Args:
-        request (ChatRequest): The request body containing the user's question.
+        request (ChatRequest): The request body containing the user's question and
+                               optional metadata filters for retrieval.
+        http_request (Request): The incoming HTTP request, for the client IP.
+        response (Response): The outgoing response, for the X-Profile-Id header.
         x_session_id (str, optional): The session ID provided in the request headers.
         x_new_session (bool, optional): A flag to force the creation of a new session.
+        x_tenant_id (str, optional): The tenant whose knowledge base is searched
+                                     (comma-separated for a fan-out search).
+        x_profile (bool, optional): A flag to run this request under the profiler.
 
     Returns:
         ChatResponse: The response containing the generated answer, session ID, and sources.
 
     Raises:
-        HTTPException: If the question is empty or if an error occurs during processing.
+        HTTPException: If the question is empty or the tenant is invalid (400),
+                       if the client is rate limited (429),
+                       if the service is overloaded or throttled during ingestion (503),
+                       or if an error occurs during processing.
     """
 
     if not request.question.strip():
@@ -57,13 +156,93 @@ def chat(
     if utils.is_greeting(request.question,):
         return {"answer": utils.greeting_response(),"session_id": session_id}
 
-    result = rag_engine.query(
-        question=request.question,
+    with profiler.request(
+        "chat",
+        profile=x_profile,
         session_id=session_id,
-    )
+        tenant=x_tenant_id,
+        question=request.question,
+    ) as trace:
+        with admitted(http_request, x_session_id), tenant_scope(x_tenant_id) as vector_db:
+            result = rag_engine.query(
+                question=request.question,
+                session_id=session_id,
+                vector_db=vector_db,
+                filters=request.filters.model_dump(exclude_none=True) if request.filters else None,
+            )
+
+    if "profile_id" in trace.fields:
+        response.headers["X-Profile-Id"] = trace.fields["profile_id"]
 
     return ChatResponse(
         session_id=session_id,
         answer=result["answer"],
         sources=result["sources"],
-    )   
\ No newline at end of file
+    )
+
+
+@router.post("/batch", response_model=ChatBatchResponse)
+def chat_batch(
+    request: ChatBatchRequest,
+    http_request: Request,
+    x_session_id: str | None = Header(default=None),
+    x_tenant_id: str | None = Header(default=None),
+):
+    """
+    Answers a list of questions in one request.
+
+    All questions are embedded and searched in one batched pass, then the LLM calls
+    run with bounded concurrency (CHAT_BATCH_CONCURRENCY). Each question is logged
+    under its own new session. Greetings are answered without retrieval, and a
+    failing question returns an 'error' without failing the rest of the batch.
+
+    Args:
+        request (ChatBatchRequest): The request body containing the questions.
+        http_request (Request): The incoming HTTP request, for the client IP.
+        x_session_id (str, optional): The caller's session ID, used for rate limiting.
+        x_tenant_id (str, optional): The tenant(s) whose knowledge base is searched.
+
+    Returns:
+        ChatBatchResponse: Per-question answers, sources, errors and timings, in order.
+
+    Raises:
+        HTTPException: If a question is empty, the batch exceeds BATCH_MAX_ITEMS
+                       or the tenant is invalid (400),
+                       if the client is rate limited (429), or if the service is
+                       overloaded or throttled during ingestion (503).
+    """
+    started = time.perf_counter()
+
+    if len(request.questions) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} questions per batch")
+    if any(not question.strip() for question in request.questions):
+        raise HTTPException(status_code=400, detail="Questions cannot be empty")
+
+    items = [
+        {"question": question, "session_id": session_manager.get_session_id(None)}
+        for question in request.questions
+    ]
+    pending = []
+    for item in items:
+        if utils.is_greeting(item["question"]):
+            item["answer"] = utils.greeting_response()
+        else:
+            pending.append(item)
+
+    if pending:
+        # Each question costs a rate limit token (up to the burst); the batch takes one slot
+        with admitted(http_request, x_session_id, cost=len(pending)), tenant_scope(x_tenant_id) as vector_db:
+            results = rag_engine.query_batch(
+                questions=[item["question"] for item in pending],
+                session_ids=[item["session_id"] for item in pending],
+                vector_db=vector_db,
+                filters=request.filters.model_dump(exclude_none=True) if request.filters else None,
+            )
+
+        for item, result in zip(pending, results):
+            item.update(result)
+
+    return ChatBatchResponse(
+        results=items,
+        total_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -1,10 +1,12 @@
 """
 Health check module for the RAG Assistant API.
 
-This module provides a simple endpoint to verify that the API service is running
-and responsive.
+This module provides a liveness endpoint to verify that the API service is
+running and responsive, and a readiness endpoint that reports whether the
+embedding model and vector store have finished warming up.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
@@ -19,4 +21,34 @@ def health_check():
     return {
         "status": "ok",
         "service": "rag-assistant"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/ready")
+def readiness_check(request: Request, probe: bool = False):
+    """
+    Readiness probe for load balancers.
+
+    Reports the warm-up state and cold/warm latencies of each component. Returns
+    503 until every component is warm, so traffic is only routed to warm instances.
+
+    Args:
+        request (Request): The incoming request, used to reach the app's readiness tracker.
+        probe (bool): If True and the instance is ready, also measures a live
+                      embed and search latency.
+
+    Returns:
+        JSONResponse: The readiness payload, with status 200 when ready and 503 otherwise.
+    """
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting", "service": "rag-assistant", "components": {}},
+        )
+
+    payload = readiness.to_dict()
+    if probe and readiness.ready:
+        payload["probe"] = readiness.probe()
+
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=payload)
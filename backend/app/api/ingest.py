@@ -1,39 +1,130 @@
 """
 Document ingestion module for the RAG Assistant API.
 
-This module provides endpoints to trigger the ingestion process, which reads
-raw documents from the knowledge base and indexes them into the vector database.
+This module provides endpoints to start, monitor and cancel background ingestion
+jobs, which read raw documents from the knowledge base and index them into the
+vector database without holding the HTTP request open.
 """
-from fastapi import APIRouter, HTTPException
+from typing import Literal, Optional
 
+from fastapi import APIRouter, Header, HTTPException
+
+from app.core.ingest_jobs import IngestionJobManager
 from app.core.rag_engine import RAGEngine
+from app.core.tenants import get_tenant_registry, parse_tenants
+from app.retrieval.write_lock import IndexWriteLocked
 
 router = APIRouter()
 rag_engine = RAGEngine()
+ingestion_jobs = IngestionJobManager(rag_engine)
 
 
-@router.post("/")
-def ingest_documents():
+def single_tenant(x_tenant_id: Optional[str]) -> Optional[str]:
     """
-    Ingest documents from the raw knowledge base into the vector database.
+    Parses an X-Tenant-ID header that must name at most one tenant.
+
+    Raises:
+        HTTPException: 400 if the header is malformed or names several tenants.
+    """
+    try:
+        tenants = parse_tenants(x_tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(tenants) > 1:
+        raise HTTPException(status_code=400, detail="Ingestion targets a single tenant")
+    return tenants[0] if tenants else None
+
+
+@router.post("/", status_code=202)
+def ingest_documents(
+    mode: Literal["ingest", "reindex"] = "ingest",
+    x_tenant_id: str | None = Header(default=None),
+):
+    """
+    Start ingesting documents from the raw knowledge base into the vector database.
+
+    The RAG engine scans the 'knowledge_base/raw' directory, chunks every supported
+    file and stores their embeddings in ChromaDB on a background thread. Only one
+    ingestion job can run at a time.
 
-    This endpoint triggers the RAG engine to scan the 'knowledge_base/raw' directory,
-    process any new or existing text files, chunk them, and store their embeddings
-    in the ChromaDB vector database.
+    With mode=reindex the index is rebuilt into a new collection while the current
+    one keeps serving, verified, and swapped in atomically. The replaced collection
+    is kept for POST /ingest/rollback.
+
+    With an X-Tenant-ID header, the tenant's own knowledge base folder is
+    ingested into the tenant's collection.
 
     Returns:
-        dict: A summary of the ingestion process, including the number of documents
-              processed and chunks created.
+        dict: The new job's ID and initial status. Poll GET /ingest/{job_id} for progress.
 
     Raises:
-        HTTPException: If any error occurs during the ingestion process.
+        HTTPException: 400 for an invalid tenant, 409 if another ingestion job is
+                       already running.
+    """
+    job = ingestion_jobs.start(mode=mode, tenant=single_tenant(x_tenant_id))
+    if job is None:
+        active = ingestion_jobs.active_job
+        raise HTTPException(
+            status_code=409,
+            detail=f"Ingestion job {active.job_id if active else ''} is already running",
+        )
+
+    return {"job_id": job.job_id, "status": job.status}
+
+
+@router.post("/rollback")
+def rollback_reindex(x_tenant_id: str | None = Header(default=None)):
     """
+    Switch back to the collection that served before the last reindex swap.
+
+    Returns:
+        dict: The collection that is now active.
+
+    Raises:
+        HTTPException: 400 for an invalid tenant, 409 if a job is running, there
+                       is no previous generation or another process is writing
+                       to the index.
+    """
+    tenant = single_tenant(x_tenant_id)
+    if ingestion_jobs.active_job is not None:
+        raise HTTPException(status_code=409, detail="Cannot roll back while an ingestion job is running")
     try:
-        stats = rag_engine.ingest()
-        return {
-            "status": "success",
-            "documents_processed": stats["documents"],
-            "chunks_created": stats["chunks"],
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        tenants = [tenant] if tenant else []
+        with get_tenant_registry().open(tenants, default=rag_engine.vector_db) as vector_db:
+            return {"status": "rolled_back", "active_collection": rag_engine.rollback(vector_db)}
+    except (ValueError, IndexWriteLocked) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/{job_id}")
+def get_ingest_job(job_id: str):
+    """
+    Report the progress of an ingestion job.
+
+    Returns:
+        dict: Files discovered, parsed and embedded, chunks created, chunks/s and ETA.
+
+    Raises:
+        HTTPException: 404 if the job ID is unknown.
+    """
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
+
+
+@router.post("/{job_id}/cancel")
+def cancel_ingest_job(job_id: str):
+    """
+    Request cancellation of an ingestion job. It stops after the current file.
+
+    Returns:
+        dict: The job's current status.
+
+    Raises:
+        HTTPException: 404 if the job ID is unknown.
+    """
+    job = ingestion_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
@@ -2,18 +2,95 @@
 Logs API module for the RAG Assistant.
 
 This module provides endpoints to retrieve chat session history and detailed
-debugging logs by reading structured log files from disk.
+debugging logs by reading structured log files from disk, and a Server-Sent
+Events stream that tails the log files for live events.
 """
+import asyncio
 import os
 import json
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 
 LOGS_DIR = os.path.abspath("backend/logs")
 
+# Seconds between checks for new log lines, and between keep-alive comments
+LOG_STREAM_INTERVAL = float(os.getenv("LOG_STREAM_INTERVAL", "0.5"))
+LOG_STREAM_HEARTBEAT = 15.0
+
+
+class LogTailer:
+    """
+    Reads only the lines appended to the log files since the last poll.
+
+    Byte offsets are kept per file, so each poll costs O(new lines) rather than
+    a rescan of every file. A line still being written (no trailing newline) is
+    left for the next poll, and a file that shrank is read again from the start.
+
+    Attributes:
+        offsets (Dict[str, int]): Byte offset consumed so far, per log file path.
+    """
+
+    def __init__(self, from_start: bool = False):
+        """
+        Args:
+            from_start (bool): If True, the first poll returns existing lines too;
+                               otherwise only lines written after creation.
+        """
+        self.offsets: Dict[str, int] = {}
+        if not from_start:
+            for path in self._files():
+                self.offsets[path] = os.path.getsize(path)
+
+    @staticmethod
+    def _files() -> List[str]:
+        if not os.path.exists(LOGS_DIR):
+            return []
+        return [
+            os.path.join(LOGS_DIR, filename)
+            for filename in os.listdir(LOGS_DIR)
+            if filename.endswith(".jsonl")
+        ]
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Returns the entries appended since the last poll, sorted by timestamp.
+
+        Returns:
+            List[Dict[str, Any]]: The new log entries.
+        """
+        entries = []
+        for path in self._files():
+            offset = self.offsets.get(path, 0)
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            if size < offset:
+                # Truncated or rotated
+                offset = 0
+            if size == offset:
+                continue
+
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+
+            complete = data.rfind(b"\n") + 1
+            self.offsets[path] = offset + complete
+            for line in data[:complete].splitlines():
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+        entries.sort(key=lambda x: x.get("timestamp", ""))
+        return entries
+
 def get_all_logs() -> List[Dict[str, Any]]:
     """Reads all .jsonl files in the logs directory and returns a sorted list of entries."""
     all_entries = []
@@ -38,7 +115,8 @@ def get_all_logs() -> List[Dict[str, Any]]:
 @router.get("/sessions")
 def list_sessions():
     """
-    Returns a list of unique session IDs with their start time and last activity.
+    Returns a list of unique session IDs with their start time, last activity,
+    and LLM token and cost totals.
     """
     logs = get_all_logs()
     sessions = {}
@@ -54,11 +132,19 @@ def list_sessions():
                 "session_id": sid,
                 "start_time": ts,
                 "last_activity": ts,
-                "event_count": 1
+                "event_count": 1,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
             }
         else:
             sessions[sid]["last_activity"] = ts
             sessions[sid]["event_count"] += 1
+
+        if entry.get("event") == "llm_usage":
+            sessions[sid]["prompt_tokens"] += entry.get("prompt_tokens", 0)
+            sessions[sid]["completion_tokens"] += entry.get("completion_tokens", 0)
+            sessions[sid]["cost_usd"] += entry.get("cost_usd", 0.0)
             
     # Convert to list and sort by last activity (newest first)
     result = list(sessions.values())
@@ -83,3 +169,56 @@ def get_session_details(session_id: str):
         "session_id": session_id,
         "logs": session_logs
     }
+
+
+@router.get("/stream")
+async def stream_logs(
+    request: Request,
+    session_id: Optional[str] = None,
+    event: Optional[str] = None,
+    from_start: bool = False,
+):
+    """
+    Streams new log entries as Server-Sent Events.
+
+    Each SSE 'data' field is one JSON log entry. The log files are tailed from
+    stored byte offsets, so a connected dashboard costs O(new lines) per poll
+    instead of re-reading every file.
+
+    Args:
+        request (Request): The incoming request, used to detect disconnects.
+        session_id (str, optional): Only stream entries of this session.
+        event (str, optional): Only stream entries with these event names (comma-separated).
+        from_start (bool): If True, replay existing entries before tailing.
+
+    Returns:
+        StreamingResponse: A 'text/event-stream' response.
+    """
+    events = {name.strip() for name in event.split(",")} if event else None
+    tailer = LogTailer(from_start=from_start)
+
+    async def generate():
+        last_sent = time.monotonic()
+        yield "retry: 2000\n\n"
+        while not await request.is_disconnected():
+            entries = await asyncio.to_thread(tailer.poll)
+            for entry in entries:
+                if session_id and entry.get("session_id") != session_id:
+                    continue
+                if events and entry.get("event") not in events:
+                    continue
+                yield f"data: {json.dumps(entry, ensure_ascii=False)}\n\n"
+                last_sent = time.monotonic()
+
+            if time.monotonic() - last_sent >= LOG_STREAM_HEARTBEAT:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+            await asyncio.sleep(LOG_STREAM_INTERVAL)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
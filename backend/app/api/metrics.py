@@ -0,0 +1,23 @@
+"""
+Metrics API module for the RAG Assistant.
+
+This module exposes the process's in-memory metrics (admission control queue
+depth, rejections, latencies, ...) in the Prometheus text format.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.logging.metrics import REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/", response_class=PlainTextResponse)
+def metrics():
+    """
+    Returns every registered metric in the Prometheus text exposition format.
+
+    Returns:
+        PlainTextResponse: The exposition text.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,105 @@
+"""
+Search API module for the RAG Assistant.
+
+This module defines a retrieval-only endpoint: it returns the chunks most
+relevant to each query without invoking the LLM. Queries are embedded together
+and searched with one multi-query vector store call, which makes it suited to
+offline evaluation jobs and upstream services that send many queries at once.
+Searches accept metadata filters, and the available filter values are served
+from the facet index.
+"""
+import time
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.api.chat import BATCH_MAX_ITEMS, tenant_scope
+from app.api.ingest import ingestion_jobs
+from app.models.requests import SearchRequest
+from app.models.responses import FacetResponse, SearchResponse
+
+router = APIRouter()
+
+
+@router.post("/", response_model=SearchResponse)
+def search(request: SearchRequest, x_tenant_id: str | None = Header(default=None)):
+    """
+    Retrieves the nearest chunks for a list of queries.
+
+    Args:
+        request (SearchRequest): The request body containing the queries, n_results
+                                 and optional metadata filters.
+        x_tenant_id (str, optional): The tenant to search, or several comma-separated
+                                     tenants to fan out over (TENANT_FANOUT_ENABLED).
+
+    Returns:
+        SearchResponse: Per-query hits in request order, plus batch timings. Fan-out
+                        hits carry their 'tenant' in the metadata.
+
+    Raises:
+        HTTPException: If a query is empty, the batch exceeds BATCH_MAX_ITEMS or the
+                       tenant is invalid (400),
+                       or if the request is throttled during ingestion (503).
+    """
+    started = time.perf_counter()
+
+    if len(request.queries) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} queries per batch")
+    if any(not query.strip() for query in request.queries):
+        raise HTTPException(status_code=400, detail="Queries cannot be empty")
+
+    # Embedding shares CPU with a running ingestion just like chat does
+    with ingestion_jobs.chat_slot() as admitted:
+        if not admitted:
+            raise HTTPException(
+                status_code=503,
+                detail="Ingestion in progress, please retry shortly",
+                headers={"Retry-After": str(int(ingestion_jobs.chat_wait_seconds))},
+            )
+
+        timings = {}
+        with tenant_scope(x_tenant_id) as vector_db:
+            results = vector_db.search_batch(
+                request.queries,
+                n_results=request.n_results,
+                timings=timings,
+                filters=request.filters.model_dump(exclude_none=True) if request.filters else None,
+            )
+
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    return SearchResponse(
+        results=[
+            {
+                "query": query,
+                "hits": [
+                    {"id": chunk_id, "document": document, "metadata": metadata, "distance": distance}
+                    for chunk_id, document, metadata, distance in zip(
+                        result["ids"], result["documents"], result["metadatas"], result["distances"]
+                    )
+                ],
+            }
+            for query, result in zip(request.queries, results)
+        ],
+        timings=timings,
+    )
+
+
+@router.get("/facets", response_model=FacetResponse)
+def search_facets(x_tenant_id: str | None = Header(default=None)):
+    """
+    Lists the filter values available for searches, with their chunk counts.
+
+    Counts come from the facet index maintained during ingestion, so the
+    collection is not scanned.
+
+    Args:
+        x_tenant_id (str, optional): The tenant(s) whose collections are counted.
+
+    Returns:
+        FacetResponse: Chunk counts per source, type and path, plus totals.
+
+    Raises:
+        HTTPException: 400 if the tenant is invalid.
+    """
+    with tenant_scope(x_tenant_id) as vector_db:
+        return vector_db.facet_counts()
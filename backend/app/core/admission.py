@@ -0,0 +1,221 @@
+"""
+Admission control for the RAG Assistant chat endpoints.
+
+Every accepted chat request starts an expensive LLM call, so a single client
+(or a widget bug) must not be able to flood the service. Requests pass through
+per-session and per-IP token buckets first, then a global concurrency cap with
+a bounded wait queue. Anything that does not fit is rejected immediately with
+429 (rate limited) or 503 (overloaded) and a Retry-After hint, instead of
+piling up behind the LLM provider. Queue depth, in-flight requests and
+rejections are exported through the metrics registry.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from app.logging.logger import StructuredLogger
+from app.logging.metrics import REGISTRY
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted.
+
+    Attributes:
+        status_code (int): 429 when rate limited, 503 when the service is overloaded.
+        reason (str): 'session_rate', 'ip_rate', 'queue_full' or 'queue_timeout'.
+        retry_after (int): Suggested seconds before retrying.
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(reason)
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by client, refilled continuously.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Bucket capacity.
+        max_keys (int): Least recently used buckets beyond this are forgotten.
+    """
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = 10000):
+        """
+        Args:
+            per_minute (float): Sustained requests per minute; 0 disables the limiter.
+            burst (float): Requests allowed at once after an idle period.
+            max_keys (int): Maximum number of buckets kept in memory.
+        """
+        self.rate = per_minute / 60.0
+        self.burst = max(burst, 1.0)
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Takes tokens from a client's bucket if it has enough.
+
+        Args:
+            key (str): The client key (session ID or IP address).
+            cost (float): Tokens to take, e.g. the number of questions in a batch.
+                          Capped at the burst size, so a large batch drains the
+                          bucket instead of never fitting.
+
+        Returns:
+            Tuple[bool, float]: Whether the request is allowed, and if not, the
+                                seconds until enough tokens are available.
+        """
+        if not self.enabled:
+            return True, 0.0
+
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0.0
+        return False, (cost - tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Rate limits and caps concurrent chat requests.
+
+    Attributes:
+        max_concurrent (int): Requests processed at once (CHAT_MAX_CONCURRENCY).
+        max_queue (int): Requests allowed to wait for a slot (CHAT_MAX_QUEUE).
+        queue_timeout (float): Seconds a queued request waits before it is shed
+                               (CHAT_QUEUE_TIMEOUT_SECONDS).
+        session_limiter (RateLimiter): Per x-session-id buckets (RATE_LIMIT_SESSION_*).
+        ip_limiter (RateLimiter): Per client IP buckets (RATE_LIMIT_IP_*).
+        inflight (int): Requests currently being processed.
+        waiting (int): Requests currently queued.
+    """
+
+    def __init__(self):
+        """
+        Initializes the controller with configuration from environment variables.
+        """
+        self.max_concurrent = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+        self.max_queue = int(os.getenv("CHAT_MAX_QUEUE", "16"))
+        self.queue_timeout = float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "10"))
+        self.session_limiter = RateLimiter(
+            per_minute=float(os.getenv("RATE_LIMIT_SESSION_PER_MINUTE", "20")),
+            burst=float(os.getenv("RATE_LIMIT_SESSION_BURST", "5")),
+        )
+        self.ip_limiter = RateLimiter(
+            per_minute=float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "60")),
+            burst=float(os.getenv("RATE_LIMIT_IP_BURST", "20")),
+        )
+        self.logger = StructuredLogger(component="admission")
+
+        self.lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.inflight = 0
+        self.waiting = 0
+        # Smoothed request duration, for Retry-After estimates
+        self._avg_seconds = 1.0
+
+        REGISTRY.gauge("chat_inflight_requests", "Chat requests being processed", function=lambda: self.inflight)
+        REGISTRY.gauge("chat_queue_depth", "Chat requests waiting for a slot", function=lambda: self.waiting)
+        self._admitted = REGISTRY.counter("chat_admitted_total", "Chat requests admitted")
+        self._rejected = REGISTRY.counter(
+            "chat_rejected_total", "Chat requests rejected by admission control", ("reason",)
+        )
+        self._wait_seconds = REGISTRY.histogram(
+            "chat_queue_wait_seconds", "Time admitted chat requests spent queued"
+        )
+
+    def _reject(self, status_code: int, reason: str, retry_after: float, **context):
+        self._rejected.inc(reason=reason)
+        self.logger.event("request_rejected", reason=reason, status=status_code, **context)
+        raise AdmissionRejected(status_code, reason, retry_after)
+
+    def _overload_retry_after(self) -> float:
+        """
+        Estimates when a slot frees up from the queue length and average duration.
+        """
+        return self._avg_seconds * (self.waiting + 1) / max(self.max_concurrent, 1)
+
+    @contextmanager
+    def admit(
+        self,
+        session_id: Optional[str] = None,
+        client_ip: Optional[str] = None,
+        cost: int = 1,
+    ) -> Iterator[None]:
+        """
+        Admits a request or raises AdmissionRejected.
+
+        Args:
+            session_id (str, optional): The client-provided x-session-id, if any.
+            client_ip (str, optional): The client's IP address.
+            cost (int): Rate limit tokens to take, e.g. the number of batch questions.
+
+        Raises:
+            AdmissionRejected: 429 if a rate limit is exceeded, 503 if the queue is
+                               full or the wait for a slot timed out.
+        """
+        if session_id:
+            allowed, retry_after = self.session_limiter.acquire(f"session:{session_id}", cost)
+            if not allowed:
+                self._reject(429, "session_rate", retry_after, session_id=session_id)
+        if client_ip:
+            allowed, retry_after = self.ip_limiter.acquire(f"ip:{client_ip}", cost)
+            if not allowed:
+                self._reject(429, "ip_rate", retry_after, client_ip=client_ip)
+
+        queued_at = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self.lock:
+                if self.waiting >= self.max_queue:
+                    full = True
+                else:
+                    full = False
+                    self.waiting += 1
+            if full:
+                self._reject(503, "queue_full", self._overload_retry_after(), session_id=session_id)
+
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+            if not acquired:
+                self._reject(503, "queue_timeout", self._overload_retry_after(), session_id=session_id)
+
+        started = time.monotonic()
+        self._wait_seconds.observe(started - queued_at)
+        self._admitted.inc()
+        with self.lock:
+            self.inflight += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.inflight -= 1
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - started)
+            self._slots.release()
@@ -0,0 +1,90 @@
+"""
+Resumable ingestion checkpoints for the RAG Assistant.
+
+A checkpoint is an append-only JSONL file listing the files an ingestion run
+has fully indexed, keyed by path, size and modification time. An interrupted
+run can be restarted with the same checkpoint and skips those files; a file
+that changed since it was recorded is indexed again.
+"""
+import json
+import os
+from typing import Dict, Tuple
+
+
+class IngestCheckpoint:
+    """
+    Records which knowledge base files have been indexed.
+
+    Attributes:
+        path (str): The JSONL checkpoint file.
+        done (Dict[str, Tuple[int, int]]): Indexed path -> (mtime_ns, size) when it was indexed.
+    """
+
+    def __init__(self, path: str):
+        """
+        Loads the checkpoint file, if it exists.
+
+        Args:
+            path (str): The JSONL checkpoint file.
+        """
+        self.path = path
+        self.done: Dict[str, Tuple[int, int]] = {}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line from an interrupted write
+                        continue
+                    self.done[entry["path"]] = (entry["mtime_ns"], entry["size"])
+
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int]:
+        """
+        Returns the (mtime_ns, size) pair identifying a file's current version.
+        """
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_done(self, path: str) -> bool:
+        """
+        Whether the current version of a file has already been indexed.
+
+        Args:
+            path (str): The source file path.
+
+        Returns:
+            bool: True if the file is recorded and unchanged since.
+        """
+        if path not in self.done:
+            return False
+        try:
+            return self.done[path] == self._signature(path)
+        except FileNotFoundError:
+            return False
+
+    def mark_done(self, path: str):
+        """
+        Records a file as indexed and flushes the entry to disk.
+
+        Args:
+            path (str): The source file path.
+        """
+        mtime_ns, size = self._signature(path)
+        self.done[path] = (mtime_ns, size)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"path": path, "mtime_ns": mtime_ns, "size": size}) + "\n")
+
+    def clear(self):
+        """
+        Forgets every recorded file and removes the checkpoint file.
+        """
+        self.done = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,113 @@
+"""
+Shared HTTP connection pool for LLM provider clients.
+
+Provider SDKs create their own HTTP clients with default settings: no explicit
+timeouts and an unsized pool. This module builds one process-wide httpx client
+with keep-alive connections, a pool sized to the chat concurrency limits, and
+explicit connect/read/write/pool timeouts, so a stalled provider connection
+cannot hang a worker indefinitely. Every request is traced to count how many
+reuse a pooled connection versus opening a new one.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from app.logging.metrics import REGISTRY
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+_requests = REGISTRY.counter(
+    "llm_http_requests_total", "HTTP requests sent to LLM providers", ("host", "status")
+)
+_connections = REGISTRY.counter(
+    "llm_http_connections_total",
+    "LLM provider requests by whether they opened a new connection or reused a pooled one",
+    ("host", "connection"),
+)
+_latency = REGISTRY.histogram(
+    "llm_http_request_seconds", "LLM provider HTTP request latency", ("host",)
+)
+
+
+def default_pool_size() -> int:
+    """
+    Sizes the pool for the most LLM calls chat can have in flight.
+
+    Returns:
+        int: LLM_POOL_SIZE, or CHAT_MAX_CONCURRENCY plus CHAT_BATCH_CONCURRENCY.
+    """
+    configured = os.getenv("LLM_POOL_SIZE")
+    if configured:
+        return int(configured)
+    return int(os.getenv("CHAT_MAX_CONCURRENCY", "8")) + int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+
+
+def http_timeout() -> httpx.Timeout:
+    """
+    Builds the provider request timeouts from environment variables.
+
+    Returns:
+        httpx.Timeout: Connect, read, write and pool-acquire timeouts in seconds.
+    """
+    return httpx.Timeout(
+        connect=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+        read=float(os.getenv("LLM_READ_TIMEOUT", "60")),
+        write=float(os.getenv("LLM_WRITE_TIMEOUT", "10")),
+        pool=float(os.getenv("LLM_POOL_TIMEOUT", "5")),
+    )
+
+
+def _on_request(request: httpx.Request):
+    """
+    Attaches a connection trace to each outgoing request.
+    """
+    state = {"new_connection": False, "started": time.perf_counter()}
+
+    def trace(event_name: str, info: dict):
+        if event_name.startswith("connection.connect_tcp"):
+            state["new_connection"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["rag_assistant_trace"] = state
+
+
+def _on_response(response: httpx.Response):
+    """
+    Records the request's status, latency and connection reuse.
+    """
+    request = response.request
+    host = request.url.host
+    state = request.extensions.get("rag_assistant_trace")
+
+    _requests.inc(host=host, status=str(response.status_code))
+    if state is not None:
+        _latency.observe(time.perf_counter() - state["started"], host=host)
+        _connections.inc(host=host, connection="new" if state["new_connection"] else "reused")
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Returns the process-wide pooled keep-alive HTTP client for LLM providers.
+
+    Returns:
+        httpx.Client: The shared client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            pool_size = default_pool_size()
+            _client = httpx.Client(
+                timeout=http_timeout(),
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_SECONDS", "30")),
+                ),
+                event_hooks={"request": [_on_request], "response": [_on_response]},
+            )
+            REGISTRY.gauge("llm_http_pool_size", "Max pooled connections to LLM providers").set(pool_size)
+        return _client
@@ -0,0 +1,300 @@
+"""
+Background ingestion jobs for the RAG Assistant.
+
+This module runs RAGEngine.ingest() (or a blue/green RAGEngine.reindex()) on a
+background thread so the HTTP request that starts it can return immediately.
+It tracks per-job progress (files discovered, parsed and embedded, chunk
+throughput and ETA), supports cancellation, allows only one ingestion at a
+time, and throttles chat traffic while a job is running so embedding work is
+not starved.
+"""
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.tenants import get_tenant_registry, tenant_knowledge_base
+from app.logging.logger import StructuredLogger
+
+
+class IngestionJob:
+    """
+    State and progress counters for a single ingestion run.
+
+    Attributes:
+        job_id (str): The unique identifier of the job.
+        mode (str): 'ingest' to add to the live index, or 'reindex' to rebuild and swap.
+        tenant (Optional[str]): The tenant whose knowledge base is ingested, or None
+                                for the default one.
+        status (str): One of 'pending', 'running', 'completed', 'cancelled' or 'failed'.
+        files_discovered (int): Number of supported files found in the knowledge base.
+        files_parsed (int): Number of files read so far.
+        files_embedded (int): Number of files whose chunks have been indexed.
+        chunks_embedded (int): Number of new chunks indexed so far.
+        error (Optional[str]): The error message if the job failed.
+        result (Dict[str, Any]): Extra outcome details, e.g. reindex verification.
+        cancel_event (threading.Event): Set to request cancellation.
+    """
+
+    def __init__(self, mode: str = "ingest", tenant: Optional[str] = None):
+        """
+        Initializes a pending job with empty counters.
+
+        Args:
+            mode (str): 'ingest' or 'reindex'.
+            tenant (str, optional): The tenant to ingest, None for the default knowledge base.
+        """
+        self.job_id = str(uuid.uuid4())
+        self.mode = mode
+        self.tenant = tenant
+        self.status = "pending"
+        self.files_discovered = 0
+        self.files_parsed = 0
+        self.files_embedded = 0
+        self.chunks_embedded = 0
+        self.documents = 0
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def is_active(self) -> bool:
+        """
+        Whether the job is still pending or running.
+        """
+        return self.status in ("pending", "running")
+
+    def on_progress(self, event: str, **data: Any):
+        """
+        Progress callback passed to RAGEngine.ingest().
+
+        Args:
+            event (str): The progress event name.
+            **data: Event-specific counters.
+        """
+        if event == "files_discovered":
+            self.files_discovered = data.get("files", 0)
+        elif event == "file_parsed":
+            self.files_parsed += 1
+        elif event == "file_embedded":
+            self.files_embedded += 1
+            self.chunks_embedded += data.get("chunks", 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serializes the job state, including derived throughput and ETA.
+
+        The ETA is estimated from the average time per parsed file so far.
+
+        Returns:
+            Dict[str, Any]: The job status payload returned by the API.
+        """
+        end = self.finished_at or time.time()
+        elapsed = (end - self.started_at) if self.started_at else 0.0
+
+        chunks_per_second = self.chunks_embedded / elapsed if elapsed > 0 else 0.0
+
+        eta_seconds = None
+        if self.status == "running" and self.files_parsed > 0:
+            remaining = max(self.files_discovered - self.files_parsed, 0)
+            eta_seconds = round(elapsed / self.files_parsed * remaining, 1)
+
+        return {
+            "job_id": self.job_id,
+            "mode": self.mode,
+            "tenant": self.tenant,
+            "status": self.status,
+            "files_discovered": self.files_discovered,
+            "files_parsed": self.files_parsed,
+            "files_embedded": self.files_embedded,
+            "documents_processed": self.documents,
+            "chunks_created": self.chunks_embedded,
+            "chunks_per_second": round(chunks_per_second, 2),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": eta_seconds,
+            "error": self.error,
+            **self.result,
+        }
+
+
+class IngestionJobManager:
+    """
+    Runs ingestion jobs one at a time and throttles chat while they run.
+
+    Attributes:
+        rag_engine (RAGEngine): The engine whose ingest() method is run.
+        jobs (Dict[str, IngestionJob]): The active job and the most recent finished
+                                        ones, by ID, oldest first.
+        max_finished_jobs (int): Finished jobs kept for GET /ingest/{job_id} (INGEST_JOB_HISTORY).
+        chat_concurrency (int): Max concurrent chat requests while ingesting.
+        chat_wait_seconds (float): How long a throttled chat request waits for a slot.
+        logger (StructuredLogger): Logger for job life cycle events.
+    """
+
+    def __init__(self, rag_engine):
+        """
+        Initializes the manager for a given RAG engine.
+
+        Args:
+            rag_engine (RAGEngine): The engine used to run ingestion.
+        """
+        self.rag_engine = rag_engine
+        self.jobs: Dict[str, IngestionJob] = {}
+        self.lock = threading.Lock()
+        self.logger = StructuredLogger(component="ingest_jobs")
+
+        self.max_finished_jobs = int(os.getenv("INGEST_JOB_HISTORY", "50"))
+        self.chat_concurrency = int(os.getenv("INGEST_CHAT_CONCURRENCY", "2"))
+        self.chat_wait_seconds = float(os.getenv("INGEST_CHAT_WAIT_SECONDS", "10"))
+        self._chat_slots = threading.BoundedSemaphore(self.chat_concurrency)
+        self._active_job: Optional[IngestionJob] = None
+
+    @property
+    def active_job(self) -> Optional[IngestionJob]:
+        """
+        The currently pending or running job, if any.
+        """
+        job = self._active_job
+        return job if job is not None and job.is_active else None
+
+    def start(self, mode: str = "ingest", tenant: Optional[str] = None) -> Optional[IngestionJob]:
+        """
+        Starts a new ingestion job on a background thread.
+
+        Args:
+            mode (str): 'ingest' to add to the live index, or 'reindex' to rebuild
+                        into a new collection and swap it in once verified.
+            tenant (str, optional): Ingest this tenant's knowledge base into its own
+                                    collection instead of the default one.
+
+        Returns:
+            Optional[IngestionJob]: The new job, or None if another job is already active.
+        """
+        with self.lock:
+            if self.active_job is not None:
+                return None
+
+            self._prune()
+            job = IngestionJob(mode=mode, tenant=tenant)
+            self.jobs[job.job_id] = job
+            self._active_job = job
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(job,),
+            name=f"ingest-{job.job_id[:8]}",
+            daemon=True,
+        )
+        thread.start()
+
+        self.logger.event("ingest_job_started", job_id=job.job_id, mode=mode, tenant=tenant)
+        return job
+
+    def _prune(self):
+        """
+        Forgets the oldest finished jobs beyond max_finished_jobs. Caller holds the lock.
+        """
+        finished = [job_id for job_id, job in self.jobs.items() if not job.is_active]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Looks up a job by ID.
+
+        Args:
+            job_id (str): The job identifier.
+
+        Returns:
+            Optional[IngestionJob]: The job, or None if it is unknown or was pruned.
+        """
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Requests cancellation of a job. The job stops after the current file.
+
+        Args:
+            job_id (str): The job identifier.
+
+        Returns:
+            Optional[IngestionJob]: The job, or None if it is unknown.
+        """
+        job = self.jobs.get(job_id)
+        if job is not None and job.is_active:
+            job.cancel_event.set()
+            self.logger.event("ingest_job_cancel_requested", job_id=job_id)
+        return job
+
+    def _run(self, job: IngestionJob):
+        """
+        Thread target that runs the ingestion and records its outcome.
+
+        Args:
+            job (IngestionJob): The job to run.
+        """
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            run = self.rag_engine.reindex if job.mode == "reindex" else self.rag_engine.ingest
+            tenants = [job.tenant] if job.tenant else []
+            # Pins the tenant's collection so the LRU cannot release it mid-job
+            with get_tenant_registry().open(tenants, default=self.rag_engine.vector_db) as vector_db:
+                files = None
+                if job.tenant:
+                    files = self.rag_engine.discover_documents(tenant_knowledge_base(job.tenant))
+                stats = run(
+                    progress=job.on_progress,
+                    cancel_event=job.cancel_event,
+                    vector_db=vector_db,
+                    files=files,
+                )
+            job.documents = stats["documents"]
+            job.status = "cancelled" if stats.get("cancelled") else "completed"
+            if job.mode == "reindex":
+                job.result = {
+                    key: stats.get(key) for key in ("collection", "swapped", "verification")
+                }
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+        self.logger.event(
+            "ingest_job_finished",
+            job_id=job.job_id,
+            mode=job.mode,
+            tenant=job.tenant,
+            status=job.status,
+            documents=job.documents,
+            chunks=job.chunks_embedded,
+            error=job.error,
+        )
+
+    @contextmanager
+    def chat_slot(self) -> Iterator[bool]:
+        """
+        Limits concurrent chat requests while an ingestion job is running.
+
+        When no job is active this yields True immediately. Otherwise it waits up
+        to chat_wait_seconds for one of chat_concurrency slots.
+
+        Yields:
+            bool: True if the request may proceed, False if it should be rejected.
+        """
+        if self.active_job is None:
+            yield True
+            return
+
+        acquired = self._chat_slots.acquire(timeout=self.chat_wait_seconds)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._chat_slots.release()
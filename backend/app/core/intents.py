@@ -0,0 +1,179 @@
+"""
+Embedding-based intent routing for the RAG Assistant.
+
+Small talk ("hi there!", "thanks a lot", "who are you?") does not need
+retrieval or an LLM call. This module embeds a handful of exemplar phrases per
+canned intent once, and compares each question's embedding (the same one used
+for search) against that matrix with a single vectorized cosine similarity.
+Short questions that are close enough to an intent get its templated response
+directly, so small-talk traffic never reaches the LLM provider.
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core import utils
+
+# Canned intents: exemplar phrasings and the templated response
+INTENTS: Dict[str, Dict[str, object]] = {
+    "greeting": {
+        "examples": [
+            "hi", "hello", "hey", "hi there", "hello there", "hey there",
+            "good morning", "good afternoon", "good evening", "greetings",
+            "howdy", "hiya", "yo",
+        ],
+        "response": utils.greeting_response(),
+    },
+    "thanks": {
+        "examples": [
+            "thanks", "thank you", "thanks a lot", "thank you so much",
+            "many thanks", "thanks for your help", "much appreciated",
+            "great, thanks", "cheers",
+        ],
+        "response": "You're welcome! Let me know if there's anything else you'd like to know.",
+    },
+    "goodbye": {
+        "examples": [
+            "bye", "goodbye", "see you", "see you later", "bye bye",
+            "have a nice day", "talk to you later", "that's all for now",
+        ],
+        "response": "Goodbye! Feel free to come back with more questions anytime.",
+    },
+    "identity": {
+        "examples": [
+            "who are you", "what are you", "are you a bot", "are you human",
+            "what is your name", "who am I talking to", "are you an AI",
+        ],
+        "response": (
+            "I'm the RAG Assistant. I answer questions using the documents in this "
+            "knowledge base and cite the sources I used."
+        ),
+    },
+    "capabilities": {
+        "examples": [
+            "what can you do", "how can you help me", "what do you know",
+            "what are you able to do", "help", "how does this work",
+            "what can I ask you",
+        ],
+        "response": (
+            "Ask me anything about the documents in this knowledge base and I'll answer "
+            "from their contents, citing the sources I used."
+        ),
+    },
+    "acknowledgement": {
+        "examples": ["ok", "okay", "cool", "got it", "great", "nice", "alright", "sounds good"],
+        "response": "Great! What else would you like to know?",
+    },
+}
+
+
+class IntentRouter:
+    """
+    Matches question embeddings against canned intent exemplars.
+
+    Attributes:
+        embeddings (Embeddings): The model used for search, to embed the exemplars.
+        enabled (bool): Whether routing is on (INTENT_ROUTER_ENABLED).
+        threshold (float): Minimum cosine similarity to an exemplar (INTENT_THRESHOLD).
+        max_words (int): Longer questions are never routed (INTENT_MAX_WORDS).
+    """
+
+    def __init__(self, embeddings, threshold: Optional[float] = None, max_words: Optional[int] = None):
+        """
+        Initializes the router with configuration from environment variables.
+
+        The exemplar matrix is embedded lazily on first use (or by prepare()).
+
+        Args:
+            embeddings (Embeddings): The model used for search.
+            threshold (float, optional): Similarity threshold, defaults to INTENT_THRESHOLD.
+            max_words (int, optional): Word limit for routable questions, defaults to INTENT_MAX_WORDS.
+        """
+        self.embeddings = embeddings
+        self.enabled = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("INTENT_THRESHOLD", "0.82")
+        )
+        self.max_words = max_words if max_words is not None else int(
+            os.getenv("INTENT_MAX_WORDS", "8")
+        )
+        self.lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._labels: List[str] = []
+
+    def prepare(self):
+        """
+        Embeds and normalizes every exemplar once.
+        """
+        with self.lock:
+            if self._matrix is not None:
+                return
+
+            labels, examples = [], []
+            for name, intent in INTENTS.items():
+                for example in intent["examples"]:
+                    labels.append(name)
+                    examples.append(example)
+
+            matrix = np.asarray(self.embeddings.embed_documents(examples), dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            self._labels = labels
+            self._matrix = matrix
+
+    def match_batch(
+        self,
+        questions: List[str],
+        query_embeddings: List[List[float]],
+    ) -> List[Optional[Tuple[str, float]]]:
+        """
+        Finds the canned intent of each question, if any.
+
+        Args:
+            questions (List[str]): The questions, used for the length limit.
+            query_embeddings (List[List[float]]): Their search embeddings.
+
+        Returns:
+            List[Optional[Tuple[str, float]]]: Per question, the (intent, similarity)
+                                               above the threshold, or None.
+        """
+        matches: List[Optional[Tuple[str, float]]] = [None] * len(questions)
+        if not self.enabled:
+            return matches
+
+        candidates = [i for i, q in enumerate(questions) if len(q.split()) <= self.max_words]
+        if not candidates:
+            return matches
+
+        self.prepare()
+        queries = np.asarray([query_embeddings[i] for i in candidates], dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-12
+
+        similarities = queries @ self._matrix.T
+        best = similarities.argmax(axis=1)
+        for row, i in enumerate(candidates):
+            score = float(similarities[row, best[row]])
+            if score >= self.threshold:
+                matches[i] = (self._labels[best[row]], round(score, 4))
+        return matches
+
+    def match(self, question: str, query_embedding: List[float]) -> Optional[Tuple[str, float]]:
+        """
+        Finds the canned intent of a single question, if any.
+
+        Args:
+            question (str): The question.
+            query_embedding (List[float]): Its search embedding.
+
+        Returns:
+            Optional[Tuple[str, float]]: The (intent, similarity), or None.
+        """
+        return self.match_batch([question], [query_embedding])[0]
+
+    @staticmethod
+    def response(intent: str) -> str:
+        """
+        Returns the templated response of an intent.
+        """
+        return INTENTS[intent]["response"]
@@ -4,17 +4,51 @@ LLM provider module for the RAG Assistant.
 This module provides a factory function to initialize and return a LangChain
 Chat model based on the available environment variables. It supports OpenAI,
 Groq, and Google Generative AI (Gemini) as providers.
+
+OpenAI and Groq clients share one pooled keep-alive HTTP client with explicit
+timeouts (see app.core.http_client). Provider SDK retries are disabled in favour
+of jittered retries capped by a process-wide retry budget (see app.core.retry).
 """
 import os
+from typing import Any
+
 from dotenv import load_dotenv
 
 from langchain_openai import ChatOpenAI 
 from langchain_groq import ChatGroq
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from app.core.http_client import get_http_client, http_timeout
+from app.core.retry import call_with_retries
+
 load_dotenv()
 
 
+class ResilientLLM:
+    """
+    Wraps a chat model so invoke() retries transient provider errors.
+
+    Every other attribute is delegated to the wrapped model.
+
+    Attributes:
+        llm (BaseChatModel): The wrapped LangChain chat model.
+        provider (str): The provider name, for metrics.
+    """
+
+    def __init__(self, llm, provider: str):
+        self.llm = llm
+        self.provider = provider
+
+    def invoke(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Invokes the model, retrying timeouts, connection errors and 429/5xx responses.
+        """
+        return call_with_retries(lambda: self.llm.invoke(*args, **kwargs), provider=self.provider)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
 def get_llm():
     """
     Factory function to create and return an LLM instance.
@@ -28,36 +62,46 @@ def get_llm():
      or a default model if not specified. Temperature is set to 0.0 for consistent results.
 
     Returns:
-        BaseChatModel: A LangChain-compatible chat model instance.
+        ResilientLLM: A LangChain-compatible chat model wrapped with retries.
 
     Raises:
         RuntimeError: If no supported LLM API keys are found in the environment.
     """
+    timeout = http_timeout()
 
     if os.getenv("OPENAI_API_KEY"):
         model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        return ChatOpenAI(
+        return ResilientLLM(ChatOpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
             model=model,
             temperature=0.0,
-        )
+            http_client=get_http_client(),
+            timeout=timeout,
+            max_retries=0,
+        ), provider="openai")
 
     if os.getenv("GROQ_API_KEY"):
         model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
-        return ChatGroq(
+        return ResilientLLM(ChatGroq(
             model=model,
             temperature=0.0,
-        )
+            http_client=get_http_client(),
+            timeout=timeout,
+            max_retries=0,
+        ), provider="groq")
 
     if os.getenv("GOOGLE_API_KEY"):
         model = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash")
-        return ChatGoogleGenerativeAI(
+        # Gemini uses gRPC rather than httpx; only the overall timeout applies
+        return ResilientLLM(ChatGoogleGenerativeAI(
             google_api_key=os.getenv("GOOGLE_API_KEY"),
             model=model,
             temperature=0.0,
-        )
+            timeout=timeout.read,
+            max_retries=0,
+        ), provider="google")
 
 
     raise RuntimeError(
         "No LLM API key found. Set OPENAI_API_KEY, GROQ_API_KEY, or GOOGLE_API_KEY."
-    )
\ No newline at end of file
+    )
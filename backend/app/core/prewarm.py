@@ -0,0 +1,89 @@
+"""
+Query cache warm-up from historical query logs.
+
+After a deploy or restart the query caches are empty, but the 'rag_engine' log
+already records what users ask most. This module mines the most frequent
+recent 'user_question_received' questions so the readiness warm-up can
+precompute their embeddings, retrievals and, optionally, answers before the
+instance reports ready.
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.query_cache import normalize_question
+
+QUESTION_EVENT = "user_question_received"
+
+
+def query_log_path() -> str:
+    """
+    Returns the path of the log file holding user questions.
+    """
+    return os.path.join(os.path.abspath("backend/logs"), "rag_engine.jsonl")
+
+
+def top_questions(
+    top_n: int,
+    window_hours: float,
+    log_file: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> List[Tuple[str, int]]:
+    """
+    Finds the most frequently asked questions in the recent query log.
+
+    Only the last max_bytes of the log are read, so start-up time does not grow
+    with the log. Questions are grouped after normalization (see
+    normalize_question); questions truncated by the logger are skipped.
+
+    Args:
+        top_n (int): The number of questions to return.
+        window_hours (float): Only questions asked within this many hours count.
+        log_file (str, optional): The log to read, defaults to query_log_path().
+        max_bytes (int, optional): Bytes read from the end of the log, defaults
+                                   to WARMUP_LOG_MAX_BYTES.
+
+    Returns:
+        List[Tuple[str, int]]: (question, times asked) pairs, most asked first,
+                               using each question's latest spelling.
+    """
+    log_file = log_file or query_log_path()
+    max_bytes = max_bytes if max_bytes is not None else int(os.getenv("WARMUP_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    if top_n <= 0 or not os.path.exists(log_file):
+        return []
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+    counts: Dict[str, int] = {}
+    latest: Dict[str, str] = {}
+
+    with open(log_file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > max_bytes:
+            f.seek(size - max_bytes)
+            # Skip the partial line at the seek position
+            f.readline()
+
+        for raw in f:
+            if b'"' + QUESTION_EVENT.encode() + b'"' not in raw:
+                continue
+            try:
+                entry = json.loads(raw)
+                asked_at = datetime.fromisoformat(entry["timestamp"])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+            question = entry.get("question")
+            if entry.get("event") != QUESTION_EVENT or not isinstance(question, str):
+                continue
+            if asked_at < cutoff or "question" in entry.get("truncated", []):
+                continue
+
+            key = normalize_question(question)
+            if not key:
+                continue
+            counts[key] = counts.get(key, 0) + 1
+            latest[key] = question.strip()
+
+    ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return [(latest[key], count) for key, count in ranked[:top_n]]
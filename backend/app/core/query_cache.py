@@ -0,0 +1,156 @@
+"""
+Query caches for the RAG Assistant.
+
+Popular questions are asked again and again, so their query embedding, their
+retrieval results and, if enabled, their answer are cached per process:
+
+- embeddings, keyed by the normalized question;
+- retrievals, keyed by the searched collection generation(s) and their index
+  versions, filters and question;
+- answers (QUERY_CACHE_ANSWERS), keyed by the question and the exact chunks
+  retrieved for it, so an answer is only reused for the same context.
+
+Each cache is a bounded LRU whose entries expire after QUERY_CACHE_TTL_SECONDS.
+Retrievals and answers are cleared when this process re-indexes or rolls back
+the knowledge base; writes by other processes change the index version, so
+their entries are simply no longer looked up. The caches are filled by traffic and, at startup, by the warm-up
+from the query logs (see prewarm.py).
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.logging.metrics import REGISTRY
+
+_lookups = REGISTRY.counter(
+    "query_cache_lookups_total", "Query cache lookups by cache and outcome (hit, miss)", ("cache", "outcome")
+)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalizes a question for cache keys: collapsed whitespace, case-folded.
+
+    Args:
+        question (str): The user's question.
+
+    Returns:
+        str: The cache key text.
+    """
+    return re.sub(r"\s+", " ", question).strip().casefold()
+
+
+class LRUCache:
+    """
+    A thread-safe LRU with per-entry expiry.
+
+    Attributes:
+        name (str): The cache name, for metrics.
+        max_entries (int): Most entries kept.
+        ttl (float): Seconds an entry stays valid.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key -> (value, stored at)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+        self._size = REGISTRY.gauge("query_cache_entries", "Entries in the query caches", ("cache",))
+        self._size.set(0, cache=name)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns a cached value, or None if absent or expired.
+        """
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        _lookups.inc(cache=self.name, outcome="hit" if entry is not None else "miss")
+        return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Stores a value, evicting the least recently used entries beyond max_entries.
+        """
+        with self.lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        self._size.set(size, cache=self.name)
+
+    def clear(self):
+        """
+        Drops every entry.
+        """
+        with self.lock:
+            self._entries.clear()
+        self._size.set(0, cache=self.name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class QueryCache:
+    """
+    The embedding, retrieval and answer caches of one process.
+
+    Attributes:
+        enabled (bool): Whether caching is on (QUERY_CACHE_ENABLED).
+        cache_answers (bool): Whether answers are cached too (QUERY_CACHE_ANSWERS).
+        embeddings (LRUCache): Normalized question -> query embedding.
+        retrievals (LRUCache): (scope, normalized question) -> search results.
+        answers (LRUCache): (normalized question, chunk IDs) -> answer and sources.
+    """
+
+    def __init__(self):
+        """
+        Initializes the caches with configuration from environment variables.
+        """
+        self.enabled = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_answers = os.getenv("QUERY_CACHE_ANSWERS", "false").lower() == "true"
+        max_entries = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1000"))
+        ttl = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+
+        self.embeddings = LRUCache("embedding", max_entries, ttl)
+        self.retrievals = LRUCache("retrieval", max_entries, ttl)
+        self.answers = LRUCache("answer", max_entries, ttl)
+
+    def clear(self):
+        """
+        Drops every cached retrieval and answer, e.g. after the index changed.
+
+        Embeddings only depend on the model and are kept.
+        """
+        self.retrievals.clear()
+        self.answers.clear()
+
+
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """
+    Returns the process-wide query cache.
+
+    Returns:
+        QueryCache: The shared instance.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache()
+        return _cache
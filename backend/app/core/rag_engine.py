@@ -5,14 +5,37 @@ This module encapsulates the main logic for document ingestion, vector search,
 and LLM-based answer generation. It acts as the bridge between the retrieval
 system (VectorDB) and the generation system (LLM).
 """
+import json
 import os
 import re
-from typing import Dict, List
-
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core import usage
+from app.core.checkpoint import IngestCheckpoint
+from app.core.intents import IntentRouter
 from app.core.llm import get_llm
 from app.core.prompts import SYSTEM_PROMPT
+from app.core.query_cache import get_query_cache, normalize_question
+from app.core.session_memory import get_session_memory
+from app.retrieval.aliases import new_generation_name
 from app.retrieval.vectordb import VectorDB
 from app.logging.logger import StructuredLogger
+from app.logging.tracing import stage
+
+KNOWLEDGE_BASE_PATH = "knowledge_base/raw"
+
+# Supported folders and their expected extensions
+SUPPORTED_TYPES = {
+    "txt": [".txt"],
+    "md": [".md"],
+    "pdf": [".pdf"]
+}
 
 
 def format_for_chat(answer: str) -> str:
@@ -78,126 +101,735 @@ class RAGEngine:
     def __init__(self):
         """
         Initializes the RAGEngine with an LLM instance, a VectorDB instance,
-        and a structured logger.
+        an intent router for canned small talk, and a structured logger.
         """
         self.llm = get_llm()
         self.vector_db = VectorDB()
+        self.intent_router = IntentRouter(self.vector_db.embeddings)
+        self.session_memory = get_session_memory()
+        self.query_cache = get_query_cache()
         self.logger = StructuredLogger(component="rag_engine")
+        # Serializes full ingestion runs and incremental re-indexing
+        self.ingest_lock = threading.Lock()
 
-    def ingest(self) -> Dict[str, int]:
+    @staticmethod
+    def discover_documents(root: str = KNOWLEDGE_BASE_PATH) -> List[Tuple[str, str]]:
         """
-        Loads local documents and indexes them in the vector database.
+        Lists the supported documents currently present in the raw knowledge base.
 
         Scans 'knowledge_base/raw/txt', 'knowledge_base/raw/md', and 'knowledge_base/raw/pdf'
-        for documents, reads their content, and adds them to ChromaDB.
+        and creates any missing folder so that later scans find it.
+
+        Args:
+            root (str): The knowledge base to scan, e.g. a tenant's folder.
 
         Returns:
-            Dict[str, int]: A dictionary with counts of 'documents' and 'chunks' processed.
+            List[Tuple[str, str]]: (folder, path) pairs for every supported file.
         """
-        base_path = "knowledge_base/raw"
-        total_docs = 0
-        total_chunks = 0
-        
-        # Define supported folders and their expected extensions
-        supported_types = {
-            "txt": [".txt"],
-            "md": [".md"],
-            "pdf": [".pdf"]
-        }
+        discovered = []
 
-        for folder, extensions in supported_types.items():
-            folder_path = os.path.join(base_path, folder)
+        for folder, extensions in SUPPORTED_TYPES.items():
+            folder_path = os.path.join(root, folder)
             if not os.path.exists(folder_path):
                 os.makedirs(folder_path, exist_ok=True)
                 continue
-                
-            for filename in os.listdir(folder_path):
+
+            for filename in sorted(os.listdir(folder_path)):
                 if any(filename.lower().endswith(ext) for ext in extensions):
-                    path = os.path.join(folder_path, filename)
-                    text = ""
-                    
-                    print(f"📄 Processing: {folder}/{filename}...", end=" ", flush=True)
+                    discovered.append((folder, os.path.join(folder_path, filename)))
+
+        return discovered
+
+    def load_document(self, folder: str, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads a single raw file and wraps it in the document shape used by VectorDB.
+
+        Text files are read whole into 'text'. PDFs are only read up to their first
+        page group with text here: their 'segments' is a generator of page groups
+        consumed lazily while indexing.
+
+        Args:
+            folder (str): The knowledge base folder the file lives in ('txt', 'md' or 'pdf').
+            path (str): The path to the file.
+
+        Returns:
+            Optional[Dict[str, Any]]: The document with 'id', 'metadata' and either
+                                      'text' or 'segments', or None if the file has no text.
+        """
+        filename = os.path.basename(path)
+        doc_data = {
+            "id": f"{folder}/{filename}",
+            "metadata": {
+                "source": filename,
+                "type": folder,
+                "path": path
+            },
+        }
+
+        if filename.lower().endswith(".pdf"):
+            # Streamed page groups; chunks get page_start / page_end metadata
+            from app.retrieval.extraction import iter_pdf_segments
+            segments = iter_pdf_segments(path)
+            first = next(segments, None)
+            if first is None:
+                # Empty or image-only PDF
+                return None
+            doc_data["segments"] = chain([first], segments)
+            return doc_data
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+
+        if not text:
+            return None
+
+        doc_data["text"] = text
+        return doc_data
+
+    def _load_for_indexing(
+        self,
+        folder: str,
+        path: str,
+        vector_db: VectorDB,
+        split: bool,
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Reads a document, optionally splits it, and times the work.
+
+        Args:
+            folder (str): The knowledge base folder the file lives in.
+            path (str): The path to the file.
+            vector_db (VectorDB): The database whose splitter chunks the document.
+            split (bool): If True, chunks the document here (see VectorDB.prepare_document).
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], float]: The document (or None if empty) and
+                                                    the seconds spent parsing it.
+        """
+        started = time.perf_counter()
+        doc_data = self.load_document(folder, path)
+        if doc_data and split:
+            doc_data = vector_db.prepare_document(doc_data)
+        return doc_data, time.perf_counter() - started
+
+    def _iter_loaded(
+        self,
+        files: List[Tuple[str, str]],
+        vector_db: VectorDB,
+        workers: int,
+    ) -> Iterator[Tuple[str, str, Callable[[], Tuple[Optional[Dict[str, Any]], float]]]]:
+        """
+        Yields files in order with a callable returning their loaded document.
+
+        With more than one worker, files are read and chunked on a thread pool a
+        bounded number of files ahead of the consumer, so parsing overlaps with
+        embedding without holding the whole knowledge base in memory.
+
+        Args:
+            files (List[Tuple[str, str]]): (folder, path) pairs to load.
+            vector_db (VectorDB): The database whose splitter chunks the documents.
+            workers (int): Number of loader threads; 1 loads inline.
+
+        Yields:
+            Tuple[str, str, Callable]: The folder, path and a callable that returns
+                                       (document, parse seconds) or raises the load error.
+        """
+        if workers <= 1:
+            for folder, path in files:
+                yield folder, path, partial(self._load_for_indexing, folder, path, vector_db, False)
+            return
+
+        window = deque()
+        pending = iter(files)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest-load") as executor:
+            try:
+                for folder, path in pending:
+                    window.append((folder, path, executor.submit(
+                        self._load_for_indexing, folder, path, vector_db, True
+                    )))
+                    if len(window) >= workers * 2:
+                        folder, path, future = window.popleft()
+                        yield folder, path, future.result
+                while window:
+                    folder, path, future = window.popleft()
+                    yield folder, path, future.result
+            finally:
+                # Cancelled or failed run: do not start the rest of the window
+                for _, _, future in window:
+                    future.cancel()
+
+    def ingest(
+        self,
+        progress: Optional[Callable[..., None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        vector_db: Optional[VectorDB] = None,
+        files: Optional[List[Tuple[str, str]]] = None,
+        workers: int = 1,
+        checkpoint: Optional[IngestCheckpoint] = None,
+        verbose: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Loads local documents and indexes them in the vector database.
+
+        Discovers every supported file first (unless a list is given), then reads
+        and indexes them in order. Progress is reported through the optional
+        callback as 'files_discovered', 'file_parsed' and 'file_embedded' events,
+        and the run stops between files once the optional cancel event is set.
+
+        Args:
+            progress (Callable, optional): Called as progress(event, **data) after each stage.
+            cancel_event (threading.Event, optional): Set to stop ingestion early.
+            vector_db (VectorDB, optional): The database to index into, defaults to the
+                                            serving one.
+            files (List[Tuple[str, str]], optional): (folder, path) pairs to ingest,
+                                                     defaults to discover_documents().
+            workers (int): Number of threads reading and chunking files ahead of the
+                           embedder. Embedding and storing stay sequential.
+            checkpoint (IngestCheckpoint, optional): Skips files it records as indexed
+                                                     and records each newly indexed file.
+            verbose (bool): If True, prints per-file and per-chunk progress.
+
+        Returns:
+            Dict[str, Any]: A dictionary with counts of 'documents' and 'chunks' processed,
+                            files 'skipped' by the checkpoint and 'failed' to load,
+                            whether the run was 'cancelled', and the 'stage_seconds'
+                            spent parsing, chunking, embedding and storing.
+
+        Raises:
+            ValueError: If the collection was chunked with other settings than the
+                        configured ones (see VectorDB.check_chunking).
+        """
+        vector_db = vector_db or self.vector_db
+        total_docs = 0
+        total_chunks = 0
+        failed = 0
+        cancelled = False
+        parse_seconds = 0.0
+
+        with self.ingest_lock:
+            # Refuse before any file is read if the collection was chunked differently
+            vector_db.check_chunking()
+            stages_before = dict(vector_db.stage_seconds)
+
+            files = self.discover_documents() if files is None else files
+            if checkpoint is not None:
+                remaining = [(folder, path) for folder, path in files if not checkpoint.is_done(path)]
+            else:
+                remaining = files
+            skipped = len(files) - len(remaining)
+            if progress:
+                progress("files_discovered", files=len(remaining), skipped=skipped)
+
+            loaded = self._iter_loaded(remaining, vector_db, workers)
+            try:
+                for folder, path, load in loaded:
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled = True
+                        break
+
+                    filename = os.path.basename(path)
+                    if verbose:
+                        print(f"📄 Processing: {folder}/{filename}...", end=" ", flush=True)
                     try:
-                        if filename.lower().endswith(".pdf"):
-                            from pypdf import PdfReader
-                            reader = PdfReader(path)
-                            for page in reader.pages:
-                                page_text = page.extract_text()
-                                if page_text:
-                                    text += page_text + "\n"
-                        else:
-                            with open(path, "r", encoding="utf-8") as f:
-                                text = f.read().strip()
-                        
-                        if text.strip():
-                            print("Done.")
-                            doc_data = {
-                                "id": f"{folder}/{filename}",
-                                "text": text,
-                                "metadata": {
-                                    "source": filename,
-                                    "type": folder,
-                                    "path": path
-                                },
-                            }
+                        doc_data, seconds = load()
+                        parse_seconds += seconds
+                        if progress:
+                            progress("file_parsed", file=path)
+
+                        if doc_data:
+                            if verbose:
+                                print("Done.")
                             # Index this document immediately to keep logs in order
-                            chunks = self.vector_db.add_documents([doc_data], verbose=True)
+                            chunks = vector_db.add_documents([doc_data], verbose=verbose)
                             total_docs += 1
                             total_chunks += chunks
-                        else:
+                            if progress:
+                                progress("file_embedded", file=path, chunks=chunks)
+                        elif verbose:
                             print("Skipped (Empty).")
+
+                        if checkpoint is not None:
+                            checkpoint.mark_done(path)
                     except Exception as e:
-                        print(f"Error: {str(e)}")
+                        failed += 1
+                        if verbose:
+                            print(f"Error: {str(e)}")
                         self.logger.event(
                             "document_load_error",
                             file=filename,
                             error=str(e)
                         )
+            finally:
+                loaded.close()
 
+            stage_seconds = {"parse": round(parse_seconds, 3)}
+            for stage_name, seconds in vector_db.stage_seconds.items():
+                stage_seconds[stage_name] = round(seconds - stages_before.get(stage_name, 0.0), 3)
+
+        self._index_changed()
         self.logger.event(
-            "ingestion_complete",
+            "ingestion_cancelled" if cancelled else "ingestion_complete",
             documents=total_docs,
             chunks=total_chunks,
+            skipped=skipped,
+            failed=failed,
+            workers=workers,
+            stage_seconds=stage_seconds,
+        )
+
+        return {
+            "documents": total_docs,
+            "chunks": total_chunks,
+            "skipped": skipped,
+            "failed": failed,
+            "cancelled": cancelled,
+            "stage_seconds": stage_seconds,
+        }
+
+    def reindex(
+        self,
+        progress: Optional[Callable[..., None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        vector_db: Optional[VectorDB] = None,
+        files: Optional[List[Tuple[str, str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rebuilds the whole index into a new collection generation and swaps it in.
+
+        The current generation keeps serving while the new one is built. The new
+        generation is verified (chunk count relative to the current one, and
+        sampled self-retrieval) before the alias is swapped atomically. The
+        replaced generation is kept for rollback(); the one before it is dropped.
+
+        Args:
+            progress (Callable, optional): Called as progress(event, **data) after each stage.
+            cancel_event (threading.Event, optional): Set to abandon the rebuild.
+            vector_db (VectorDB, optional): The collection to rebuild, defaults to the
+                                            serving one (e.g. a tenant's collection).
+            files (List[Tuple[str, str]], optional): (folder, path) pairs to index,
+                                                     defaults to discover_documents().
+
+        Returns:
+            Dict[str, Any]: Ingestion counts plus the 'collection' built, its
+                            'verification' results and whether it was 'swapped'.
+
+        Raises:
+            ValueError: If the collection name is too long to add a generation suffix.
+        """
+        vector_db = vector_db or self.vector_db
+        base_name = vector_db.collection_name
+        new_collection = new_generation_name(base_name)
+        target = VectorDB(collection_name=new_collection, embeddings=vector_db.embeddings)
+
+        self.logger.event("reindex_started", collection=base_name, new_collection=new_collection)
+        stats = self.ingest(progress=progress, cancel_event=cancel_event, vector_db=target, files=files)
+        stats["collection"] = new_collection
+        stats["swapped"] = False
+
+        if stats["cancelled"]:
+            vector_db.drop_collection(new_collection)
+            return stats
+
+        verification = target.verify()
+        current_count = vector_db.store.count()
+        min_ratio = float(os.getenv("REINDEX_MIN_COUNT_RATIO", "0.5"))
+        min_recall = float(os.getenv("REINDEX_MIN_SELF_RECALL", "0.8"))
+        verification["previous_count"] = current_count
+        verification["passed"] = (
+            verification["count"] > 0
+            and verification["count"] >= current_count * min_ratio
+            and verification["self_recall"] >= min_recall
+        )
+        stats["verification"] = verification
+
+        if not verification["passed"]:
+            self.logger.event("reindex_verification_failed", new_collection=new_collection, **verification)
+            vector_db.drop_collection(new_collection)
+            return stats
+
+        retired = vector_db.aliases.swap(base_name, new_collection)
+        self._index_changed()
+        stats["swapped"] = True
+        self.logger.event(
+            "reindex_swapped",
+            collection=base_name,
+            active_collection=new_collection,
+            retired_collection=retired,
+            **verification,
         )
 
-        return {"documents": total_docs, "chunks": total_chunks}
+        if retired and retired != new_collection:
+            vector_db.drop_collection(retired)
+
+        return stats
+
+    def rollback(self, vector_db: Optional[VectorDB] = None) -> str:
+        """
+        Reverts to the generation that was active before the last reindex swap.
+
+        Args:
+            vector_db (VectorDB, optional): The collection to roll back, defaults to
+                                            the serving one.
+
+        Returns:
+            str: The collection that is active after the rollback.
+
+        Raises:
+            ValueError: If there is no previous generation.
+        """
+        vector_db = vector_db or self.vector_db
+        active_collection = vector_db.aliases.rollback(vector_db.collection_name)
+        self._index_changed()
+        self.logger.event(
+            "reindex_rolled_back",
+            collection=vector_db.collection_name,
+            active_collection=active_collection,
+        )
+        return active_collection
+
+    def reindex_files(self, upserted: List[str], deleted: List[str]) -> Dict[str, int]:
+        """
+        Incrementally re-indexes individual files instead of rescanning the knowledge base.
+
+        Every chunk previously stored for an upserted or deleted path is removed first,
+        so modified files do not keep stale chunks, and upserted files are then read
+        and indexed again. Files whose near-duplicate chunks were linked to removed
+        chunks are re-indexed as well.
+
+        Args:
+            upserted (List[str]): Paths of added or modified files.
+            deleted (List[str]): Paths of removed files.
+
+        Returns:
+            Dict[str, int]: Counts of 'documents' indexed, 'chunks' added and 'deleted' files.
+
+        Raises:
+            ValueError: If the collection was chunked with other settings than the
+                        configured ones (see VectorDB.check_chunking).
+        """
+        total_docs = 0
+        total_chunks = 0
 
+        upserted = list(upserted)
+        with self.ingest_lock:
+            # Deleting first would drop files that can then not be indexed again
+            self.vector_db.check_chunking()
+            for path in deleted:
+                orphaned = self.vector_db.delete_by_path(path)
+                upserted.extend(p for p in orphaned if p not in upserted and p not in deleted)
+
+            for path in upserted:
+                folder = os.path.basename(os.path.dirname(path))
+                try:
+                    orphaned = self.vector_db.delete_by_path(path)
+                    upserted.extend(p for p in orphaned if p not in upserted and p not in deleted)
+                    doc_data = self.load_document(folder, path)
+                    if doc_data:
+                        total_chunks += self.vector_db.add_documents([doc_data])
+                        total_docs += 1
+                except Exception as e:
+                    self.logger.event(
+                        "document_load_error",
+                        file=os.path.basename(path),
+                        error=str(e)
+                    )
+
+        self._index_changed()
         self.logger.event(
-            "ingestion_complete",
-            documents=len(documents),
-            chunks=chunks,
+            "incremental_reindex_complete",
+            documents=total_docs,
+            chunks=total_chunks,
+            deleted=len(deleted),
         )
 
-        return {"documents": len(documents), "chunks": chunks}
+        return {"documents": total_docs, "chunks": total_chunks, "deleted": len(deleted)}
 
-    def query(self, question: str, session_id: str) -> Dict[str, List[str]]:
+    def query(
+        self,
+        question: str,
+        session_id: str,
+        vector_db: Optional[VectorDB] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, List[str]]:
         """
         Processes a user question and returns an AI-generated answer based on retrieved context.
 
         This method performs the following steps:
         1. Logs the query event.
-        2. Searches the vector database for context relevant to the question.
-        3. If no context is found, returns a standard "not found" message.
-        4. If context is found, formats a prompt and invokes the LLM.
-        5. Formats the LLM output and extracts source information.
-        6. Logs the completion event and returns the result.
+        2. Embeds the question and answers canned small-talk intents directly.
+        3. Searches the vector database for context relevant to the question, or
+           reuses the session's previous context for close follow-ups.
+        4. If no context is found, returns a standard "not found" message.
+        5. If context is found, formats a prompt and invokes the LLM.
+        6. Formats the LLM output and extracts source information.
+        7. Logs the completion event and returns the result.
 
         Args:
             question (str): The user's question.
             session_id (str): The ID of the current session for logging.
+            vector_db (VectorDB, optional): The collection to search, e.g. a tenant's
+                                            (or a FanoutVectorDB), defaults to the
+                                            serving one.
+            filters (Dict[str, Any], optional): Metadata filters pushed down into the
+                                                search (see facets.build_where).
 
         Returns:
             Dict[str, List[str]]: A dictionary containing the 'answer' and a list of 'sources'.
         """
+        vector_db = vector_db or self.vector_db
         self.logger.event(
             "user_question_received",
             session_id=session_id,
             question=question,
         )
 
+        # The search embedding doubles as the intent router's input
+        query_embedding = self._embed_question(vector_db, question)
+        with stage("intent"):
+            intent = self.intent_router.match(question, query_embedding)
+        if intent is not None:
+            return self._intent_answer(session_id, *intent)
+
+        # Follow-ups close to the previous question reuse (or extend) its context
+        scope = self._retrieval_scope(vector_db, filters)
+        outcome, previous, similarity = self.session_memory.lookup(session_id, scope, query_embedding)
+        if outcome == "reuse":
+            results = previous
+        else:
+            results = self._search(vector_db, scope, question, session_id, query_embedding, filters)
+            if outcome == "extend":
+                results = self.session_memory.extend(results, previous)
+
+        if similarity is not None:
+            self.logger.event(
+                "session_retrieval_lookup",
+                session_id=session_id,
+                outcome=outcome,
+                similarity=similarity,
+                chunks=len(results["ids"]),
+            )
+        self.session_memory.remember(session_id, scope, query_embedding, results)
+
+        return self._answer(question, session_id, results, scope)
+
+    def _index_changed(self):
+        """
+        Drops cached retrievals and answers and remembered session context
+        after this process changed the index.
+        """
+        self.query_cache.clear()
+        self.session_memory.clear()
+
+    @staticmethod
+    def _retrieval_scope(vector_db: VectorDB, filters: Optional[Dict[str, Any]]) -> str:
+        """
+        Identifies what a search ran over, so session memory and cached retrievals
+        are only reused for the same collection generation(s), contents and filters.
+
+        The collections' aliases are followed and their index versions re-read
+        first, so a generation swapped in or chunks ingested by another process
+        change the scope before the first search on them.
+        """
+        collections = [db.index_version() for db in getattr(vector_db, "vector_dbs", [vector_db])]
+        return json.dumps([collections, filters or {}], sort_keys=True)
+
+    def _embed_question(self, vector_db: VectorDB, question: str) -> List[float]:
+        """
+        Embeds a question for search, through the query embedding cache.
+        """
+        if not self.query_cache.enabled:
+            with stage("embed"):
+                return vector_db.embed_queries([question])[0]
+
+        key = normalize_question(question)
+        embedding = self.query_cache.embeddings.get(key)
+        if embedding is None:
+            with stage("embed"):
+                embedding = vector_db.embed_queries([question])[0]
+            self.query_cache.embeddings.put(key, embedding)
+        return embedding
+
+    def _search(
+        self,
+        vector_db: VectorDB,
+        scope: str,
+        question: str,
+        session_id: Optional[str],
+        query_embedding: List[float],
+        filters: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Searches for a question's context, through the retrieval cache.
+        """
+        key = (scope, normalize_question(question))
+        if self.query_cache.enabled:
+            results = self.query_cache.retrievals.get(key)
+            if results is not None:
+                return results
+
         self.logger.event("rag_search_started", session_id=session_id)
-        results = self.vector_db.search(question, session_id=session_id)
-        
+        with stage("search"):
+            results = vector_db.search(
+                question,
+                session_id=session_id,
+                query_embedding=query_embedding,
+                filters=filters,
+            )
+        if self.query_cache.enabled:
+            self.query_cache.retrievals.put(key, results)
+        return results
+
+    def warm_query(self, question: str, with_answer: bool = False) -> bool:
+        """
+        Fills the query caches for a question on the serving collection, unfiltered.
+
+        Args:
+            question (str): A frequently asked question.
+            with_answer (bool): Also generate and cache its answer (an LLM call,
+                                logged under the 'warmup' session).
+
+        Returns:
+            bool: False if the question is small talk, which needs no retrieval.
+        """
+        query_embedding = self._embed_question(self.vector_db, question)
+        if self.intent_router.match(question, query_embedding) is not None:
+            return False
+
+        scope = self._retrieval_scope(self.vector_db, None)
+        results = self._search(self.vector_db, scope, question, None, query_embedding, None)
+        if with_answer and results["documents"]:
+            self._answer(question, "warmup", results, scope)
+        return True
+
+    def query_batch(
+        self,
+        questions: List[str],
+        session_ids: List[str],
+        max_concurrency: Optional[int] = None,
+        vector_db: Optional[VectorDB] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Answers several questions with one retrieval pass and concurrent LLM calls.
+
+        All questions are embedded together; canned small-talk intents are answered
+        directly and the rest are searched together (see VectorDB.search_batch).
+        The LLM calls then run on a bounded thread pool. A failing item does not fail
+        the batch: its result carries an 'error' instead of an answer.
+
+        Args:
+            questions (List[str]): The user questions.
+            session_ids (List[str]): One session ID per question, for logging.
+            max_concurrency (int, optional): Concurrent LLM calls, defaults to CHAT_BATCH_CONCURRENCY;
+                                             values below 1 are raised to 1.
+            vector_db (VectorDB, optional): The collection to search, defaults to the serving one.
+            filters (Dict[str, Any], optional): Metadata filters applied to every question.
+
+        Returns:
+            List[Dict[str, Any]]: Per question, in order: 'answer', 'sources', 'error' and
+                                  'timings' ('retrieval_ms' shared by the batch, 'llm_ms').
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+        # ThreadPoolExecutor rejects max_workers < 1
+        max_concurrency = max(max_concurrency, 1)
+        vector_db = vector_db or self.vector_db
+
+        for question, session_id in zip(questions, session_ids):
+            self.logger.event(
+                "user_question_received",
+                session_id=session_id,
+                question=question,
+            )
+
+        started = time.perf_counter()
+        query_embeddings = vector_db.embed_queries(questions)
+        intents = self.intent_router.match_batch(questions, query_embeddings)
+
+        # Only questions without a canned intent go to retrieval
+        searched = [i for i, intent in enumerate(intents) if intent is None]
+        for i in searched:
+            self.logger.event("rag_search_started", session_id=session_ids[i])
+
+        scope = self._retrieval_scope(vector_db, filters)
+        search_timings: Dict[str, float] = {}
+        results: Dict[int, Dict[str, Any]] = {}
+        if searched:
+            batch_results = vector_db.search_batch(
+                [questions[i] for i in searched],
+                timings=search_timings,
+                query_embeddings=[query_embeddings[i] for i in searched],
+                filters=filters,
+            )
+            results = dict(zip(searched, batch_results))
+        retrieval_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        def answer(index: int) -> Dict[str, Any]:
+            item_started = time.perf_counter()
+            try:
+                if intents[index] is not None:
+                    item = self._intent_answer(session_ids[index], *intents[index])
+                else:
+                    item = self._answer(questions[index], session_ids[index], results[index], scope)
+                item["error"] = None
+            except Exception as e:
+                self.logger.event("batch_item_failed", session_id=session_ids[index], error=str(e))
+                item = {"answer": "", "sources": [], "error": str(e)}
+            item["timings"] = {
+                **search_timings,
+                "retrieval_ms": retrieval_ms,
+                "llm_ms": round((time.perf_counter() - item_started) * 1000, 2),
+            }
+            return item
+
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="chat-batch") as executor:
+            return list(executor.map(answer, range(len(questions))))
+
+    def _intent_answer(self, session_id: str, intent: str, similarity: float) -> Dict[str, Any]:
+        """
+        Answers a question matched to a canned intent without retrieval or the LLM.
+
+        Args:
+            session_id (str): The ID of the current session for logging.
+            intent (str): The matched intent.
+            similarity (float): The cosine similarity to the closest exemplar.
+
+        Returns:
+            Dict[str, Any]: The templated 'answer', no 'sources', and the 'intent'.
+        """
+        answer = self.intent_router.response(intent)
+        self.logger.event(
+            "intent_matched",
+            session_id=session_id,
+            intent=intent,
+            similarity=similarity,
+        )
+        self.logger.event(
+            "answer_generated",
+            session_id=session_id,
+            sources=[],
+            full_answer=answer,
+        )
+        self.logger.event(
+            "bot_waiting_for_input",
+            session_id=session_id,
+        )
+        return {"answer": answer, "sources": [], "intent": intent}
+
+    def _answer(self, question: str, session_id: str, results: Dict[str, Any], scope: str) -> Dict[str, Any]:
+        """
+        Generates the answer for a question from its retrieved context.
+
+        Args:
+            question (str): The user's question.
+            session_id (str): The ID of the current session for logging.
+            results (Dict[str, Any]): The question's VectorDB search results.
+            scope (str): The searched collection(s) and filters (see _retrieval_scope);
+                         cached answers are never shared across scopes, e.g. tenants.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the 'answer' and a list of 'sources'.
+        """
         if not results["documents"]:
             self.logger.event(
                 "no_context_found",
@@ -217,18 +849,48 @@ class RAGEngine:
             chunks=results["documents"],
         )
 
+        # The same question over the same chunks of the same collection gets the same answer
+        cache_answers = self.query_cache.enabled and self.query_cache.cache_answers
+        answer_key = (scope, normalize_question(question), tuple(results["ids"]))
+        if cache_answers:
+            cached = self.query_cache.answers.get(answer_key)
+            if cached is not None:
+                self.logger.event(
+                    "answer_generated",
+                    session_id=session_id,
+                    sources=cached["sources"],
+                    full_answer=cached["answer"],
+                    cached=True,
+                )
+                self.logger.event("bot_waiting_for_input", session_id=session_id)
+                return dict(cached)
+
         prompt = SYSTEM_PROMPT.format(
             context=context,
             question=question,
         )
 
         self.logger.event("llm_invocation_started", session_id=session_id)
-        response = self.llm.invoke(prompt)
+        started = time.perf_counter()
+        with stage("llm"):
+            response = self.llm.invoke(prompt)
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
 
         raw_answer = response.content.strip()
+        provider = getattr(self.llm, "provider", "unknown")
+        self.logger.event(
+            "llm_usage",
+            session_id=session_id,
+            provider=provider,
+            latency_ms=latency_ms,
+            **usage.account(provider, context, question, raw_answer, response),
+        )
+
         answer = format_for_chat(raw_answer)
+        # Near-duplicate chunks are stored once but attributed to every source
         sources = list(
             {meta["source"] for meta in results["metadatas"]}
+            | {s for meta in results["metadatas"] for s in meta.get("duplicate_sources", [])}
         )
 
         self.logger.event(
@@ -243,4 +905,6 @@ class RAGEngine:
             session_id=session_id,
         )
 
+        if cache_answers:
+            self.query_cache.answers.put(answer_key, {"answer": answer, "sources": sources})
         return {"answer": answer, "sources": sources}
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Startup warm-up and readiness tracking for the RAG Assistant.
+
+The embedding model is loaded when the API modules are imported, but its first
+inference and the vector store's first query (e.g. Chroma loading its HNSW
+index from disk) are still slow. This module pays those costs on a background
+thread right after startup, records how long each component took cold and
+warm, and backs the /health/ready probe so a load balancer only routes traffic
+to instances that have finished warming up. /health itself stays a plain
+liveness check.
+
+Once the vector store is warm, the query caches are pre-filled with the most
+frequent recent questions from the query log (see prewarm.py), so the first
+users after a restart do not all pay for cold embeddings and searches.
+"""
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.prewarm import top_questions
+from app.logging.logger import StructuredLogger
+
+WARMUP_TEXT = "What topics are covered in the knowledge base?"
+
+
+class ReadinessTracker:
+    """
+    Warms up a RAG engine and reports per-component readiness.
+
+    Attributes:
+        rag_engine (RAGEngine): The engine serving chat requests.
+        enabled (bool): Whether warm-up runs at all (WARMUP_ENABLED).
+        warmup_queries (int): Warm calls per component after the cold one (WARMUP_QUERIES).
+        top_queries (int): Logged questions pre-cached at startup, 0 to skip (WARMUP_TOP_QUERIES).
+        query_window_hours (float): How far back questions are mined (WARMUP_QUERY_WINDOW_HOURS).
+        warm_answers (bool): Whether their answers are pre-generated too (WARMUP_ANSWERS,
+                             effective with QUERY_CACHE_ANSWERS).
+        components (Dict[str, Dict[str, Any]]): Component name -> 'status'
+            ('pending', 'warming', 'ready', 'failed' or 'skipped'), 'cold_ms',
+            'warm_ms' and 'error'.
+        logger (StructuredLogger): Logger for warm-up events.
+    """
+
+    COMPONENTS = ("embedder", "vector_store", "query_cache")
+
+    def __init__(self, rag_engine, warmup_queries: Optional[int] = None):
+        """
+        Initializes the tracker with configuration from environment variables.
+
+        Args:
+            rag_engine (RAGEngine): The engine serving chat requests.
+            warmup_queries (int, optional): Warm calls per component, defaults to WARMUP_QUERIES.
+        """
+        self.rag_engine = rag_engine
+        self.enabled = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+        self.warmup_queries = warmup_queries if warmup_queries is not None else int(
+            os.getenv("WARMUP_QUERIES", "3")
+        )
+        self.top_queries = int(os.getenv("WARMUP_TOP_QUERIES", "50"))
+        self.query_window_hours = float(os.getenv("WARMUP_QUERY_WINDOW_HOURS", "168"))
+        self.warm_answers = os.getenv("WARMUP_ANSWERS", "false").lower() == "true"
+        self.logger = StructuredLogger(component="readiness")
+
+        initial = "pending" if self.enabled else "skipped"
+        self.components: Dict[str, Dict[str, Any]] = {
+            name: {"status": initial, "cold_ms": None, "warm_ms": None, "error": None}
+            for name in self.COMPONENTS
+        }
+        query_cache = getattr(rag_engine, "query_cache", None)
+        if self.top_queries <= 0 or query_cache is None or not query_cache.enabled:
+            self.components["query_cache"]["status"] = "skipped"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether every component is warm (or warm-up is disabled).
+        """
+        return all(c["status"] in ("ready", "skipped") for c in self.components.values())
+
+    def start(self):
+        """
+        Starts the warm-up on a background daemon thread.
+        """
+        if not self.enabled or self._thread is not None:
+            return
+
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _time_calls(self, name: str, call):
+        """
+        Runs a call once cold and warmup_queries times warm, recording latencies.
+
+        Args:
+            name (str): The component being warmed.
+            call (Callable): The operation to warm up.
+
+        Returns:
+            Any: The result of the cold call.
+        """
+        component = self.components[name]
+        component["status"] = "warming"
+
+        started = time.perf_counter()
+        result = call()
+        component["cold_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        timings = []
+        for _ in range(self.warmup_queries):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        if timings:
+            component["warm_ms"] = round(statistics.median(timings), 2)
+
+        component["status"] = "ready"
+        return result
+
+    def _run(self):
+        """
+        Thread target that warms each component in dependency order.
+        """
+        self.started_at = time.time()
+        vector_db = self.rag_engine.vector_db
+        query_embedding = None
+
+        try:
+            query_embedding = self._time_calls(
+                "embedder", lambda: vector_db.embeddings.embed_query(WARMUP_TEXT)
+            )
+            # Batch inference takes a different path from single queries
+            vector_db.embeddings.embed_documents([WARMUP_TEXT] * 2)
+            intent_router = getattr(self.rag_engine, "intent_router", None)
+            if intent_router is not None and intent_router.enabled:
+                intent_router.prepare()
+        except Exception as e:
+            self.components["embedder"].update(status="failed", error=str(e))
+
+        try:
+            if query_embedding is None:
+                raise RuntimeError("Embedder is not available")
+
+            vector_db._follow_alias()
+            store = vector_db.store
+            count = store.count()
+            self.components["vector_store"]["count"] = count
+            if count:
+                self._time_calls(
+                    "vector_store",
+                    lambda: store.query(query_embeddings=[query_embedding], n_results=min(3, count)),
+                )
+            else:
+                # Nothing to load yet; an empty index is trivially warm
+                self.components["vector_store"]["status"] = "ready"
+        except Exception as e:
+            self.components["vector_store"].update(status="failed", error=str(e))
+
+        if self.components["query_cache"]["status"] != "skipped":
+            try:
+                if self.components["vector_store"]["status"] != "ready":
+                    raise RuntimeError("Vector store is not available")
+                self._warm_query_cache()
+            except Exception as e:
+                self.components["query_cache"].update(status="failed", error=str(e))
+
+        self.finished_at = time.time()
+        self.logger.event(
+            "warmup_complete" if self.ready else "warmup_failed",
+            seconds=round(self.finished_at - self.started_at, 2),
+            components=self.components,
+        )
+
+    def _warm_query_cache(self):
+        """
+        Pre-caches the most frequent recent questions from the query log.
+
+        A question that fails to warm is counted and skipped; it does not keep
+        the instance from becoming ready.
+        """
+        component = self.components["query_cache"]
+        component["status"] = "warming"
+
+        started = time.perf_counter()
+        questions = top_questions(self.top_queries, self.query_window_hours)
+        with_answer = self.warm_answers and self.rag_engine.query_cache.cache_answers
+
+        warmed = failed = 0
+        for question, _ in questions:
+            try:
+                if self.rag_engine.warm_query(question, with_answer=with_answer):
+                    warmed += 1
+            except Exception:
+                failed += 1
+
+        component.update(
+            status="ready",
+            cold_ms=round((time.perf_counter() - started) * 1000, 2),
+            questions=len(questions),
+            warmed=warmed,
+            failed=failed,
+            answers=with_answer,
+        )
+
+    def probe(self) -> Dict[str, float]:
+        """
+        Measures the current latency of an embed and a search.
+
+        Returns:
+            Dict[str, float]: 'embed_ms' and 'search_ms' for one warm call each.
+        """
+        vector_db = self.rag_engine.vector_db
+
+        started = time.perf_counter()
+        query_embedding = vector_db.embeddings.embed_query(WARMUP_TEXT)
+        embedded = time.perf_counter()
+
+        store = vector_db.store
+        count = store.count()
+        if count:
+            store.query(query_embeddings=[query_embedding], n_results=min(3, count))
+        searched = time.perf_counter()
+
+        return {
+            "embed_ms": round((embedded - started) * 1000, 2),
+            "search_ms": round((searched - embedded) * 1000, 2),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serializes the readiness state returned by /health/ready.
+
+        Returns:
+            Dict[str, Any]: Overall 'status' ('ready', 'warming' or 'failed'),
+                            per-component state and warm-up duration.
+        """
+        warmup_seconds = None
+        if self.started_at and self.finished_at:
+            warmup_seconds = round(self.finished_at - self.started_at, 2)
+
+        if self.ready:
+            status = "ready"
+        elif any(c["status"] == "failed" for c in self.components.values()):
+            status = "failed"
+        else:
+            status = "warming"
+
+        return {
+            "status": status,
+            "service": "rag-assistant",
+            "warmup_seconds": warmup_seconds,
+            "components": self.components,
+        }
@@ -0,0 +1,181 @@
+"""
+Retries with jittered backoff and a global retry budget.
+
+Retrying every failed LLM call multiplies load on a provider that is already
+struggling. Retries here are capped per call and, across the whole process,
+by a retry budget: each call earns a fraction of a retry token and each retry
+spends a whole one, so retries stay a bounded share of traffic during an
+outage while a trickle is always allowed.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from app.logging.metrics import REGISTRY
+
+# 409 Conflict is left out: the same request conflicts again
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Transport errors surface under different classes per provider SDK
+RETRYABLE_NAME_HINTS = ("Timeout", "Connect", "Connection", "Unavailable", "DeadlineExceeded", "ResourceExhausted")
+
+_retries = REGISTRY.counter("llm_retries_total", "LLM call retries attempted", ("provider",))
+_budget_exhausted = REGISTRY.counter(
+    "llm_retry_budget_exhausted_total", "LLM retries skipped because the retry budget was empty", ("provider",)
+)
+
+
+class RetryBudget:
+    """
+    A process-wide allowance of retries relative to calls.
+
+    Attributes:
+        ratio (float): Retry tokens earned per call (LLM_RETRY_BUDGET_RATIO).
+        min_per_second (float): Tokens earned per second regardless of traffic
+                                (LLM_RETRY_BUDGET_MIN_PER_SECOND).
+        max_balance (float): Most tokens that can be saved up.
+        balance (float): Tokens currently available.
+    """
+
+    def __init__(
+        self,
+        ratio: Optional[float] = None,
+        min_per_second: Optional[float] = None,
+        max_balance: float = 10.0,
+    ):
+        self.ratio = ratio if ratio is not None else float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.1"))
+        self.min_per_second = min_per_second if min_per_second is not None else float(
+            os.getenv("LLM_RETRY_BUDGET_MIN_PER_SECOND", "0.2")
+        )
+        self.max_balance = max_balance
+        self.balance = max_balance
+        self.lock = threading.Lock()
+        self._updated = time.monotonic()
+
+        REGISTRY.gauge("llm_retry_budget_balance", "Retry tokens available", function=lambda: self.balance)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.max_balance, self.balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_call(self):
+        """
+        Credits the budget for one first attempt.
+        """
+        with self.lock:
+            self._refill()
+            self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        Takes one retry token if available.
+
+        Returns:
+            bool: True if the retry may proceed.
+        """
+        with self.lock:
+            self._refill()
+            if self.balance >= 1.0:
+                self.balance -= 1.0
+                return True
+            return False
+
+
+_budget: Optional[RetryBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_retry_budget() -> RetryBudget:
+    """
+    Returns the process-wide retry budget.
+
+    Returns:
+        RetryBudget: The shared instance.
+    """
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = RetryBudget()
+        return _budget
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether an error is transient: a timeout, a connection failure, or a
+    throttling or server-side status code.
+
+    Args:
+        error (Exception): The error raised by a provider call.
+
+    Returns:
+        bool: True if retrying may succeed.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS_CODES
+    return any(hint in type(error).__name__ for hint in RETRYABLE_NAME_HINTS)
+
+
+def _retry_after(error: Exception) -> float:
+    """
+    Reads a numeric Retry-After header from an error's HTTP response, if any.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after", 0)) if headers else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def call_with_retries(
+    call: Callable[[], Any],
+    provider: str,
+    max_retries: Optional[int] = None,
+    base_delay: Optional[float] = None,
+    max_delay: Optional[float] = None,
+    budget: Optional[RetryBudget] = None,
+) -> Any:
+    """
+    Calls a function, retrying transient errors with full-jitter exponential backoff.
+
+    Args:
+        call (Callable): The operation to run.
+        provider (str): The provider name, for metrics.
+        max_retries (int, optional): Retries per call, defaults to LLM_MAX_RETRIES.
+        base_delay (float, optional): First backoff ceiling, defaults to LLM_RETRY_BASE_DELAY.
+        max_delay (float, optional): Largest backoff, defaults to LLM_RETRY_MAX_DELAY.
+        budget (RetryBudget, optional): Defaults to the process-wide budget.
+
+    Returns:
+        Any: The call's result.
+
+    Raises:
+        Exception: The last error, if it is not retryable or retries are exhausted.
+    """
+    max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "2"))
+    base_delay = base_delay if base_delay is not None else float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    max_delay = max_delay if max_delay is not None else float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+    budget = budget or get_retry_budget()
+
+    budget.record_call()
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            if not budget.try_spend():
+                _budget_exhausted.inc(provider=provider)
+                raise
+
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            delay = min(max_delay, max(delay, _retry_after(e)))
+            attempt += 1
+            _retries.inc(provider=provider)
+            time.sleep(delay)
@@ -0,0 +1,193 @@
+"""
+Per-session retrieval memory for conversational follow-ups.
+
+Follow-ups such as "tell me more" or "and the second point?" carry little
+meaning of their own, so a fresh search for them often retrieves worse context
+than the previous turn did. This module remembers each session's last
+retrieval: the query embedding and the chunks it returned. When a new question
+embeds close to the previous one (cosine similarity of at least
+SESSION_REUSE_THRESHOLD) the previous context is reused without searching;
+when it is moderately close (SESSION_EXTEND_THRESHOLD) the new search results
+are extended with the previous turn's chunks. Outcomes and similarities are
+exported as metrics so the thresholds can be tuned against real traffic.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.logging.metrics import REGISTRY
+
+SIMILARITY_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.0)
+
+
+class SessionRetrievalMemory:
+    """
+    The last retrieval of each recent session, in a bounded LRU with a TTL.
+
+    Attributes:
+        enabled (bool): Whether follow-up reuse is on (SESSION_REUSE_ENABLED).
+        reuse_threshold (float): Similarity at or above which the previous context
+                                 is reused as is (SESSION_REUSE_THRESHOLD).
+        extend_threshold (float): Similarity at or above which new results are
+                                  extended with the previous context (SESSION_EXTEND_THRESHOLD).
+        max_chunks (int): Most chunks in an extended context (SESSION_CONTEXT_MAX_CHUNKS).
+        ttl (float): Seconds after which a session's memory expires (SESSION_MEMORY_TTL_SECONDS).
+        max_sessions (int): Sessions remembered at once (SESSION_MEMORY_MAX_SESSIONS).
+    """
+
+    def __init__(self):
+        """
+        Initializes the memory with configuration from environment variables.
+        """
+        self.enabled = os.getenv("SESSION_REUSE_ENABLED", "true").lower() == "true"
+        self.reuse_threshold = float(os.getenv("SESSION_REUSE_THRESHOLD", "0.9"))
+        self.extend_threshold = float(os.getenv("SESSION_EXTEND_THRESHOLD", "0.75"))
+        self.max_chunks = int(os.getenv("SESSION_CONTEXT_MAX_CHUNKS", "5"))
+        self.ttl = float(os.getenv("SESSION_MEMORY_TTL_SECONDS", "1800"))
+        self.max_sessions = int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "10000"))
+
+        self.lock = threading.Lock()
+        # session_id -> (scope, normalized query embedding, results, stored at)
+        self._turns: "OrderedDict[str, Tuple[str, np.ndarray, Dict[str, Any], float]]" = OrderedDict()
+
+        self._lookups = REGISTRY.counter(
+            "session_retrieval_lookups_total",
+            "Retrievals by follow-up outcome (reuse, extend, miss, cold)",
+            ("outcome",),
+        )
+        self._similarity = REGISTRY.histogram(
+            "session_followup_similarity",
+            "Cosine similarity between a question and the previous turn's query",
+            buckets=SIMILARITY_BUCKETS,
+        )
+        REGISTRY.gauge(
+            "session_retrieval_memory_sessions", "Sessions with a remembered retrieval",
+            function=lambda: len(self._turns),
+        )
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) + 1e-12)
+
+    def lookup(
+        self,
+        session_id: str,
+        scope: str,
+        query_embedding: List[float],
+    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[float]]:
+        """
+        Compares a question with the session's previous retrieval.
+
+        Args:
+            session_id (str): The session ID.
+            scope (str): Identifies the searched collection(s) and filters; memory
+                         from a different scope is never reused.
+            query_embedding (List[float]): The new question's search embedding.
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]], Optional[float]]: The outcome
+                ('reuse', 'extend', 'miss', or 'cold' when there is nothing to
+                compare with), the previous search results for 'reuse' and
+                'extend', and the similarity if one was computed.
+        """
+        if not self.enabled:
+            return "cold", None, None
+
+        with self.lock:
+            turn = self._turns.get(session_id)
+            if turn is not None and time.monotonic() - turn[3] > self.ttl:
+                del self._turns[session_id]
+                turn = None
+
+        if turn is None or turn[0] != scope:
+            self._lookups.inc(outcome="cold")
+            return "cold", None, None
+
+        similarity = round(float(self._normalize(query_embedding) @ turn[1]), 4)
+        self._similarity.observe(similarity)
+        if similarity >= self.reuse_threshold:
+            outcome = "reuse"
+        elif similarity >= self.extend_threshold:
+            outcome = "extend"
+        else:
+            outcome = "miss"
+        self._lookups.inc(outcome=outcome)
+        return outcome, (turn[2] if outcome != "miss" else None), similarity
+
+    def remember(
+        self,
+        session_id: str,
+        scope: str,
+        query_embedding: List[float],
+        results: Dict[str, Any],
+    ):
+        """
+        Records a session's latest retrieval.
+
+        Args:
+            session_id (str): The session ID.
+            scope (str): See lookup().
+            query_embedding (List[float]): The question's search embedding.
+            results (Dict[str, Any]): The context used to answer it.
+        """
+        if not self.enabled or not results.get("ids"):
+            return
+        with self.lock:
+            self._turns.pop(session_id, None)
+            self._turns[session_id] = (scope, self._normalize(query_embedding), results, time.monotonic())
+            while len(self._turns) > self.max_sessions:
+                self._turns.popitem(last=False)
+
+    def clear(self):
+        """
+        Forgets every session's retrieval, e.g. after the index changed, so no
+        reused context cites chunks that were deleted or replaced.
+        """
+        with self.lock:
+            self._turns.clear()
+
+    def extend(self, results: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adds the previous turn's chunks after the new results, without duplicates.
+
+        Args:
+            results (Dict[str, Any]): The new search results.
+            previous (Dict[str, Any]): The previous turn's context.
+
+        Returns:
+            Dict[str, Any]: The combined results, at most max_chunks long.
+        """
+        combined = {key: list(results[key]) for key in ("ids", "documents", "metadatas", "distances")}
+        seen = set(combined["ids"])
+        for i, chunk_id in enumerate(previous["ids"]):
+            if len(combined["ids"]) >= self.max_chunks:
+                break
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            for key in combined:
+                combined[key].append(previous[key][i])
+        return combined
+
+
+_memory: Optional[SessionRetrievalMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_session_memory() -> SessionRetrievalMemory:
+    """
+    Returns the process-wide session retrieval memory.
+
+    Returns:
+        SessionRetrievalMemory: The shared instance.
+    """
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = SessionRetrievalMemory()
+        return _memory
@@ -0,0 +1,373 @@
+"""
+Multi-tenant knowledge bases for the RAG Assistant.
+
+Each tenant, selected per request with the X-Tenant-ID header, gets its own
+collection ('<CHROMA_COLLECTION_NAME>__<tenant>') and its own knowledge base
+folder, so customers never see each other's documents. Requests without the
+header keep using the default collection. Only the tenants listed in TENANTS
+are accepted, so a client cannot create collections by sending new IDs.
+
+Tenant collections are opened on demand and kept in a bounded LRU of open
+handles (TENANT_MAX_OPEN_COLLECTIONS); the least recently used idle handle is
+released when the limit is exceeded, so the number of tenants a deployment
+serves is not bounded by memory. Handles in use by a request or ingestion job
+are pinned and never evicted. With TENANT_FANOUT_ENABLED, a comma-separated
+header searches several tenants in parallel and merges the top-k by distance.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.logging.logger import StructuredLogger
+from app.logging.metrics import REGISTRY
+from app.retrieval.aliases import GENERATION_SUFFIX_LENGTH, MAX_COLLECTION_NAME_LENGTH
+from app.retrieval.vectordb import VectorDB
+
+# Letters, digits, '-' and '_', starting and ending with a letter or digit as
+# Chroma requires of collection names (the tenant ID ends the name)
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9_-]*[A-Za-z0-9])?$")
+
+
+def max_tenant_id_length() -> int:
+    """
+    Returns the longest tenant ID whose reindex generations still fit in a
+    Chroma collection name ('<base>__<tenant>' plus the generation suffix).
+    """
+    base = os.getenv("CHROMA_COLLECTION_NAME", "rag_docs")
+    return MAX_COLLECTION_NAME_LENGTH - GENERATION_SUFFIX_LENGTH - len(base) - len("__")
+
+
+def parse_tenants(header: Optional[str]) -> List[str]:
+    """
+    Parses and validates an X-Tenant-ID header value.
+
+    Args:
+        header (str, optional): One tenant ID, or several separated by commas.
+
+    Returns:
+        List[str]: The distinct tenant IDs, in order; empty for the default collection.
+
+    Raises:
+        ValueError: If an ID is malformed, too long for a collection name, or not
+                    listed in TENANTS (with TENANTS empty, every ID is rejected).
+    """
+    if not header or not header.strip():
+        return []
+
+    max_length = max_tenant_id_length()
+    allowed = {t.strip() for t in os.getenv("TENANTS", "").split(",") if t.strip()}
+    if not allowed:
+        # Every new ID would get its own collection and knowledge base folder
+        raise ValueError("Tenants are not enabled: list the tenant IDs in TENANTS")
+    tenants: List[str] = []
+    for tenant in header.split(","):
+        tenant = tenant.strip()
+        if not TENANT_ID_PATTERN.match(tenant):
+            raise ValueError(f"Invalid tenant ID: {tenant!r}")
+        if len(tenant) > max_length:
+            raise ValueError(f"Tenant ID is longer than {max_length} characters: {tenant!r}")
+        if tenant not in allowed:
+            raise ValueError(f"Unknown tenant: {tenant}")
+        if tenant not in tenants:
+            tenants.append(tenant)
+    return tenants
+
+
+def tenant_collection(tenant: str) -> str:
+    """
+    Returns the logical collection name of a tenant.
+    """
+    return f"{os.getenv('CHROMA_COLLECTION_NAME', 'rag_docs')}__{tenant}"
+
+
+def tenant_knowledge_base(tenant: str) -> str:
+    """
+    Returns a tenant's raw knowledge base folder (with txt/, md/ and pdf/ inside).
+    """
+    return os.path.join(os.getenv("TENANT_KNOWLEDGE_BASE_PATH", "knowledge_base/tenants"), tenant)
+
+
+class FanoutVectorDB:
+    """
+    Searches several tenant collections in parallel as if they were one.
+
+    Provides the search side of VectorDB (embed_queries, search, search_batch),
+    so RAGEngine can answer from it unchanged. Queries are embedded once, every
+    collection is queried with the same embeddings, and each query's hits are
+    merged by distance. Merged metadata carries the 'tenant' it came from.
+
+    Attributes:
+        tenants (List[str]): The tenants searched.
+        vector_dbs (List[VectorDB]): Their open handles, in the same order.
+        embeddings (Embeddings): The shared embedding model.
+    """
+
+    def __init__(self, tenants: List[str], vector_dbs: List[VectorDB]):
+        self.tenants = tenants
+        self.vector_dbs = vector_dbs
+        self.embeddings = vector_dbs[0].embeddings
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        return self.vector_dbs[0].embed_queries(queries)
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 3,
+        session_id: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Searches every tenant for one query; see VectorDB.search().
+        """
+        return self.search_batch(
+            [query],
+            n_results=n_results,
+            session_id=session_id,
+            query_embeddings=[query_embedding] if query_embedding is not None else None,
+            filters=filters,
+        )[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        session_id: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Searches every tenant in parallel and keeps the n_results closest hits per query.
+
+        Args:
+            queries (List[str]): The search queries.
+            n_results (int): The number of merged results to return per query.
+            session_id (str, optional): The session ID for logging.
+            timings (Dict[str, float], optional): Filled with 'embed_ms' and 'query_ms'
+                                                  (the slowest collection's wall time).
+            query_embeddings (List[List[float]], optional): Precomputed query embeddings.
+            filters (Dict[str, Any], optional): Metadata filters, applied in every collection.
+
+        Returns:
+            List[Dict[str, Any]]: One merged search result per query, in order.
+        """
+        started = time.perf_counter()
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        embedded = time.perf_counter()
+
+        def search_one(vector_db: VectorDB) -> List[Dict[str, Any]]:
+            return vector_db.search_batch(
+                queries,
+                n_results=n_results,
+                session_id=session_id,
+                query_embeddings=query_embeddings,
+                filters=filters,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(self.vector_dbs), thread_name_prefix="tenant-fanout") as executor:
+            per_tenant = list(executor.map(search_one, self.vector_dbs))
+
+        if timings is not None:
+            timings["embed_ms"] = round((embedded - started) * 1000, 2)
+            timings["query_ms"] = round((time.perf_counter() - embedded) * 1000, 2)
+
+        merged = []
+        for q in range(len(queries)):
+            hits = [
+                (distance, tenant, chunk_id, document, metadata)
+                for tenant, results in zip(self.tenants, per_tenant)
+                for chunk_id, document, metadata, distance in zip(
+                    results[q]["ids"],
+                    results[q]["documents"],
+                    results[q]["metadatas"],
+                    results[q]["distances"],
+                )
+            ]
+            hits.sort(key=lambda hit: hit[0])
+            hits = hits[:n_results]
+            merged.append({
+                "ids": [hit[2] for hit in hits],
+                "documents": [hit[3] for hit in hits],
+                "metadatas": [{**hit[4], "tenant": hit[1]} for hit in hits],
+                "distances": [hit[0] for hit in hits],
+            })
+        return merged
+
+
+    def facet_counts(self) -> Dict[str, Any]:
+        """
+        Sums the filter values and chunk counts of every tenant.
+
+        Returns:
+            Dict[str, Any]: See FacetIndex.counts().
+        """
+        merged: Dict[str, Any] = {"sources": {}, "types": {}, "paths": {}, "documents": 0, "chunks": 0}
+        for vector_db in self.vector_dbs:
+            counts = vector_db.facet_counts()
+            for facet in ("sources", "types", "paths"):
+                for value, chunks in counts[facet].items():
+                    merged[facet][value] = merged[facet].get(value, 0) + chunks
+            merged["documents"] += counts["documents"]
+            merged["chunks"] += counts["chunks"]
+        return merged
+
+
+class TenantRegistry:
+    """
+    A bounded LRU of open tenant collections.
+
+    Attributes:
+        max_open (int): Idle handles kept open (TENANT_MAX_OPEN_COLLECTIONS).
+        fanout_enabled (bool): Whether several tenants may be searched at once
+                               (TENANT_FANOUT_ENABLED).
+        fanout_max (int): Most tenants one fan-out request may search (TENANT_FANOUT_MAX).
+    """
+
+    def __init__(self, max_open: Optional[int] = None):
+        """
+        Initializes the registry with configuration from environment variables.
+
+        Args:
+            max_open (int, optional): Handle limit, defaults to TENANT_MAX_OPEN_COLLECTIONS.
+        """
+        self.max_open = max_open or int(os.getenv("TENANT_MAX_OPEN_COLLECTIONS", "16"))
+        self.fanout_enabled = os.getenv("TENANT_FANOUT_ENABLED", "false").lower() == "true"
+        self.fanout_max = int(os.getenv("TENANT_FANOUT_MAX", "8"))
+        self.logger = StructuredLogger(component="tenants")
+
+        self.lock = threading.Lock()
+        # tenant -> [VectorDB, pins]
+        self._handles: "OrderedDict[str, List[Any]]" = OrderedDict()
+
+        REGISTRY.gauge(
+            "tenant_open_collections", "Tenant collections currently open", function=lambda: len(self._handles)
+        )
+        self._opened = REGISTRY.counter("tenant_collection_opens_total", "Tenant collections opened")
+        self._evicted = REGISTRY.counter(
+            "tenant_collection_evictions_total", "Idle tenant collections released by the LRU"
+        )
+
+    def _acquire(self, tenant: str, default: VectorDB) -> VectorDB:
+        """
+        Opens (or reuses) a tenant's handle and pins it.
+        """
+        with self.lock:
+            handle = self._handles.pop(tenant, None)
+            if handle is None:
+                handle = [VectorDB(collection_name=tenant_collection(tenant), embeddings=default.embeddings), 0]
+                self._opened.inc()
+                self.logger.event("tenant_collection_opened", tenant=tenant, open=len(self._handles) + 1)
+            handle[1] += 1
+            self._handles[tenant] = handle
+            self._evict_locked()
+            return handle[0]
+
+    def _release(self, tenant: str):
+        """
+        Unpins a tenant's handle, evicting idle handles beyond the limit.
+        """
+        with self.lock:
+            handle = self._handles.get(tenant)
+            if handle is not None:
+                handle[1] -= 1
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """
+        Closes least recently used idle handles until at most max_open remain.
+
+        Pinned handles are skipped, so the limit can be exceeded temporarily.
+        """
+        excess = len(self._handles) - self.max_open
+        if excess <= 0:
+            return
+        for tenant, (vector_db, pins) in list(self._handles.items()):
+            if excess <= 0:
+                break
+            if pins > 0:
+                continue
+            del self._handles[tenant]
+            vector_db.close()
+            excess -= 1
+            self._evicted.inc()
+            self.logger.event("tenant_collection_evicted", tenant=tenant)
+
+    def check(self, tenants: List[str]):
+        """
+        Validates the number of tenants one request may search.
+
+        Args:
+            tenants (List[str]): Tenant IDs from parse_tenants().
+
+        Raises:
+            ValueError: If several tenants are given and fan-out is disabled or over
+                        TENANT_FANOUT_MAX.
+        """
+        if len(tenants) > 1:
+            if not self.fanout_enabled:
+                raise ValueError("Searching several tenants requires TENANT_FANOUT_ENABLED=true")
+            if len(tenants) > self.fanout_max:
+                raise ValueError(f"At most {self.fanout_max} tenants per request")
+
+    @contextmanager
+    def open(self, tenants: List[str], default: VectorDB) -> Iterator[Any]:
+        """
+        Pins the collections a request uses for its duration.
+
+        Args:
+            tenants (List[str]): Tenant IDs from parse_tenants(); empty for the default.
+            default (VectorDB): The default collection, whose embedding model the
+                                tenant handles share.
+
+        Yields:
+            VectorDB | FanoutVectorDB: The default collection, one tenant's collection,
+                                       or a fan-out over several.
+
+        Raises:
+            ValueError: If the tenants fail check().
+        """
+        if not tenants:
+            yield default
+            return
+
+        self.check(tenants)
+
+        acquired: List[str] = []
+        try:
+            vector_dbs = []
+            for tenant in tenants:
+                vector_dbs.append(self._acquire(tenant, default))
+                acquired.append(tenant)
+            yield vector_dbs[0] if len(vector_dbs) == 1 else FanoutVectorDB(tenants, vector_dbs)
+        finally:
+            for tenant in acquired:
+                self._release(tenant)
+
+
+_registry: Optional[TenantRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tenant_registry() -> TenantRegistry:
+    """
+    Returns the process-wide tenant registry.
+
+    One registry per process keeps a single open instance per tenant collection,
+    which every RAG engine shares.
+
+    Returns:
+        TenantRegistry: The shared instance.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TenantRegistry()
+        return _registry
@@ -0,0 +1,183 @@
+"""
+Token and cost accounting for LLM calls.
+
+Each answer's prompt is split into its parts (the system prompt template, the
+retrieved context and the question) and counted, so context size can be tuned
+against latency and spend. Prompt and completion totals come from the provider
+response's usage metadata when it is present, and from a local tokenizer
+estimate otherwise. Totals are exported per provider through the metrics
+registry; per-session totals are derived from the 'llm_usage' log events.
+"""
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.core.prompts import SYSTEM_PROMPT
+from app.logging.metrics import REGISTRY
+
+_tokens = REGISTRY.counter(
+    "llm_tokens_total", "LLM tokens used, by provider and kind", ("provider", "kind")
+)
+_prompt_part_tokens = REGISTRY.counter(
+    "llm_prompt_part_tokens_total",
+    "Estimated prompt tokens by part (system, context, question)",
+    ("provider", "part"),
+)
+_cost = REGISTRY.counter("llm_cost_usd_total", "Estimated LLM spend in USD", ("provider",))
+_usage_source = REGISTRY.counter(
+    "llm_usage_source_total",
+    "LLM calls by where their token counts came from (provider or estimate)",
+    ("provider", "source"),
+)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """
+    Loads the tiktoken encoding used for estimates, or None if unavailable.
+    """
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding(os.getenv("TOKEN_ESTIMATE_ENCODING", "cl100k_base"))
+            except Exception:
+                # Not installed, or the encoding file cannot be downloaded
+                _encoding = None
+        return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a text.
+
+    Uses tiktoken when it is available, otherwise about four characters per token.
+
+    Args:
+        text (str): The text to count.
+
+    Returns:
+        int: The estimated token count.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, round(len(text) / 4))
+
+
+def provider_usage(response: Any) -> Optional[Dict[str, int]]:
+    """
+    Reads prompt and completion token counts from an LLM response, if reported.
+
+    LangChain normalizes usage into 'usage_metadata'; older integrations only
+    put the provider's raw fields into 'response_metadata'.
+
+    Args:
+        response (AIMessage): The chat model's response.
+
+    Returns:
+        Optional[Dict[str, int]]: 'prompt_tokens' and 'completion_tokens', or None.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("input_tokens") is not None:
+        return {
+            "prompt_tokens": int(usage["input_tokens"]),
+            "completion_tokens": int(usage.get("output_tokens") or 0),
+        }
+
+    metadata = getattr(response, "response_metadata", None) or {}
+    raw = metadata.get("token_usage") or metadata.get("usage") or metadata.get("usage_metadata")
+    if isinstance(raw, dict):
+        prompt = raw.get("prompt_tokens", raw.get("input_tokens", raw.get("prompt_token_count")))
+        completion = raw.get(
+            "completion_tokens", raw.get("output_tokens", raw.get("candidates_token_count"))
+        )
+        if prompt is not None:
+            return {"prompt_tokens": int(prompt), "completion_tokens": int(completion or 0)}
+    return None
+
+
+@lru_cache(maxsize=1)
+def system_prompt_tokens() -> int:
+    """
+    Estimates the tokens of the prompt template without context or question.
+
+    Returns:
+        int: The fixed per-call prompt overhead.
+    """
+    return estimate_tokens(SYSTEM_PROMPT.format(context="", question=""))
+
+
+def _price_per_token(kind: str) -> float:
+    """
+    Reads the USD price per token of a kind ('prompt' or 'completion').
+    """
+    return float(os.getenv(f"LLM_{kind.upper()}_COST_PER_1M", "0")) / 1_000_000
+
+
+def account(
+    provider: str,
+    context: str,
+    question: str,
+    answer: str,
+    response: Any = None,
+) -> Dict[str, Any]:
+    """
+    Counts the tokens and cost of one LLM call and records them in the metrics.
+
+    Args:
+        provider (str): The provider name, e.g. 'openai'.
+        context (str): The retrieved context inserted into the prompt.
+        question (str): The user's question.
+        answer (str): The model's answer text.
+        response (AIMessage, optional): The raw response, for provider-reported usage.
+
+    Returns:
+        Dict[str, Any]: Prompt, completion and total tokens, the estimated prompt
+                        split into system/context/question tokens, the 'source'
+                        of the totals ('provider' or 'estimate') and 'cost_usd'.
+    """
+    context_tokens = estimate_tokens(context)
+    question_tokens = estimate_tokens(question)
+    system_tokens = system_prompt_tokens()
+
+    reported = provider_usage(response) if response is not None else None
+    if reported is not None:
+        prompt_tokens = reported["prompt_tokens"]
+        completion_tokens = reported["completion_tokens"]
+        source = "provider"
+    else:
+        prompt_tokens = system_tokens + context_tokens + question_tokens
+        completion_tokens = estimate_tokens(answer)
+        source = "estimate"
+
+    cost = prompt_tokens * _price_per_token("prompt") + completion_tokens * _price_per_token("completion")
+
+    _tokens.inc(prompt_tokens, provider=provider, kind="prompt")
+    _tokens.inc(completion_tokens, provider=provider, kind="completion")
+    _prompt_part_tokens.inc(system_tokens, provider=provider, part="system")
+    _prompt_part_tokens.inc(context_tokens, provider=provider, part="context")
+    _prompt_part_tokens.inc(question_tokens, provider=provider, part="question")
+    _usage_source.inc(provider=provider, source=source)
+    if cost:
+        _cost.inc(cost, provider=provider)
+
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "system_tokens": system_tokens,
+        "context_tokens": context_tokens,
+        "question_tokens": question_tokens,
+        "source": source,
+        "cost_usd": round(cost, 6),
+    }
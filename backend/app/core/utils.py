@@ -18,7 +18,7 @@ def is_greeting(text: str) -> bool:
     if not text:
         return False
 
-    normalized = text.strip().lower()
+    normalized = text.strip().lower().rstrip("!.?, ")
 
     greetings = {
         "hi",
@@ -0,0 +1,193 @@
+"""
+Knowledge base watcher for the RAG Assistant.
+
+This module polls 'knowledge_base/raw' for added, modified and deleted files and
+re-indexes only the affected documents. Polling (rather than OS file events)
+keeps it portable across platforms, containers and network filesystems. Bursts
+of changes are debounced so a file that is still being written, or a folder
+that is being copied in, is indexed once after it settles.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.rag_engine import KNOWLEDGE_BASE_PATH, SUPPORTED_TYPES
+from app.logging.logger import StructuredLogger
+
+
+class KnowledgeBaseWatcher:
+    """
+    Polls the raw knowledge base and incrementally re-indexes changed files.
+
+    Attributes:
+        rag_engine (RAGEngine): The engine used to re-index changed files.
+        interval (float): Seconds between polls.
+        debounce (float): Seconds without new changes before pending changes are indexed.
+        snapshot (Dict[str, Tuple[int, int]]): Last seen (mtime_ns, size) per file path.
+        pending (Dict[str, str]): Changed paths waiting to be indexed, mapped to
+                                  'upsert' or 'delete'.
+        logger (StructuredLogger): Logger for watcher events.
+    """
+
+    def __init__(
+        self,
+        rag_engine,
+        interval: Optional[float] = None,
+        debounce: Optional[float] = None,
+    ):
+        """
+        Initializes the watcher with configuration from environment variables.
+
+        Args:
+            rag_engine (RAGEngine): The engine used to re-index changed files.
+            interval (float, optional): Poll interval, defaults to KB_WATCH_INTERVAL.
+            debounce (float, optional): Debounce window, defaults to KB_WATCH_DEBOUNCE.
+        """
+        self.rag_engine = rag_engine
+        self.interval = interval if interval is not None else float(
+            os.getenv("KB_WATCH_INTERVAL", "2")
+        )
+        self.debounce = debounce if debounce is not None else float(
+            os.getenv("KB_WATCH_DEBOUNCE", "3")
+        )
+        self.logger = StructuredLogger(component="watcher")
+
+        self.snapshot: Dict[str, Tuple[int, int]] = {}
+        self.pending: Dict[str, str] = {}
+        self._last_change = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Stats every supported file in the knowledge base.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: (mtime_ns, size) for each file path.
+        """
+        snapshot = {}
+        for folder, extensions in SUPPORTED_TYPES.items():
+            folder_path = os.path.join(KNOWLEDGE_BASE_PATH, folder)
+            if not os.path.isdir(folder_path):
+                continue
+
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    if not any(entry.name.lower().endswith(ext) for ext in extensions):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    path = os.path.join(folder_path, entry.name)
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Optional[Dict[str, int]]:
+        """
+        Runs one poll cycle: records changes and flushes them once debounced.
+
+        Returns:
+            Optional[Dict[str, int]]: Re-index stats if pending changes were flushed.
+        """
+        current = self.scan()
+        now = time.monotonic()
+
+        changed = False
+        for path, signature in current.items():
+            if self.snapshot.get(path) != signature:
+                self.pending[path] = "upsert"
+                changed = True
+        for path in self.snapshot.keys() - current.keys():
+            self.pending[path] = "delete"
+            changed = True
+
+        self.snapshot = current
+        if changed:
+            self._last_change = now
+
+        if self.pending and now - self._last_change >= self.debounce:
+            return self.flush()
+        return None
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Re-indexes all pending changes and clears the pending set.
+
+        If re-indexing fails, the changes are put back (behind any newer change
+        to the same path) and retried after another debounce window, since the
+        snapshot has already moved past them.
+
+        Returns:
+            Dict[str, int]: The stats returned by RAGEngine.reindex_files().
+
+        Raises:
+            Exception: Whatever RAGEngine.reindex_files() raised.
+        """
+        pending, self.pending = self.pending, {}
+        upserted = [p for p, kind in pending.items() if kind == "upsert"]
+        deleted = [p for p, kind in pending.items() if kind == "delete"]
+
+        started = time.monotonic()
+        try:
+            stats = self.rag_engine.reindex_files(upserted, deleted)
+        except Exception:
+            for path, kind in pending.items():
+                self.pending.setdefault(path, kind)
+            self._last_change = time.monotonic()
+            raise
+
+        self.logger.event(
+            "watcher_changes_indexed",
+            upserted=len(upserted),
+            deleted=len(deleted),
+            chunks=stats["chunks"],
+            duration_ms=round((time.monotonic() - started) * 1000, 1),
+        )
+        return stats
+
+    def start(self):
+        """
+        Takes a baseline snapshot and starts polling on a background thread.
+
+        The baseline is assumed to be indexed already (run a full ingest first);
+        only changes made after the watcher starts are indexed.
+        """
+        if self._thread is not None:
+            return
+
+        self.snapshot = self.scan()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+        self._thread.start()
+
+        self.logger.event(
+            "watcher_started",
+            files=len(self.snapshot),
+            interval=self.interval,
+            debounce=self.debounce,
+        )
+
+    def stop(self):
+        """
+        Stops the polling thread and waits for the current cycle to finish.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.logger.event("watcher_stopped")
+
+    def _run(self):
+        """
+        Thread target that polls until stop() is called.
+        """
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.logger.event("watcher_error", error=str(e))
@@ -4,12 +4,67 @@ Structured logging module for the RAG Assistant.
 This module provides a JSON-based structured logger that writes log events
 to component-specific files in JSON Lines (.jsonl) format. This is useful
 for both debugging and building analytics.
+
+Verbosity is configured through environment variables: events below LOG_LEVEL
+are dropped before serialization, long strings and lists are capped, and only
+a deterministic sample of sessions keeps full payloads (retrieved chunks,
+answers, questions).
 """
 import json
 import os
 import threading
+import zlib
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+
+from app.logging.tracing import stage
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Default level of events that are not 'info'; override with LOG_EVENT_LEVELS
+DEFAULT_EVENT_LEVELS = {
+    "rag_search_started": "debug",
+    "search_initiated": "debug",
+    "llm_invocation_started": "debug",
+    "request_rejected": "warning",
+    "reindex_verification_failed": "error",
+    "batch_item_failed": "error",
+    "watcher_error": "error",
+    "slow_query": "warning",
+    "chunking_fallback": "warning",
+}
+
+
+def _parse_event_levels(spec: str) -> Dict[str, int]:
+    """
+    Parses LOG_EVENT_LEVELS, e.g. 'context_retrieved=debug,search_completed=warning'.
+    """
+    levels = {event: LEVELS[level] for event, level in DEFAULT_EVENT_LEVELS.items()}
+    for item in spec.split(","):
+        event, _, level = item.partition("=")
+        if event.strip() and level.strip().lower() in LEVELS:
+            levels[event.strip()] = LEVELS[level.strip().lower()]
+    return levels
+
+
+def session_sampled(session_id: Optional[str], rate: float) -> bool:
+    """
+    Deterministically decides whether a session is in the full-payload sample.
+
+    The same session ID is always in or out of the sample, in every process.
+
+    Args:
+        session_id (str, optional): The session ID.
+        rate (float): The fraction of sessions to sample, from 0 to 1.
+
+    Returns:
+        bool: True if the session's events keep full payloads.
+    """
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0 or not session_id:
+        return False
+    return zlib.crc32(session_id.encode("utf-8")) % 10000 < rate * 10000
 
 
 class StructuredLogger:
@@ -25,6 +80,12 @@ class StructuredLogger:
         log_dir (str): The directory where log files are stored.
         log_file (str): The path to the specific log file for this component.
         tz (timezone): The timezone used for timestamps (default is UTC+5:30).
+        level (int): Events below this level are dropped (LOG_LEVEL).
+        event_levels (Dict[str, int]): Per-event levels (LOG_EVENT_LEVELS).
+        max_field_chars (int): Longer strings are truncated, 0 for no limit (LOG_MAX_FIELD_CHARS).
+        max_list_items (int): Longer lists are truncated, 0 for no limit (LOG_MAX_LIST_ITEMS).
+        full_payload_rate (float): Fraction of sessions whose events are never
+                                   truncated (LOG_FULL_PAYLOAD_SAMPLE_RATE).
     """
 
     def __init__(self, component: str):
@@ -48,6 +109,73 @@ class StructuredLogger:
 
         self.tz = timezone(timedelta(hours=5, minutes=30))
 
+        self.level = LEVELS.get(os.getenv("LOG_LEVEL", "info").lower(), LEVELS["info"])
+        self.event_levels = _parse_event_levels(os.getenv("LOG_EVENT_LEVELS", ""))
+        self.max_field_chars = int(os.getenv("LOG_MAX_FIELD_CHARS", "0"))
+        self.max_list_items = int(os.getenv("LOG_MAX_LIST_ITEMS", "0"))
+        self.full_payload_rate = float(os.getenv("LOG_FULL_PAYLOAD_SAMPLE_RATE", "1.0"))
+
+    def enabled_for(self, event: str) -> bool:
+        """
+        Whether an event is at or above the configured log level.
+
+        Args:
+            event (str): The event name.
+
+        Returns:
+            bool: True if the event would be written.
+        """
+        return self.event_levels.get(event, LEVELS["info"]) >= self.level
+
+    def _truncate(self, value: Any) -> Any:
+        """
+        Caps the length of strings and lists, recursively.
+
+        Returns:
+            Any: The value itself if nothing was cut, otherwise a truncated copy.
+        """
+        if isinstance(value, str):
+            if self.max_field_chars and len(value) > self.max_field_chars:
+                hidden = len(value) - self.max_field_chars
+                return f"{value[:self.max_field_chars]}... [+{hidden} chars]"
+            return value
+        if isinstance(value, (list, tuple)):
+            items = [self._truncate(item) for item in value[:self.max_list_items or None]]
+            if len(items) < len(value):
+                items.append(f"... [+{len(value) - len(items)} items]")
+            elif all(new is old for new, old in zip(items, value)):
+                return value
+            return items
+        if isinstance(value, dict):
+            limited = {key: self._truncate(item) for key, item in value.items()}
+            if all(limited[key] is item for key, item in value.items()):
+                return value
+            return limited
+        return value
+
+    def _limit_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Truncates an event's fields unless its session is in the full-payload sample.
+
+        Returns:
+            Dict[str, Any]: The fields to log, with a 'truncated' list naming any
+                            fields that were cut.
+        """
+        if not (self.max_field_chars or self.max_list_items):
+            return data
+        if session_sampled(data.get("session_id"), self.full_payload_rate):
+            return data
+
+        limited: Dict[str, Any] = {}
+        truncated: List[str] = []
+        for key, value in data.items():
+            limited[key] = self._truncate(value)
+            if limited[key] is not value:
+                truncated.append(key)
+        if truncated:
+            limited["truncated"] = truncated
+        return limited
+
     def _timestamp(self) -> str:
         """
         Generates an ISO 8601 timestamp with millisecond precision in the local timezone.
@@ -63,20 +191,27 @@ class StructuredLogger:
 
         The event is formatted as a JSON object containing the timestamp,
         component name, event name, and any additional key-value pairs provided.
+        Events below the configured level are skipped, and long fields are
+        truncated unless the session is sampled for full payloads. Within a
+        traced request, the write is timed as its 'log' stage.
 
         Args:
             event (str): The name of the event being logged.
             **data: Additional key-value pairs to include in the log entry.
         """
-        payload = {
-            "timestamp": self._timestamp(),
-            "component": self.component,
-            "event": event,
-            **data,
-        }
-
-        line = json.dumps(payload, ensure_ascii=False)
-
-        with self.lock:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
\ No newline at end of file
+        if not self.enabled_for(event):
+            return
+
+        with stage("log"):
+            payload = {
+                "timestamp": self._timestamp(),
+                "component": self.component,
+                "event": event,
+                **self._limit_payload(data),
+            }
+
+            line = json.dumps(payload, ensure_ascii=False)
+
+            with self.lock:
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
\ No newline at end of file
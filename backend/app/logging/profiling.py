@@ -0,0 +1,205 @@
+"""
+Opt-in request profiling and slow-query capture for the RAG Assistant.
+
+Every /chat request is traced with per-stage timings (see tracing.py): queue
+wait, embedding, vector search, LLM call and log writes. Requests slower than
+SLOW_QUERY_THRESHOLD_MS are written to 'backend/logs/profiling.jsonl' as
+'slow_query' events with their stage breakdown, so p99 outliers can be
+explained after the fact without reproducing them.
+
+A request can additionally run under cProfile, either because it sent an
+'X-Profile: true' header (honoured only when PROFILING_ENABLED is true) or
+because it was picked by PROFILE_SAMPLE_RATE. The stats are saved under
+'backend/logs/profiles/<profile_id>.prof' for `python -m pstats` or snakeviz.
+Before Python 3.12 cProfile only sees the handling thread. From 3.12 it runs
+on sys.monitoring, which is process-wide, so a profile also holds whatever
+other threads (concurrent requests, ingestion) ran meanwhile; the
+'request_profiled' event records this as its 'scope'. One request is
+profiled at a time per process; a request asking while another is profiled
+is only traced.
+"""
+import cProfile
+import glob
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from app.logging.logger import StructuredLogger
+from app.logging.metrics import REGISTRY
+from app.logging.tracing import RequestTrace, traced
+
+# What a profile covers: cProfile is built on process-wide sys.monitoring from 3.12
+PROFILE_SCOPE = "process" if sys.version_info >= (3, 12) else "thread"
+
+_profiler: Optional["RequestProfiler"] = None
+_profiler_lock = threading.Lock()
+
+_request_seconds = REGISTRY.histogram(
+    "request_seconds", "End-to-end request latency", ("endpoint",)
+)
+_stage_seconds = REGISTRY.histogram(
+    "request_stage_seconds", "Time requests spend in each stage", ("endpoint", "stage")
+)
+_slow_requests = REGISTRY.counter(
+    "slow_requests_total", "Requests slower than SLOW_QUERY_THRESHOLD_MS", ("endpoint",)
+)
+_profiled_requests = REGISTRY.counter(
+    "profiled_requests_total", "Requests run under the profiler", ("endpoint",)
+)
+
+
+class RequestProfiler:
+    """
+    Traces requests, captures slow ones and profiles the ones asked for.
+
+    Attributes:
+        header_enabled (bool): Whether the X-Profile header is honoured (PROFILING_ENABLED).
+        sample_rate (float): Fraction of requests profiled anyway (PROFILE_SAMPLE_RATE).
+        slow_threshold_ms (float): Requests at least this slow are recorded, 0 to
+                                   disable (SLOW_QUERY_THRESHOLD_MS).
+        profile_dir (str): Where profiles are saved (PROFILE_DIR).
+        max_profiles (int): Newest profiles kept on disk (PROFILE_MAX_FILES).
+        logger (StructuredLogger): Logger for slow queries and saved profiles.
+    """
+
+    def __init__(self):
+        self.header_enabled = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.slow_threshold_ms = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "5000"))
+        self.profile_dir = os.getenv("PROFILE_DIR", os.path.join(os.path.abspath("backend"), "logs", "profiles"))
+        self.max_profiles = int(os.getenv("PROFILE_MAX_FILES", "200"))
+        self.logger = StructuredLogger(component="profiling")
+        # cProfile can only profile one request at a time
+        self.profile_slot = threading.Lock()
+
+    def wants_profile(self, requested: bool) -> bool:
+        """
+        Whether a request should run under the profiler.
+
+        Args:
+            requested (bool): The request sent 'X-Profile: true'.
+
+        Returns:
+            bool: True if the header is honoured and set, or the request is sampled.
+        """
+        if requested and self.header_enabled:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def request(self, endpoint: str, profile: bool = False, **fields: Any) -> Iterator[RequestTrace]:
+        """
+        Traces one request, profiling it if asked, and records it if it was slow.
+
+        Args:
+            endpoint (str): The endpoint name, e.g. 'chat'.
+            profile (bool): The request sent 'X-Profile: true'.
+            **fields: Request details recorded with a slow query, e.g. the session ID.
+
+        Yields:
+            RequestTrace: The request's trace; its 'profile_id' field is set when profiled.
+        """
+        with traced() as trace:
+            trace.fields.update(fields)
+            profiler = self._start_profile(trace) if self.wants_profile(profile) else None
+            try:
+                yield trace
+            except Exception as e:
+                trace.fields["error"] = type(e).__name__
+                status_code = getattr(e, "status_code", None)
+                if status_code is not None:
+                    trace.fields["status_code"] = status_code
+                raise
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    self.profile_slot.release()
+                # Snapshot before our own log writes add to the 'log' stage
+                timings = trace.timings_ms()
+                stages, counts = dict(trace.stages), dict(trace.counts)
+                if profiler is not None:
+                    self._save_profile(endpoint, profiler, trace, timings)
+                self._record(endpoint, trace, stages, counts, timings)
+
+    def _start_profile(self, trace: RequestTrace) -> Optional[cProfile.Profile]:
+        """
+        Enables cProfile, unless another request holds it.
+
+        Before Python 3.12 only the current thread is profiled; from 3.12 every
+        thread of the process is (see PROFILE_SCOPE).
+        """
+        if not self.profile_slot.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler or debugger is already attached
+            self.profile_slot.release()
+            return None
+        trace.fields["profile_id"] = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        return profiler
+
+    def _save_profile(self, endpoint: str, profiler: cProfile.Profile, trace: RequestTrace, timings: dict):
+        """
+        Writes a request's stats to PROFILE_DIR and deletes the oldest beyond PROFILE_MAX_FILES.
+        """
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{trace.fields['profile_id']}.prof")
+        profiler.dump_stats(path)
+        _profiled_requests.inc(endpoint=endpoint)
+
+        profiles = sorted(glob.glob(os.path.join(self.profile_dir, "*.prof")), key=os.path.getmtime)
+        for old in profiles[:max(len(profiles) - self.max_profiles, 0)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+        self.logger.event(
+            "request_profiled",
+            endpoint=endpoint,
+            path=path,
+            scope=PROFILE_SCOPE,
+            timings=timings,
+            **trace.fields,
+        )
+
+    def _record(self, endpoint: str, trace: RequestTrace, stages: dict, counts: dict, timings: dict):
+        """
+        Exports a request's latency metrics and logs it if it was slow.
+        """
+        total = timings["total_ms"] / 1000
+        _request_seconds.observe(total, endpoint=endpoint)
+        for stage_name, seconds in stages.items():
+            _stage_seconds.observe(seconds, endpoint=endpoint, stage=stage_name)
+
+        if self.slow_threshold_ms and timings["total_ms"] >= self.slow_threshold_ms:
+            _slow_requests.inc(endpoint=endpoint)
+            self.logger.event(
+                "slow_query",
+                endpoint=endpoint,
+                threshold_ms=self.slow_threshold_ms,
+                timings=timings,
+                stage_calls=counts,
+                **trace.fields,
+            )
+
+
+def get_request_profiler() -> RequestProfiler:
+    """
+    Returns the process-wide request profiler.
+
+    Returns:
+        RequestProfiler: The shared profiler.
+    """
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = RequestProfiler()
+        return _profiler
@@ -0,0 +1,130 @@
+"""
+Per-request stage timings for the RAG Assistant.
+
+A RequestTrace is bound to the handling thread's context for the duration of
+one request. Code on the request path wraps its expensive steps in
+stage("embed"), stage("search"), stage("llm") and so on; outside a traced
+request, stage() is a no-op that costs one context-variable lookup.
+
+Stage times are exclusive: a stage nested in another (e.g. a log write during
+a search) is subtracted from its parent, so the stages and the untracked
+remainder add up to the request's total.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+_current: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """
+    Accumulates the time one request spends in each stage.
+
+    Attributes:
+        started (float): perf_counter() when the request began.
+        stages (Dict[str, float]): Exclusive seconds per stage.
+        counts (Dict[str, int]): Times each stage was entered.
+        fields (Dict[str, Any]): Request details recorded with the timings,
+                                 e.g. the session ID or a profile ID.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.fields: Dict[str, Any] = {}
+        # Seconds spent in nested stages, per open stage
+        self._open: List[float] = []
+
+    def add(self, name: str, seconds: float):
+        """
+        Records time spent in a stage outside a stage() block, e.g. a queue wait.
+
+        Args:
+            name (str): The stage name.
+            seconds (float): The time spent.
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self._open:
+            self._open[-1] += seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Times a block as one stage, excluding the stages nested in it.
+        """
+        started = time.perf_counter()
+        self._open.append(0.0)
+        try:
+            yield
+        finally:
+            nested = self._open.pop()
+            elapsed = time.perf_counter() - started
+            self.add(name, elapsed - nested)
+            if self._open:
+                # add() charged the parent the exclusive part only
+                self._open[-1] += nested
+
+    def elapsed(self) -> float:
+        """
+        Returns the seconds since the request began.
+        """
+        return time.perf_counter() - self.started
+
+    def timings_ms(self) -> Dict[str, float]:
+        """
+        Returns each stage's time in milliseconds, plus 'other_ms' for untracked
+        time and 'total_ms'.
+        """
+        total = self.elapsed()
+        timings = {f"{name}_ms": round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+        timings["other_ms"] = round(max(total - sum(self.stages.values()), 0.0) * 1000, 2)
+        timings["total_ms"] = round(total * 1000, 2)
+        return timings
+
+
+@contextmanager
+def traced() -> Iterator[RequestTrace]:
+    """
+    Starts a trace and makes it the current one until the block exits.
+
+    Yields:
+        RequestTrace: The new trace.
+    """
+    trace = RequestTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """
+    Returns the trace of the request being handled, if any.
+    """
+    return _current.get()
+
+
+@contextmanager
+def _untraced() -> Iterator[None]:
+    yield
+
+
+def stage(name: str):
+    """
+    Times a block as a stage of the current request; a no-op outside one.
+
+    Args:
+        name (str): The stage name, e.g. 'embed', 'search' or 'llm'.
+
+    Returns:
+        ContextManager[None]: The timing context.
+    """
+    trace = _current.get()
+    if trace is None:
+        return _untraced()
+    return trace.stage(name)
@@ -2,7 +2,8 @@
 Main entry point for the RAG Assistant FastAPI application.
 
 This module initializes the FastAPI app, configures CORS middleware for local development,
-and includes the API routers for health checks, chat functionality, and document ingestion.
+and includes the API routers for health checks, chat functionality, retrieval-only search,
+document ingestion, logs and metrics.
 """
 import os
 import warnings
@@ -11,6 +12,8 @@ import warnings
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -19,10 +22,45 @@ from app.api.health import router as health_router
 from app.api.chat import router as chat_router
 from app.api.ingest import router as ingest_router
 from app.api.logs import router as logs_router
+from app.api.metrics import router as metrics_router
+from app.api.search import router as search_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts background services for the lifetime of the app.
+
+    The embedder and vector store are warmed up on a background thread, the
+    query caches are pre-filled with frequent logged questions, and
+    /health/ready reports ready once they are. When KB_WATCH_ENABLED is true, a
+    polling watcher incrementally re-indexes files added, modified or deleted
+    under 'knowledge_base/raw'.
+    """
+    from app.api.chat import rag_engine as chat_engine
+    from app.core.readiness import ReadinessTracker
+
+    app.state.readiness = ReadinessTracker(chat_engine)
+    app.state.readiness.start()
+
+    watcher = None
+    if os.getenv("KB_WATCH_ENABLED", "false").lower() == "true":
+        from app.api.ingest import rag_engine
+        from app.core.watcher import KnowledgeBaseWatcher
+
+        watcher = KnowledgeBaseWatcher(rag_engine)
+        watcher.start()
+
+    yield
+
+    if watcher is not None:
+        watcher.stop()
+
 
 app = FastAPI(
     title="RAG Assistant",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Local development CORS (widget, demo pages)
@@ -39,6 +77,8 @@ app.include_router(health_router, prefix="/health", tags=["health"])
 app.include_router(chat_router, prefix="/chat", tags=["chat"])
 app.include_router(ingest_router, prefix="/ingest", tags=["ingest"])
 app.include_router(logs_router, prefix="/logs", tags=["logs"])
+app.include_router(search_router, prefix="/search", tags=["search"])
+app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
 
 # Serve static files
 # Use absolute path for reliability
@@ -4,9 +4,29 @@ Request models for the RAG Assistant API.
 This module defines the Pydantic models used to validate the structure of
 incoming requests to the chat and ingestion endpoints.
 """
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
 
+class SearchFilters(BaseModel):
+    """
+    Metadata filters restricting retrieval to part of the knowledge base.
+
+    Attributes:
+        source (List[str], optional): Accepted file names, e.g. ["handbook.pdf"].
+        type (List[str], optional): Accepted document types ('txt', 'md', 'pdf').
+        path_prefix (str, optional): Only files whose path starts with this.
+        page_min (int, optional): Only PDF chunks ending on or after this page.
+        page_max (int, optional): Only PDF chunks starting on or before this page.
+    """
+    source: Optional[List[str]] = Field(default=None, description="Accepted source file names")
+    type: Optional[List[str]] = Field(default=None, description="Accepted document types", examples=[["pdf"]])
+    path_prefix: Optional[str] = Field(default=None, description="Path prefix of accepted files")
+    page_min: Optional[int] = Field(default=None, ge=1, description="First page of the range (PDFs only)")
+    page_max: Optional[int] = Field(default=None, ge=1, description="Last page of the range (PDFs only)")
+
+
 class ChatRequest(BaseModel):
     """
     Data model for a user's chat request.
@@ -14,10 +34,52 @@ class ChatRequest(BaseModel):
     Attributes:
         question (str): The question asked by the user, which must be at least
                         one character long.
+        filters (SearchFilters, optional): Restricts the retrieved context.
     """
     question: str = Field(
         ...,
         min_length=1,
         description="User question to the RAG assistant",
         examples=["What is this document about?"],
-    )
\ No newline at end of file
+    )
+    filters: Optional[SearchFilters] = Field(default=None, description="Metadata filters for retrieval")
+
+class ChatBatchRequest(BaseModel):
+    """
+    Data model for a batch of chat questions.
+
+    Attributes:
+        questions (List[str]): The questions to answer, each at least one character long.
+        filters (SearchFilters, optional): Restricts the retrieved context of every question.
+    """
+    questions: List[str] = Field(
+        ...,
+        min_length=1,
+        description="User questions to answer in one batch",
+        examples=[["What is this document about?", "Who is the author?"]],
+    )
+    filters: Optional[SearchFilters] = Field(default=None, description="Metadata filters for retrieval")
+
+
+class SearchRequest(BaseModel):
+    """
+    Data model for a retrieval-only search over one or more queries.
+
+    Attributes:
+        queries (List[str]): The search queries.
+        n_results (int): Number of chunks to return per query.
+        filters (SearchFilters, optional): Restricts the searched chunks.
+    """
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Search queries, embedded and searched in one batch",
+        examples=[["refund policy", "shipping times"]],
+    )
+    n_results: int = Field(
+        default=3,
+        ge=1,
+        le=50,
+        description="Number of chunks to return per query",
+    )
+    filters: Optional[SearchFilters] = Field(default=None, description="Metadata filters for retrieval")
@@ -4,7 +4,7 @@ Response models for the RAG Assistant API.
 This module defines the Pydantic models used to structure the JSON responses
 returned by the API endpoints.
 """
-from typing import List
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -28,4 +28,95 @@ class ChatResponse(BaseModel):
     sources: List[str] = Field(
         default_factory=list,
         description="Source document identifiers used for the answer",
-    )
\ No newline at end of file
+    )
+
+class ChatBatchItem(BaseModel):
+    """
+    Data model for one answer in a batch chat response.
+
+    Attributes:
+        question (str): The question that was answered.
+        session_id (str): The session the question was logged under.
+        answer (str): The AI-generated answer, empty if the item failed.
+        sources (List[str]): Source document identifiers used for the answer.
+        error (Optional[str]): The error message if this item failed.
+        intent (Optional[str]): The canned intent that answered it, if any.
+        timings (Dict[str, float]): Per-stage latencies in milliseconds.
+    """
+    question: str
+    session_id: str
+    answer: str = ""
+    sources: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+    intent: Optional[str] = None
+    timings: Dict[str, float] = Field(default_factory=dict)
+
+
+class ChatBatchResponse(BaseModel):
+    """
+    Data model for a batch chat response.
+
+    Attributes:
+        results (List[ChatBatchItem]): One item per question, in request order.
+        total_ms (float): Wall-clock time for the whole batch.
+    """
+    results: List[ChatBatchItem]
+    total_ms: float
+
+
+class SearchHit(BaseModel):
+    """
+    Data model for one retrieved chunk.
+
+    Attributes:
+        id (str): The chunk ID.
+        document (str): The chunk text.
+        metadata (Dict[str, Any]): The chunk metadata (source, type, path, ...).
+        distance (float): Squared L2 distance to the query (lower is closer).
+    """
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    distance: float
+
+
+class SearchResult(BaseModel):
+    """
+    Data model for the hits of one search query.
+
+    Attributes:
+        query (str): The search query.
+        hits (List[SearchHit]): The nearest chunks, closest first.
+    """
+    query: str
+    hits: List[SearchHit]
+
+
+class SearchResponse(BaseModel):
+    """
+    Data model for a batch search response.
+
+    Attributes:
+        results (List[SearchResult]): One result per query, in request order.
+        timings (Dict[str, float]): 'embed_ms', 'query_ms' and 'total_ms' for the batch.
+    """
+    results: List[SearchResult]
+    timings: Dict[str, float]
+
+
+class FacetResponse(BaseModel):
+    """
+    Data model for the available filter values of a collection.
+
+    Attributes:
+        sources (Dict[str, int]): Chunks per source file name.
+        types (Dict[str, int]): Chunks per document type.
+        paths (Dict[str, int]): Chunks per file path.
+        documents (int): Number of indexed files.
+        chunks (int): Number of stored chunks.
+    """
+    sources: Dict[str, int]
+    types: Dict[str, int]
+    paths: Dict[str, int]
+    documents: int
+    chunks: int
@@ -0,0 +1,208 @@
+"""
+Collection aliases for zero-downtime reindexing.
+
+VectorDB is configured with a logical collection name (CHROMA_COLLECTION_NAME).
+This module maps that name to the physical, versioned collection currently
+serving it, and remembers the previous generation for instant rollback. The
+mapping lives in a small JSON file that is replaced atomically, so a swap made
+by one process (e.g. the reindex CLI) is picked up by running servers. Swaps
+and rollbacks hold the index write lock (see write_lock.py), so processes never
+overwrite each other's aliases.
+
+A logical name without an alias entry resolves to itself, which keeps indexes
+built before aliases existed working unchanged.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from app.retrieval.write_lock import get_index_write_lock
+
+# Chroma collection names are 3-63 characters
+MAX_COLLECTION_NAME_LENGTH = 63
+# Appended to a logical name per generation: '_' + YYYYmmddHHMMSS + '_' + 4 hex digits
+GENERATION_SUFFIX_LENGTH = 20
+
+
+def new_generation_name(name: str) -> str:
+    """
+    Returns a new, unique physical collection name for a logical collection.
+
+    The timestamp keeps generations readable and sortable; the random suffix
+    keeps two reindexes started in the same second (e.g. the CLI and the API)
+    from building into the same collection.
+
+    Args:
+        name (str): The logical collection name.
+
+    Returns:
+        str: The generation's collection name.
+
+    Raises:
+        ValueError: If the result would exceed MAX_COLLECTION_NAME_LENGTH.
+    """
+    if len(name) + GENERATION_SUFFIX_LENGTH > MAX_COLLECTION_NAME_LENGTH:
+        raise ValueError(
+            f"Collection name {name!r} is too long to version; at most "
+            f"{MAX_COLLECTION_NAME_LENGTH - GENERATION_SUFFIX_LENGTH} characters are allowed"
+        )
+    return f"{name}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:4]}"
+
+
+class CollectionAliases:
+    """
+    A file-backed map from logical collection names to active generations.
+
+    Attributes:
+        path (str): The JSON file holding the aliases.
+        check_interval (float): Minimum seconds between checks for outside changes.
+        aliases (Dict[str, Dict[str, Optional[str]]]): Logical name ->
+            {'active': collection, 'previous': collection or None}.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Loads the alias file, if it exists.
+
+        Args:
+            path (str, optional): The alias file, defaults to INDEX_ALIAS_PATH.
+            check_interval (float): Minimum seconds between file change checks.
+        """
+        self.path = path or os.getenv("INDEX_ALIAS_PATH", "./backend/index_aliases.json")
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.aliases: Dict[str, Dict[str, Optional[str]]] = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._reload()
+
+    def _reload(self):
+        """
+        Re-reads the alias file if it changed on disk since the last read.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.aliases = json.load(f)
+        self._mtime = mtime
+
+    def _save(self):
+        """
+        Atomically writes the alias file. Caller holds the lock.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_file = self.path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.aliases, f, indent=2)
+        os.replace(tmp_file, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def resolve(self, name: str, force: bool = False) -> str:
+        """
+        Returns the physical collection currently serving a logical name.
+
+        Args:
+            name (str): The logical collection name.
+            force (bool): Check the alias file for changes now instead of at most
+                          every check_interval seconds, e.g. before writing.
+
+        Returns:
+            str: The active collection, or the name itself if it has no alias.
+        """
+        now = time.monotonic()
+        if force or now - self._checked_at >= self.check_interval:
+            with self.lock:
+                self._checked_at = now
+                self._reload()
+
+        alias = self.aliases.get(name)
+        return alias["active"] if alias else name
+
+    def generations(self, name: str) -> Dict[str, Optional[str]]:
+        """
+        Returns the active and previous generations of a logical name.
+
+        Args:
+            name (str): The logical collection name.
+
+        Returns:
+            Dict[str, Optional[str]]: The 'active' and 'previous' collections.
+        """
+        with self.lock:
+            self._reload()
+            alias = self.aliases.get(name)
+            return dict(alias) if alias else {"active": name, "previous": None}
+
+    def swap(self, name: str, collection: str) -> Optional[str]:
+        """
+        Makes a new collection active and keeps the current one as previous.
+
+        Args:
+            name (str): The logical collection name.
+            collection (str): The newly built collection.
+
+        Returns:
+            Optional[str]: The generation that is no longer referenced and can be dropped.
+
+        Raises:
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        with get_index_write_lock().hold(), self.lock:
+            self._reload()
+            current = self.aliases.get(name) or {"active": name, "previous": None}
+            retired = current["previous"]
+            self.aliases[name] = {"active": collection, "previous": current["active"]}
+            self._save()
+            return retired
+
+    def rollback(self, name: str) -> str:
+        """
+        Swaps the active and previous generations.
+
+        Args:
+            name (str): The logical collection name.
+
+        Returns:
+            str: The collection that is active after the rollback.
+
+        Raises:
+            ValueError: If there is no previous generation to roll back to.
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        with get_index_write_lock().hold(), self.lock:
+            self._reload()
+            current = self.aliases.get(name)
+            if not current or not current["previous"]:
+                raise ValueError(f"No previous generation of {name} to roll back to")
+            self.aliases[name] = {"active": current["previous"], "previous": current["active"]}
+            self._save()
+            return current["previous"]
+
+
+_aliases: Optional[CollectionAliases] = None
+_aliases_lock = threading.Lock()
+
+
+def get_collection_aliases() -> CollectionAliases:
+    """
+    Returns the process-wide alias map.
+
+    Returns:
+        CollectionAliases: The shared instance.
+    """
+    global _aliases
+    with _aliases_lock:
+        if _aliases is None:
+            _aliases = CollectionAliases()
+        return _aliases
@@ -0,0 +1,191 @@
+"""
+Chroma client/server mode for the RAG Assistant.
+
+With CHROMA_MODE=http, collections live on a Chroma server (started with
+`chroma run`) instead of an embedded PersistentClient, so several API
+processes and hosts share one index without copying 'chroma_db' around.
+
+Chroma's HTTP client sends every call through a plain httpx client with no
+timeouts and default pool limits. This module replaces it with one
+process-wide pooled keep-alive client with explicit connect/read/write/pool
+timeouts and a transport that retries transient failures (connection errors,
+timeouts, 429 and 502-504) with full-jitter exponential backoff. Every
+operation VectorDB issues is safe to repeat: re-adding existing IDs is a
+no-op, and deletes, gets and queries are idempotent.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import chromadb
+import httpx
+from chromadb.api.fastapi import FastAPI
+from chromadb.config import Settings
+
+from app.logging.logger import StructuredLogger
+from app.logging.metrics import REGISTRY
+
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+_client: Optional[Any] = None
+_client_lock = threading.Lock()
+
+_requests = REGISTRY.counter(
+    "chroma_http_requests_total", "HTTP requests sent to the Chroma server", ("status",)
+)
+_connections = REGISTRY.counter(
+    "chroma_http_connections_total",
+    "Chroma requests by whether they opened a new connection or reused a pooled one",
+    ("connection",),
+)
+_retries = REGISTRY.counter("chroma_http_retries_total", "Chroma requests retried after a transient failure")
+_latency = REGISTRY.histogram("chroma_http_request_seconds", "Chroma server HTTP request latency")
+
+
+class RetryingTransport(httpx.HTTPTransport):
+    """
+    A pooled HTTP transport that retries transient failures and records metrics.
+
+    Attributes:
+        max_retries (int): Retries per request (CHROMA_MAX_RETRIES).
+        base_delay (float): First backoff ceiling in seconds (CHROMA_RETRY_BASE_DELAY).
+        max_delay (float): Largest backoff in seconds (CHROMA_RETRY_MAX_DELAY).
+    """
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        """
+        Sends one attempt, tracing whether it opened a new connection.
+        """
+        state = {"new_connection": False}
+
+        def trace(event_name: str, info: dict):
+            if event_name.startswith("connection.connect_tcp"):
+                state["new_connection"] = True
+
+        request.extensions["trace"] = trace
+        started = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except httpx.TransportError:
+            _requests.inc(status="error")
+            raise
+        _latency.observe(time.perf_counter() - started)
+        _requests.inc(status=str(response.status_code))
+        _connections.inc(connection="new" if state["new_connection"] else "reused")
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self._send(request)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                response.close()
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+            attempt += 1
+            _retries.inc()
+            time.sleep(delay)
+
+
+def http_timeout() -> httpx.Timeout:
+    """
+    Builds the Chroma request timeouts from environment variables.
+
+    Returns:
+        httpx.Timeout: Connect, read, write and pool-acquire timeouts in seconds.
+    """
+    return httpx.Timeout(
+        connect=float(os.getenv("CHROMA_CONNECT_TIMEOUT", "5")),
+        read=float(os.getenv("CHROMA_READ_TIMEOUT", "30")),
+        write=float(os.getenv("CHROMA_WRITE_TIMEOUT", "30")),
+        pool=float(os.getenv("CHROMA_POOL_TIMEOUT", "5")),
+    )
+
+
+def _pooled_session(headers: httpx.Headers) -> httpx.Client:
+    """
+    Builds the pooled keep-alive session that replaces Chroma's default one.
+
+    Args:
+        headers (httpx.Headers): Headers Chroma set up, e.g. for authentication.
+
+    Returns:
+        httpx.Client: The configured client.
+    """
+    pool_size = int(os.getenv("CHROMA_POOL_SIZE", "16"))
+    transport = RetryingTransport(
+        max_retries=int(os.getenv("CHROMA_MAX_RETRIES", "2")),
+        base_delay=float(os.getenv("CHROMA_RETRY_BASE_DELAY", "0.2")),
+        max_delay=float(os.getenv("CHROMA_RETRY_MAX_DELAY", "2")),
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=float(os.getenv("CHROMA_KEEPALIVE_SECONDS", "30")),
+        ),
+    )
+    REGISTRY.gauge("chroma_http_pool_size", "Max pooled connections to the Chroma server").set(pool_size)
+    return httpx.Client(transport=transport, timeout=http_timeout(), headers=headers)
+
+
+def get_chroma_http_client():
+    """
+    Returns the process-wide client of the Chroma server (CHROMA_HOST, CHROMA_PORT).
+
+    Returns:
+        chromadb.ClientAPI: The shared client, using the pooled session.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            host = os.getenv("CHROMA_HOST", "localhost")
+            port = int(os.getenv("CHROMA_PORT", "8001"))
+            ssl = os.getenv("CHROMA_SSL", "false").lower() == "true"
+            settings = Settings(anonymized_telemetry=False)
+
+            headers = {}
+            token = os.getenv("CHROMA_AUTH_TOKEN")
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+            session = _pooled_session(httpx.Headers(headers))
+
+            # The client's constructor already calls the server through chromadb's
+            # own session, so wait for the server with timeouts and retries first
+            api_url = FastAPI.resolve_url(
+                chroma_server_host=host,
+                chroma_server_http_port=port,
+                chroma_server_ssl_enabled=ssl,
+                default_api_path=settings.chroma_server_api_default_path,
+            )
+            session.get(f"{api_url}/heartbeat").raise_for_status()
+
+            client = chromadb.HttpClient(host=host, port=port, ssl=ssl, headers=headers, settings=settings)
+
+            # The HTTP session is internal to chromadb; keep its default if that changes
+            server = getattr(client, "_server", None)
+            default_session = getattr(server, "_session", None)
+            if isinstance(default_session, httpx.Client):
+                session.headers.update(default_session.headers)
+                server._session = session
+                default_session.close()
+            else:
+                session.close()
+                StructuredLogger(component="vectordb").event(
+                    "chroma_http_pool_unavailable",
+                    chromadb_version=chromadb.__version__,
+                )
+
+            _client = client
+        return _client
@@ -4,34 +4,338 @@ Text chunking utilities for the RAG Assistant.
 This module provides functions to split large text documents into smaller,
 overlapping chunks, which is necessary for efficient vector database indexing
 and retrieval.
+
+Chunk length is measured in the embedding model's own tokens. The model only
+embeds its first max_seq_length word pieces (256 for all-MiniLM-L6-v2), so a
+chunk sized in characters can have its tail silently left out of the vector
+while still being stored and sent to the LLM. The chunk size is derived from
+the model's sequence limit, and lengths are computed with the model's fast
+tokenizer, a batch at a time and cached. The tokenizer is a separate instance
+from the one the embedding model truncates and pads with, since fast
+tokenizers keep those settings as shared state. If no tokenizer can be loaded,
+character-based sizes are used and flagged as a fallback, which ingestion
+refuses (see VectorDB.check_chunking) rather than recording for the collection.
 """
-from typing import List
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# Character-based sizes, used when the tokenizer is unavailable or CHUNK_LENGTH_UNIT=chars
+CHAR_CHUNK_SIZE = 1000
+CHAR_CHUNK_OVERLAP = 200
+
+# Settings that decide where chunks start and end
+BOUNDARY_SETTINGS = ("unit", "chunk_size", "chunk_overlap")
+
+
+class TokenCounter:
+    """
+    Counts a text's tokens with a fast tokenizer, caching recent results.
+
+    Attributes:
+        tokenizer (PreTrainedTokenizerFast): A copy of the embedding model's tokenizer.
+        special_tokens (int): Tokens the model adds to every input, e.g. [CLS] and [SEP].
+        cache_size (int): Texts whose lengths are remembered.
+    """
+
+    def __init__(self, tokenizer: Any, cache_size: int = 100_000):
+        self.tokenizer = tokenizer
+        self.special_tokens = tokenizer.num_special_tokens_to_add()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self._cache: Dict[str, int] = {}
+
+    def lengths(self, texts: List[str]) -> List[int]:
+        """
+        Counts the tokens of several texts with one tokenizer call.
+
+        Args:
+            texts (List[str]): The texts to measure.
+
+        Returns:
+            List[int]: Each text's length in tokens, without special tokens.
+        """
+        cache = self._cache
+        missing = list({text for text in texts if text not in cache})
+        measured: Dict[str, int] = {}
+        if missing:
+            encoded = self.tokenizer(
+                missing,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+                verbose=False,
+            )["input_ids"]
+            measured = dict(zip(missing, (len(ids) for ids in encoded)))
+            with self.lock:
+                if len(self._cache) + len(measured) > self.cache_size:
+                    self._cache = {}
+                self._cache.update(measured)
+        return [measured[text] if text in measured else cache[text] for text in texts]
+
+    def __call__(self, text: str) -> int:
+        cached = self._cache.get(text)
+        return cached if cached is not None else self.lengths([text])[0]
+
+
+class TokenAwareTextSplitter(RecursiveCharacterTextSplitter):
+    """
+    A recursive splitter whose chunk size and overlap are counted in tokens.
+
+    The base class measures pieces one at a time through the caching
+    TokenCounter. Before it runs, the pieces it is likely to measure (the text
+    split at each separator in turn, down to the pieces that fit) are measured
+    in one batched tokenizer call per level, so most of its lookups are cache
+    hits; pieces cut differently are simply measured on their own.
+    """
+
+    def __init__(self, counter: TokenCounter, chunk_size: int, separators: List[str], **kwargs: Any):
+        super().__init__(length_function=counter, chunk_size=chunk_size, separators=separators, **kwargs)
+        self.counter = counter
+        self.max_tokens = chunk_size
+        self.separators = separators
+
+    def split_text(self, text: str) -> List[str]:
+        pieces = [text]
+        for separator in self.separators:
+            if not separator or not pieces:
+                break
+            # Separators start the piece that follows them, as in the base class
+            split = [
+                part
+                for piece in pieces
+                for part in re.split(f"(?={re.escape(separator)})", piece)
+                if part
+            ]
+            lengths = self.counter.lengths(split)
+            pieces = [part for part, length in zip(split, lengths) if length > self.max_tokens]
+        return super().split_text(text)
+
+
+@lru_cache(maxsize=4)
+def load_tokenizer(model_name: str) -> Optional[Any]:
+    """
+    Loads the fast tokenizer of an embedding model, or None if unavailable.
+
+    Args:
+        model_name (str): The HuggingFace model name.
+
+    Returns:
+        Optional[PreTrainedTokenizerFast]: The tokenizer.
+    """
+    try:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    except Exception:
+        # Not installed, or not downloadable (offline without a cached copy)
+        return None
+
+
+@lru_cache(maxsize=4)
+def _configured_max_seq_length(model_name: str) -> Optional[int]:
+    """
+    Reads max_seq_length from a sentence-transformers model's config on the Hub (or its cache).
+    """
+    try:
+        from huggingface_hub import hf_hub_download
+
+        with open(hf_hub_download(model_name, "sentence_bert_config.json"), "r", encoding="utf-8") as f:
+            return int(json.load(f)["max_seq_length"])
+    except Exception:
+        return None
+
+
+def embedding_max_tokens(model_name: str, embeddings: Any = None, tokenizer: Any = None) -> Optional[int]:
+    """
+    Finds how many tokens the embedding model reads before truncating.
+
+    Checked in order: EMBEDDING_MAX_TOKENS, the loaded sentence-transformers
+    model, the model's sentence_bert_config.json, and the tokenizer's limit.
+
+    Args:
+        model_name (str): The HuggingFace model name.
+        embeddings (Embeddings, optional): The loaded embedding model, if in-process.
+        tokenizer (PreTrainedTokenizerFast, optional): The model's tokenizer.
+
+    Returns:
+        Optional[int]: The sequence limit, including special tokens.
+    """
+    configured = os.getenv("EMBEDDING_MAX_TOKENS")
+    if configured:
+        return int(configured)
+
+    # HuggingFaceEmbeddings keeps its SentenceTransformer in '_client'
+    max_seq_length = getattr(getattr(embeddings, "_client", None), "max_seq_length", None)
+    if max_seq_length:
+        return int(max_seq_length)
+
+    max_seq_length = _configured_max_seq_length(model_name)
+    if max_seq_length:
+        return max_seq_length
+
+    # Tokenizers without a configured limit report a huge sentinel value
+    model_max_length = getattr(tokenizer, "model_max_length", None)
+    if model_max_length and model_max_length < 100_000:
+        return int(model_max_length)
+    return None
+
+
+def build_splitter(model_name: str, embeddings: Any = None) -> Tuple[RecursiveCharacterTextSplitter, Dict[str, Any]]:
+    """
+    Builds the document splitter for an embedding model.
+
+    Chunks hold at most the model's sequence limit minus its special tokens
+    (or CHUNK_SIZE_TOKENS), with CHUNK_OVERLAP_TOKENS (a fifth by default)
+    shared between consecutive chunks.
+
+    Args:
+        model_name (str): The HuggingFace model name.
+        embeddings (Embeddings, optional): The loaded embedding model, if in-process.
+
+    Returns:
+        Tuple[RecursiveCharacterTextSplitter, Dict[str, Any]]: The splitter and its
+            settings: 'unit' ('tokens' or 'chars'), 'chunk_size', 'chunk_overlap',
+            'max_tokens', and 'fallback', True if chunks were configured in tokens
+            but the tokenizer or the model's sequence limit is unavailable.
+    """
+    tokens = os.getenv("CHUNK_LENGTH_UNIT", "tokens").lower() == "tokens"
+    # Never the embedding model's own tokenizer, which embedding calls from other
+    # threads reconfigure for truncation and padding
+    tokenizer = load_tokenizer(model_name) if tokens else None
+
+    max_tokens = embedding_max_tokens(model_name, embeddings, tokenizer) if tokenizer is not None else None
+    if tokenizer is None or not getattr(tokenizer, "is_fast", False) or max_tokens is None:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHAR_CHUNK_SIZE,
+            chunk_overlap=CHAR_CHUNK_OVERLAP,
+            separators=SEPARATORS,
+        )
+        return splitter, {
+            "unit": "chars",
+            "chunk_size": CHAR_CHUNK_SIZE,
+            "chunk_overlap": CHAR_CHUNK_OVERLAP,
+            "max_tokens": max_tokens,
+            "fallback": tokens,
+        }
+
+    counter = get_token_counter(model_name, tokenizer)
+    chunk_size = int(os.getenv("CHUNK_SIZE_TOKENS", "0")) or max_tokens - counter.special_tokens
+    chunk_size = min(chunk_size, max_tokens - counter.special_tokens)
+    chunk_overlap = min(int(os.getenv("CHUNK_OVERLAP_TOKENS", str(chunk_size // 5))), chunk_size // 2)
+
+    splitter = TokenAwareTextSplitter(
+        counter,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=SEPARATORS,
+    )
+    return splitter, {
+        "unit": "tokens",
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "max_tokens": max_tokens,
+        "fallback": False,
+    }
+
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_token_counter(model_name: str, tokenizer: Any = None) -> Optional[TokenCounter]:
+    """
+    Returns the process-wide token counter of an embedding model.
+
+    Args:
+        model_name (str): The HuggingFace model name.
+        tokenizer (PreTrainedTokenizerFast, optional): The tokenizer, if already loaded.
+
+    Returns:
+        Optional[TokenCounter]: The shared counter, or None if no tokenizer is available.
+    """
+    with _counters_lock:
+        if model_name not in _counters:
+            tokenizer = tokenizer or load_tokenizer(model_name)
+            if tokenizer is None:
+                return None
+            _counters[model_name] = TokenCounter(tokenizer)
+        return _counters[model_name]
+
+
+def truncation_report(
+    batches: Iterable[Dict[str, Any]],
+    counter: TokenCounter,
+    limit: int,
+    top: int = 10,
+) -> Dict[str, Any]:
+    """
+    Measures how many stored chunks are longer than the embedding model reads.
+
+    Args:
+        batches (Iterable[Dict[str, Any]]): VectorStore.iter_batches() output.
+        counter (TokenCounter): The embedding model's token counter.
+        limit (int): Content tokens the model embeds (its sequence limit minus
+                     special tokens).
+        top (int): Number of files with the most truncated chunks to list.
+
+    Returns:
+        Dict[str, Any]: 'chunks', the 'limit', 'truncated' and 'truncated_ratio'; 'tokens' and
+                        'tokens_not_embedded' in total; 'p50_tokens', 'p95_tokens'
+                        and 'max_tokens' chunk lengths; and 'top_files' as
+                        (path, truncated chunks) pairs.
+    """
+    lengths: List[int] = []
+    truncated_by_path: Dict[str, int] = {}
+    for batch in batches:
+        batch_lengths = counter.lengths(batch["documents"])
+        lengths.extend(batch_lengths)
+        for length, meta in zip(batch_lengths, batch["metadatas"]):
+            if length > limit:
+                path = (meta or {}).get("path", "")
+                truncated_by_path[path] = truncated_by_path.get(path, 0) + 1
+
+    lengths.sort()
+    truncated = sum(truncated_by_path.values())
+    return {
+        "chunks": len(lengths),
+        "limit": limit,
+        "truncated": truncated,
+        "truncated_ratio": truncated / len(lengths) if lengths else 0.0,
+        "tokens": sum(lengths),
+        "tokens_not_embedded": sum(length - limit for length in lengths if length > limit),
+        "p50_tokens": lengths[len(lengths) // 2] if lengths else 0,
+        "p95_tokens": lengths[int(len(lengths) * 0.95)] if lengths else 0,
+        "max_tokens": lengths[-1] if lengths else 0,
+        "top_files": sorted(truncated_by_path.items(), key=lambda item: item[1], reverse=True)[:top],
+    }
+
 
 def chunk_text(
     text: str,
-    chunk_size: int = 1000,
-    chunk_overlap: int = 200,
+    model_name: Optional[str] = None,
 ) -> List[str]:
     """
     Splits a long string into smaller chunks using a recursive character strategy.
 
     This utility uses LangChain's RecursiveCharacterTextSplitter to create chunks
     that maintain semantic continuity by overlapping and splitting at logical
-    boundaries like paragraphs or sentences.
+    boundaries like paragraphs or sentences, sized in the embedding model's tokens.
 
     Args:
         text (str): The raw text to be chunked.
-        chunk_size (int): The maximum number of characters per chunk.
-        chunk_overlap (int): The number of characters that consecutive chunks share.
+        model_name (str, optional): The embedding model, defaults to EMBEDDING_MODEL.
 
     Returns:
         List[str]: A list of text chunks.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
-    return splitter.split_text(text)
\ No newline at end of file
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    splitter, _ = build_splitter(model_name)
+    return splitter.split_text(text)
@@ -0,0 +1,520 @@
+"""
+Near-duplicate chunk detection for the RAG Assistant.
+
+This module keeps a MinHash/LSH index of every chunk stored in the vector
+database. During ingestion each new chunk's MinHash signature is looked up in
+the LSH buckets; if an existing chunk is similar enough (estimated Jaccard
+similarity of word shingles above DEDUP_THRESHOLD), the new chunk is not
+embedded or stored but linked to the existing "canonical" chunk instead. The
+links keep the duplicate's metadata so search results can still be attributed
+to every source the text appears in, and so filtered searches can find a chunk
+through a duplicate that matches the filter when the stored copy does not.
+
+The index is shared by every thread of the process (searches read the links
+while ingestion and the watcher update them), so its state is guarded by a
+per-index lock. Other processes' saves are picked up by refresh(), which
+searches call at most once a second and writers call before every write.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.retrieval.facets import matches_where
+
+# Mersenne prime 2^31 - 1; keeps a * x below 2^62 in uint64 arithmetic
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+SHINGLE_SIZE = 3
+
+# Filters whose matching canonical chunks are remembered per index
+MATCH_CACHE_SIZE = 64
+
+# Indexes opened by this process, shared so every VectorDB sees the same links
+_open_indexes: Dict[str, "NearDuplicateIndex"] = {}
+_open_indexes_lock = threading.Lock()
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    Splits text into overlapping lowercase word 3-grams.
+
+    Args:
+        text (str): The chunk text.
+
+    Returns:
+        Set[str]: The shingles, or the single normalized text for very short chunks.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    A persistent MinHash/LSH index of stored chunks and their duplicate links.
+
+    Attributes:
+        path (str): Directory holding 'index.json' and the signatures file it names.
+        num_perm (int): Number of MinHash permutations per signature.
+        bands (int): Number of LSH bands; num_perm / bands rows per band.
+        threshold (float): Minimum estimated Jaccard similarity to count as a duplicate.
+        ids (List[str]): Canonical chunk IDs, one per signature row.
+        paths (List[str]): Source file path of each canonical chunk.
+        links (Dict[str, Dict[str, Any]]): Duplicate chunk ID -> {'canonical', 'metadata'}.
+        check_interval (float): Minimum seconds between checks for other processes' saves.
+        lock (threading.RLock): Guards the signatures, buckets and links.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: Optional[float] = None,
+    ):
+        """
+        Opens (or creates) the index stored under the given directory.
+
+        Args:
+            path (str): Directory holding the index files.
+            num_perm (int): Number of MinHash permutations.
+            bands (int): Number of LSH bands; must divide num_perm.
+            threshold (float, optional): Duplicate threshold, defaults to DEDUP_THRESHOLD.
+        """
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("DEDUP_THRESHOLD", "0.85")
+        )
+
+        rng = np.random.RandomState(42)
+        self._a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm).astype(np.uint64)
+
+        self.check_interval = 1.0
+        self.lock = threading.RLock()
+        self.index_file = os.path.join(path, "index.json")
+        self.ids: List[str] = []
+        self.paths: List[str] = []
+        self.links: Dict[str, Dict[str, Any]] = {}
+        # Indexes saved before signature files were versioned use a fixed name
+        self.signatures_file = os.path.join(path, "signatures.npy")
+        self._signatures: List[np.ndarray] = []
+        self._mtime = None
+        self._checked_at = 0.0
+        self._rebuild()
+        self._load()
+
+    def _load(self):
+        """
+        Reads the index files, if any, and rebuilds the LSH buckets.
+
+        If another process's save() removed the signatures file named by the
+        'index.json' just read, the index is left as it was; the next refresh()
+        reads the new pair.
+        """
+        with self.lock:
+            try:
+                mtime = os.stat(self.index_file).st_mtime_ns
+            except FileNotFoundError:
+                return
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            signatures_file = os.path.join(self.path, index.get("signatures", "signatures.npy"))
+            try:
+                signatures = np.load(signatures_file)
+            except FileNotFoundError:
+                return
+
+            self.ids = index["ids"]
+            self.paths = index["paths"]
+            self.links = index["links"]
+            self.signatures_file = signatures_file
+            self._signatures = list(signatures)
+            self._mtime = mtime
+            self._rebuild()
+
+    def refresh(self, force: bool = False):
+        """
+        Re-reads the index if another process saved it since this one last read or wrote it.
+
+        Args:
+            force (bool): Check now instead of at most every check_interval seconds,
+                          e.g. before writing.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        with self.lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.index_file).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime != self._mtime:
+                self._load()
+
+    def _rebuild(self):
+        """
+        Rebuilds the LSH buckets and the canonical -> duplicates map.
+        """
+        self._buckets: Dict[tuple, List[int]] = {}
+        for row, signature in enumerate(self._signatures):
+            self._index_bands(row, signature)
+
+        self._duplicates: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for chunk_id, link in self.links.items():
+            self._duplicates.setdefault(link["canonical"], {})[chunk_id] = link["metadata"]
+        self._matching: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def save(self):
+        """
+        Writes the signatures and links to disk.
+
+        The signatures go to a new file first, and 'index.json' (which names
+        it) is replaced atomically afterwards, so a crash at any point leaves
+        a matching pair of files.
+        """
+        with self.lock:
+            os.makedirs(self.path, exist_ok=True)
+            signatures = (
+                np.stack(self._signatures) if self._signatures
+                else np.zeros((0, self.num_perm), dtype=np.uint32)
+            )
+            signatures_file = os.path.join(self.path, f"signatures-{uuid.uuid4().hex[:12]}.npy")
+            with open(signatures_file, "wb") as f:
+                np.save(f, signatures)
+
+            tmp_file = self.index_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "ids": self.ids,
+                    "paths": self.paths,
+                    "links": self.links,
+                    "signatures": os.path.basename(signatures_file),
+                }, f)
+            os.replace(tmp_file, self.index_file)
+            self._mtime = os.stat(self.index_file).st_mtime_ns
+
+            previous, self.signatures_file = self.signatures_file, signatures_file
+            if os.path.exists(previous):
+                os.remove(previous)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Computes the MinHash signature of a chunk's word shingles.
+
+        Args:
+            text (str): The chunk text.
+
+        Returns:
+            np.ndarray: A uint32 signature of length num_perm.
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles(text)),
+            dtype=np.uint64,
+        ) % MERSENNE_PRIME
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[tuple]:
+        """
+        Returns one bucket key per LSH band of a signature.
+        """
+        r = self.rows_per_band
+        return [(band, signature[band * r:(band + 1) * r].tobytes()) for band in range(self.bands)]
+
+    def _index_bands(self, row: int, signature: np.ndarray):
+        """
+        Adds a signature row to its LSH buckets.
+        """
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(row)
+
+    def find_duplicate(
+        self,
+        signature: np.ndarray,
+        chunk_id: Optional[str] = None,
+        stored_ids: Optional[Set[str]] = None,
+    ) -> Optional[str]:
+        """
+        Finds the most similar stored chunk above the duplicate threshold.
+
+        Rows for the chunk itself or for chunks missing from the store (e.g.
+        left behind when the collection was wiped) are stale: they are never
+        returned, and are dropped together with the links to them.
+
+        Args:
+            signature (np.ndarray): The new chunk's MinHash signature.
+            chunk_id (str, optional): The new chunk's ID.
+            stored_ids (Set[str], optional): IDs of the chunks in the store.
+
+        Returns:
+            Optional[str]: The canonical chunk ID, or None if the chunk is new.
+        """
+        with self.lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best_id, best_similarity = None, self.threshold
+            stale = []
+            for row in candidates:
+                candidate_id = self.ids[row]
+                if candidate_id == chunk_id or (stored_ids is not None and candidate_id not in stored_ids):
+                    stale.append(candidate_id)
+                    continue
+                similarity = float(np.mean(self._signatures[row] == signature))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = candidate_id, similarity
+
+            if stale:
+                self.remove_ids(stale)
+            return best_id
+
+    def add(self, chunk_id: str, signature: np.ndarray, path: str):
+        """
+        Registers a stored (canonical) chunk.
+
+        Args:
+            chunk_id (str): The chunk ID.
+            signature (np.ndarray): Its MinHash signature.
+            path (str): The source file path, for deletions.
+        """
+        with self.lock:
+            row = len(self.ids)
+            self.ids.append(chunk_id)
+            self.paths.append(path)
+            self._signatures.append(signature)
+            self._index_bands(row, signature)
+
+    def link(self, chunk_id: str, canonical_id: str, metadata: Dict[str, Any]):
+        """
+        Records a skipped duplicate chunk and the canonical chunk it maps to.
+
+        Args:
+            chunk_id (str): The duplicate chunk's ID.
+            canonical_id (str): The stored chunk with near-identical text.
+            metadata (Dict[str, Any]): The duplicate chunk's metadata.
+        """
+        with self.lock:
+            self.links[chunk_id] = {"canonical": canonical_id, "metadata": metadata}
+            self._duplicates.setdefault(canonical_id, {})[chunk_id] = metadata
+            self._matching.clear()
+
+    def linked_ids(self) -> Set[str]:
+        """
+        Returns the IDs of every linked duplicate chunk.
+        """
+        with self.lock:
+            return set(self.links)
+
+    def linked_metadata(self) -> List[Dict[str, Any]]:
+        """
+        Returns the metadata of every linked duplicate chunk, e.g. to count them in facets.
+        """
+        with self.lock:
+            return [link["metadata"] for link in self.links.values()]
+
+    def canonicals_matching(self, where: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Finds the canonical chunks that have a linked duplicate matching a filter.
+
+        Args:
+            where (Dict[str, Any]): A 'where' clause (see facets.build_where).
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Canonical chunk ID -> metadata of its first
+                                       matching duplicate.
+        """
+        key = json.dumps(where, sort_keys=True)
+        with self.lock:
+            matching = self._matching.get(key)
+            if matching is None:
+                matching = {}
+                for link in self.links.values():
+                    if link["canonical"] not in matching and matches_where(link["metadata"], where):
+                        matching[link["canonical"]] = link["metadata"]
+                if len(self._matching) >= MATCH_CACHE_SIZE:
+                    self._matching.clear()
+                self._matching[key] = matching
+            return matching
+
+    def duplicates_of(self, chunk_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Collects the metadata of duplicates linked to the given canonical chunks.
+
+        Args:
+            chunk_ids (List[str]): Canonical chunk IDs, e.g. from a search.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Duplicate metadata per canonical chunk ID.
+        """
+        with self.lock:
+            return {
+                chunk_id: list(self._duplicates[chunk_id].values())
+                for chunk_id in set(chunk_ids)
+                if self._duplicates.get(chunk_id)
+            }
+
+    def merge(self, other: "NearDuplicateIndex", stored_ids: Set[str]) -> Dict[str, int]:
+        """
+        Adds another index's canonical chunks and duplicate links, e.g. from a
+        snapshot imported into a non-empty collection. Entries this index
+        already knows are kept as they are.
+
+        Args:
+            other (NearDuplicateIndex): The index to merge in.
+            stored_ids (Set[str]): IDs that were stored before the merge; links
+                                   for them are skipped, since the chunk has its own row.
+
+        Returns:
+            Dict[str, int]: The number of 'canonicals' and 'links' added.
+        """
+        with other.lock:
+            rows = list(zip(other.ids, other.paths, other._signatures))
+            links = dict(other.links)
+
+        added = {"canonicals": 0, "links": 0}
+        with self.lock:
+            known = set(self.ids)
+            for chunk_id, path, signature in rows:
+                if chunk_id not in known:
+                    self.add(chunk_id, signature, path)
+                    known.add(chunk_id)
+                    added["canonicals"] += 1
+            for chunk_id, link in links.items():
+                if chunk_id in self.links or chunk_id in stored_ids or link["canonical"] not in known:
+                    continue
+                self.link(chunk_id, link["canonical"], link["metadata"])
+                added["links"] += 1
+        return added
+
+    def remove_path(self, path: str) -> Set[str]:
+        """
+        Forgets every chunk and duplicate link that came from a source file.
+
+        Duplicates in other files that were linked to a removed canonical chunk
+        lose their stored text, so their links are dropped too and their paths
+        are returned for re-indexing.
+
+        Args:
+            path (str): The removed or modified source file path.
+
+        Returns:
+            Set[str]: Paths of other files whose duplicate chunks need re-indexing.
+        """
+        with self.lock:
+            removed_ids = {chunk_id for chunk_id, p in zip(self.ids, self.paths) if p == path}
+
+            orphaned_paths = set()
+            for chunk_id, link in list(self.links.items()):
+                if link["metadata"].get("path") == path:
+                    self._unlink(chunk_id)
+                elif link["canonical"] in removed_ids:
+                    orphaned_paths.add(link["metadata"].get("path"))
+                    self._unlink(chunk_id)
+
+            self._drop_rows(removed_ids)
+            orphaned_paths.discard(None)
+            return orphaned_paths
+
+    def remove_ids(self, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Forgets canonical chunks that were registered but never stored, e.g.
+        because embedding their batch failed, and the duplicates linked to them.
+
+        The dropped duplicates are no longer known, so the next ingestion
+        processes them again.
+
+        Args:
+            chunk_ids (List[str]): The canonical chunk IDs to forget.
+
+        Returns:
+            List[Dict[str, Any]]: The metadata of the dropped duplicates.
+        """
+        removed_ids = set(chunk_ids)
+        unlinked = []
+        with self.lock:
+            for canonical_id in removed_ids:
+                for chunk_id in list(self._duplicates.get(canonical_id, ())):
+                    unlinked.append(self._unlink(chunk_id))
+            self._drop_rows(removed_ids)
+        return unlinked
+
+    def _unlink(self, chunk_id: str) -> Dict[str, Any]:
+        """
+        Drops one duplicate link and returns its metadata; the caller holds the lock.
+        """
+        link = self.links.pop(chunk_id)
+        duplicates = self._duplicates.get(link["canonical"], {})
+        duplicates.pop(chunk_id, None)
+        if not duplicates:
+            self._duplicates.pop(link["canonical"], None)
+        self._matching.clear()
+        return link["metadata"]
+
+    def _drop_rows(self, removed_ids: Set[str]):
+        """
+        Removes canonical rows by ID and rebuilds the LSH buckets; the caller
+        holds the lock.
+        """
+        keep = [row for row, chunk_id in enumerate(self.ids) if chunk_id not in removed_ids]
+        if len(keep) == len(self.ids):
+            return
+        self.ids = [self.ids[row] for row in keep]
+        self.paths = [self.paths[row] for row in keep]
+        self._signatures = [self._signatures[row] for row in keep]
+        self._buckets = {}
+        for row, signature in enumerate(self._signatures):
+            self._index_bands(row, signature)
+
+
+def get_near_duplicate_index(path: str) -> NearDuplicateIndex:
+    """
+    Returns the process-wide near-duplicate index stored under a directory.
+
+    Args:
+        path (str): Directory holding the index files.
+
+    Returns:
+        NearDuplicateIndex: The shared index instance.
+    """
+    with _open_indexes_lock:
+        if path not in _open_indexes:
+            _open_indexes[path] = NearDuplicateIndex(path)
+        return _open_indexes[path]
+
+
+def release_near_duplicate_index(path: str) -> None:
+    """
+    Forgets an index's open instance; the saved files are reloaded on next use.
+
+    Args:
+        path (str): Directory holding the index files.
+    """
+    with _open_indexes_lock:
+        _open_indexes.pop(path, None)
+
+
+def drop_near_duplicate_index(path: str) -> None:
+    """
+    Deletes a near-duplicate index directory and forgets its open instance.
+
+    Args:
+        path (str): Directory holding the index files.
+    """
+    with _open_indexes_lock:
+        _open_indexes.pop(path, None)
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,391 @@
+"""
+Shared embedding server for multi-worker deployments.
+
+Every uvicorn worker normally loads its own copy of the sentence-transformers
+model. In embedding-server mode one local process owns the model and serves
+embedding requests over a Unix domain socket; API workers use the
+EmbeddingClient instead of loading weights, so adding workers does not
+multiply model memory. Requests arriving from different workers within a short
+window are embedded together in one batch.
+
+Wire format: every message is a frame of two big-endian uint32 lengths, a JSON
+header and a binary payload. Requests carry {'op': 'embed_documents' |
+'embed_query' | 'stats', 'texts': [...]} and no payload. Embedding responses
+carry {'count', 'dim'} and the vectors as row-major float32 bytes; errors carry
+{'error'}.
+"""
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.logging.logger import StructuredLogger
+
+FRAME_HEADER = struct.Struct("!II")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """
+    Reads exactly size bytes from a socket.
+
+    Raises:
+        ConnectionError: If the peer closes the connection first.
+    """
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding server connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock: socket.socket, header: Dict[str, Any], payload: bytes = b""):
+    """
+    Writes one frame (JSON header plus binary payload) to a socket.
+    """
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(FRAME_HEADER.pack(len(encoded), len(payload)) + encoded + payload)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Reads one frame from a socket.
+
+    Returns:
+        Tuple[Dict[str, Any], bytes]: The decoded JSON header and the binary payload.
+    """
+    header_size, payload_size = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    header = json.loads(_recv_exact(sock, header_size))
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    return header, payload
+
+
+class _EmbeddingRequest:
+    """
+    One client request waiting for the batcher.
+    """
+
+    def __init__(self, op: str, texts: List[str]):
+        self.op = op
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer:
+    """
+    Serves an embedding model to other processes over a Unix domain socket.
+
+    Attributes:
+        socket_path (str): The Unix socket the server listens on.
+        embeddings (Embeddings): The loaded embedding model.
+        max_batch (int): Maximum number of texts embedded in one model call.
+        max_wait_ms (float): How long the batcher waits for more requests to join a batch.
+        stats (Dict[str, int]): Counts of 'requests', 'batches' and 'texts' served.
+        logger (StructuredLogger): Logger for server events.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        embeddings: Embeddings,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        """
+        Initializes the server with configuration from environment variables.
+
+        Args:
+            socket_path (str): The Unix socket to listen on.
+            embeddings (Embeddings): The loaded embedding model.
+            max_batch (int, optional): Texts per model call, defaults to EMBEDDING_SERVER_MAX_BATCH.
+            max_wait_ms (float, optional): Batching window, defaults to EMBEDDING_SERVER_MAX_WAIT_MS.
+        """
+        self.socket_path = socket_path
+        self.embeddings = embeddings
+        self.max_batch = max_batch or int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", "128"))
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else float(
+            os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5")
+        )
+        self.stats = {"requests": 0, "batches": 0, "texts": 0}
+        self.logger = StructuredLogger(component="embedding_server")
+
+        self._queue: "queue.Queue[Optional[_EmbeddingRequest]]" = queue.Queue()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._batcher: Optional[threading.Thread] = None
+
+    def _collect_batch(self, first: _EmbeddingRequest) -> List[_EmbeddingRequest]:
+        """
+        Gathers requests that arrive within max_wait_ms of the first, up to max_batch texts.
+        """
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                # Stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += len(request.texts)
+
+        return batch
+
+    def _embed(self, op: str, texts: List[str]) -> np.ndarray:
+        """
+        Embeds texts as documents or queries with the loaded model.
+        """
+        if op == "embed_query" and getattr(self.embeddings, "query_encode_kwargs", None):
+            # Models with query-specific prompts must embed queries one by one
+            return np.asarray([self.embeddings.embed_query(t) for t in texts], dtype=np.float32)
+        return np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+
+    def _run_batcher(self):
+        """
+        Thread target that embeds queued requests in cross-client batches.
+        """
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect_batch(first)
+            for op in ("embed_documents", "embed_query"):
+                group = [r for r in batch if r.op == op]
+                if not group:
+                    continue
+
+                texts = [text for r in group for text in r.texts]
+                try:
+                    vectors = self._embed(op, texts)
+                except Exception as e:
+                    for r in group:
+                        r.error = str(e)
+                        r.done.set()
+                    continue
+
+                self.stats["batches"] += 1
+                self.stats["texts"] += len(texts)
+                offset = 0
+                for r in group:
+                    r.result = vectors[offset:offset + len(r.texts)]
+                    offset += len(r.texts)
+                    r.done.set()
+
+    def submit(self, op: str, texts: List[str]) -> np.ndarray:
+        """
+        Queues texts for the batcher and waits for their embeddings.
+
+        Args:
+            op (str): 'embed_documents' or 'embed_query'.
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            np.ndarray: A float32 array with one row per text.
+
+        Raises:
+            RuntimeError: If the model failed to embed the batch.
+        """
+        request = _EmbeddingRequest(op, texts)
+        self.stats["requests"] += 1
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise RuntimeError(request.error)
+        return request.result
+
+    def serve_forever(self):
+        """
+        Binds the socket and serves requests until shutdown() is called.
+        """
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, _ = recv_frame(self.request)
+                    except (ConnectionError, OSError):
+                        return
+
+                    op = header.get("op")
+                    try:
+                        if op == "stats":
+                            send_frame(self.request, dict(server.stats))
+                            continue
+                        if op not in ("embed_documents", "embed_query"):
+                            raise ValueError(f"Unsupported operation: {op}")
+
+                        texts = header.get("texts") or []
+                        vectors = server.submit(op, texts) if texts else np.zeros((0, 0), np.float32)
+                        send_frame(
+                            self.request,
+                            {"count": int(vectors.shape[0]), "dim": int(vectors.shape[1])},
+                            vectors.tobytes(),
+                        )
+                    except (ConnectionError, OSError):
+                        return
+                    except Exception as e:
+                        send_frame(self.request, {"error": str(e)})
+
+        if os.path.exists(self.socket_path):
+            # Stale socket from a previous run
+            os.remove(self.socket_path)
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._batcher = threading.Thread(target=self._run_batcher, name="embed-batcher", daemon=True)
+        self._batcher.start()
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+            # Every API worker thread keeps a connection; the default backlog of 5 is too small
+            request_queue_size = 128
+
+        self._server = Server(self.socket_path, Handler)
+        self.logger.event(
+            "embedding_server_started",
+            socket=self.socket_path,
+            max_batch=self.max_batch,
+            max_wait_ms=self.max_wait_ms,
+        )
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._queue.put(None)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self.logger.event("embedding_server_stopped", **self.stats)
+
+    def shutdown(self):
+        """
+        Stops serve_forever() from another thread.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class EmbeddingClient(Embeddings):
+    """
+    LangChain embeddings backed by a shared EmbeddingServer.
+
+    Each thread keeps its own persistent connection to the server, so
+    concurrent requests from one worker do not serialize on a socket.
+
+    Attributes:
+        socket_path (str): The server's Unix socket.
+        timeout (float): Seconds to wait for a response.
+    """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        """
+        Initializes the client. Connections are opened lazily.
+
+        Args:
+            socket_path (str): The server's Unix socket.
+            timeout (float, optional): Response timeout, defaults to EMBEDDING_SERVER_TIMEOUT.
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout if timeout is not None else float(
+            os.getenv("EMBEDDING_SERVER_TIMEOUT", "30")
+        )
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        """
+        Returns this thread's connection, opening it if needed.
+        """
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        """
+        Closes this thread's connection so the next call reconnects.
+        """
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, header: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Sends a request, reconnecting once if the connection went stale.
+
+        Only a failure to connect or send is retried: nothing reached the
+        server then. A timeout, or a failure while waiting for the response, is
+        raised at once, since the server may still be embedding the batch.
+
+        Raises:
+            RuntimeError: If the server reports an error.
+            TimeoutError: If the server does not answer within the timeout.
+            OSError: If the connection fails.
+        """
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_frame(sock, header)
+            except socket.timeout:
+                self._reset()
+                raise
+            except OSError:
+                # A stale persistent connection fails here (broken pipe)
+                self._reset()
+                if attempt:
+                    raise
+                continue
+
+            try:
+                response, payload = recv_frame(sock)
+            except OSError:
+                self._reset()
+                raise
+            break
+        if "error" in response:
+            raise RuntimeError(f"Embedding server error: {response['error']}")
+        return response, payload
+
+    def _embed(self, op: str, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response, payload = self._request({"op": op, "texts": texts})
+        vectors = np.frombuffer(payload, dtype=np.float32).reshape(response["count"], response["dim"])
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("embed_documents", list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("embed_query", [text])[0]
+
+    def server_stats(self) -> Dict[str, int]:
+        """
+        Returns the server's request, batch and text counters.
+        """
+        response, _ = self._request({"op": "stats"})
+        return response
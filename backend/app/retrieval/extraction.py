@@ -0,0 +1,141 @@
+"""
+Document text extraction utilities for the RAG Assistant.
+
+This module streams text out of PDF files page group by page group instead of
+building the whole document as one string. Each yielded segment records which
+page every part of its text came from, so chunks can carry page-range metadata,
+and memory stays bounded by the group size rather than the document size.
+Large PDFs are extracted in parallel worker processes, since pypdf is pure
+Python and bound by the GIL.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+# The reader of a worker process, opened once by _init_worker()
+_worker_reader: Optional[PdfReader] = None
+
+
+def _read_pages(reader: PdfReader, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    Extracts the text of pages [start, end) from an open PDF.
+
+    Args:
+        reader (PdfReader): The open PDF.
+        start (int): Zero-based index of the first page.
+        end (int): Zero-based index one past the last page.
+
+    Returns:
+        List[Tuple[int, str]]: (1-based page number, text) for each page with text.
+    """
+    pages = []
+    for index in range(start, end):
+        page_text = reader.pages[index].extract_text()
+        if page_text:
+            pages.append((index + 1, page_text))
+    return pages
+
+
+def _init_worker(path: str):
+    """
+    Opens the PDF once per worker process, so its xref and page tree are parsed once.
+    """
+    global _worker_reader
+    _worker_reader = PdfReader(path)
+
+
+def _extract_pages(start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    Extracts pages [start, end) with the worker process's reader.
+    """
+    return _read_pages(_worker_reader, start, end)
+
+
+def _build_segment(pages: List[Tuple[int, str]]) -> Dict[str, Any]:
+    """
+    Joins a group of pages into one segment with page start offsets.
+
+    Args:
+        pages (List[Tuple[int, str]]): (page number, text) pairs in order.
+
+    Returns:
+        Dict[str, Any]: A segment with 'text' and 'pages' as (char offset, page number) pairs.
+    """
+    offsets = []
+    position = 0
+    for page_number, page_text in pages:
+        offsets.append((position, page_number))
+        position += len(page_text) + 1
+
+    return {
+        "text": "\n".join(page_text for _, page_text in pages),
+        "pages": offsets,
+    }
+
+
+def iter_pdf_segments(
+    path: str,
+    pages_per_segment: int | None = None,
+    workers: int | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams a PDF as segments of consecutive pages.
+
+    Smaller files are read with a single reader. Files with at least
+    PDF_PARALLEL_MIN_PAGES pages are extracted by a pool of spawned processes,
+    each opening the file once. At most two groups per worker are in flight at
+    once, so memory stays bounded for multi-thousand-page files while segments
+    are still yielded in page order.
+
+    Args:
+        path (str): The path to the PDF file.
+        pages_per_segment (int, optional): Pages per segment, defaults to PDF_PAGES_PER_SEGMENT.
+        workers (int, optional): Worker processes for large files, defaults to PDF_EXTRACT_WORKERS.
+
+    Yields:
+        Dict[str, Any]: Segments with 'text' and 'pages' (char offset, page number) pairs.
+    """
+    pages_per_segment = pages_per_segment or int(os.getenv("PDF_PAGES_PER_SEGMENT", "20"))
+    workers = workers or int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+    parallel_min_pages = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "200"))
+
+    reader = PdfReader(path)
+    page_count = len(reader.pages)
+    ranges = [
+        (start, min(start + pages_per_segment, page_count))
+        for start in range(0, page_count, pages_per_segment)
+    ]
+
+    if workers <= 1 or page_count < parallel_min_pages:
+        for start, end in ranges:
+            pages = _read_pages(reader, start, end)
+            if pages:
+                yield _build_segment(pages)
+        return
+
+    del reader
+    # Spawned, not forked: the server process holds threads and torch state
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(path,),
+    ) as executor:
+        window = workers * 2
+        futures = [executor.submit(_extract_pages, s, e) for s, e in ranges[:window]]
+        next_range = len(futures)
+
+        for i in range(len(ranges)):
+            pages = futures[i].result()
+            futures[i] = None  # release the extracted text once consumed
+
+            if next_range < len(ranges):
+                start, end = ranges[next_range]
+                futures.append(executor.submit(_extract_pages, start, end))
+                next_range += 1
+
+            if pages:
+                yield _build_segment(pages)
@@ -0,0 +1,357 @@
+"""
+Metadata filters and facet counts for the RAG Assistant.
+
+Every chunk carries 'source', 'type' and 'path' metadata (plus 'page_start' and
+'page_end' for PDFs). This module turns client filters on those fields into a
+Chroma-style 'where' clause that is pushed down into the vector store query,
+so filtered searches only score matching chunks.
+
+A facet index per physical collection records how many chunks each indexed
+file contributed, counting chunks linked as near-duplicates (see dedup.py)
+as well as stored ones. It is updated incrementally as chunks are stored and files
+deleted, and saved next to the collection, so the available filter values and
+their counts are served without scanning the collection. It also resolves
+path-prefix filters, which vector stores cannot express, into the exact list
+of matching paths, and records the chunking settings the collection was built
+with (see VectorDB.check_chunking).
+"""
+import json
+import operator
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Index files written before chunking was recorded hold the file map only
+FACET_INDEX_VERSION = 2
+
+# Indexes opened by this process, shared so every VectorDB sees the same counts
+_open_indexes: Dict[str, "FacetIndex"] = {}
+_open_indexes_lock = threading.Lock()
+
+
+class FacetIndex:
+    """
+    Per-file chunk counts of one collection, with their source and type.
+
+    Attributes:
+        path (str): The JSON file holding the index.
+        files (Dict[str, Dict[str, Any]]): Indexed path -> {'source', 'type', 'chunks'}.
+        chunking (Optional[Dict[str, Any]]): The settings the collection's chunks were
+                                             split with, None until recorded.
+        loaded (bool): False until the index was read from disk or rebuilt, i.e.
+                       for a collection indexed before facets existed.
+    """
+
+    def __init__(self, path: str):
+        """
+        Loads the index file, if it exists.
+
+        Args:
+            path (str): The JSON file holding the index.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.chunking: Optional[Dict[str, Any]] = None
+        self.loaded = False
+        self._mtime = None
+        self._reload()
+
+    def _reload(self):
+        """
+        Re-reads the index file if another process changed it since the last read.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == FACET_INDEX_VERSION:
+            self.files, self.chunking = data["files"], data["chunking"]
+        else:
+            self.files, self.chunking = data, None
+        self._mtime = mtime
+        self.loaded = True
+
+    def refresh(self):
+        """
+        Picks up changes saved by another process, e.g. before this one writes.
+        """
+        with self.lock:
+            self._reload()
+
+    def version(self) -> Optional[int]:
+        """
+        Returns the index file's modification time, picking up other processes' saves.
+
+        Every write to the collection saves the index, so this changes whenever
+        any process adds or deletes chunks.
+        """
+        with self.lock:
+            self._reload()
+            return self._mtime
+
+    def save(self):
+        """
+        Atomically writes the index file.
+        """
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            tmp_file = self.path + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": FACET_INDEX_VERSION,
+                    "chunking": self.chunking,
+                    "files": self.files,
+                }, f)
+            os.replace(tmp_file, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+            self.loaded = True
+
+    def add(self, metadatas: Iterable[Dict[str, Any]]):
+        """
+        Counts newly indexed chunks, stored or linked as near-duplicates.
+
+        Args:
+            metadatas (Iterable[Dict[str, Any]]): The chunks' metadata.
+        """
+        with self.lock:
+            for meta in metadatas:
+                record = self.files.setdefault(
+                    meta.get("path", ""),
+                    {"source": meta.get("source"), "type": meta.get("type"), "chunks": 0},
+                )
+                record["chunks"] += 1
+
+    def remove(self, metadatas: Iterable[Dict[str, Any]]):
+        """
+        Uncounts chunks that are no longer indexed, e.g. dropped duplicate links.
+
+        Args:
+            metadatas (Iterable[Dict[str, Any]]): The chunks' metadata.
+        """
+        with self.lock:
+            for meta in metadatas:
+                record = self.files.get(meta.get("path", ""))
+                if record is None:
+                    continue
+                record["chunks"] -= 1
+                if record["chunks"] <= 0:
+                    del self.files[meta.get("path", "")]
+
+    def remove_path(self, path: str):
+        """
+        Forgets every chunk of a deleted file.
+
+        Args:
+            path (str): The file's 'path' metadata value.
+        """
+        with self.lock:
+            self.files.pop(path, None)
+
+    def rebuild(self, batches: Iterable[Dict[str, Any]], linked: Iterable[Dict[str, Any]] = ()):
+        """
+        Recounts every chunk from the store, for collections indexed without facets.
+
+        Args:
+            batches (Iterable[Dict[str, Any]]): VectorStore.iter_batches() output.
+            linked (Iterable[Dict[str, Any]]): Metadata of the near-duplicate chunks
+                                               linked instead of stored.
+        """
+        with self.lock:
+            self.files = {}
+        for batch in batches:
+            self.add(batch["metadatas"])
+        self.add(linked)
+        self.save()
+
+    def counts(self) -> Dict[str, Any]:
+        """
+        Aggregates the filter values and their chunk counts.
+
+        Returns:
+            Dict[str, Any]: 'sources' and 'types' (value -> chunks), 'paths'
+                            (path -> chunks), and the 'documents' and 'chunks' totals.
+        """
+        with self.lock:
+            self._reload()
+            files = list(self.files.items())
+
+        sources: Dict[str, int] = {}
+        types: Dict[str, int] = {}
+        for _, record in files:
+            sources[record["source"]] = sources.get(record["source"], 0) + record["chunks"]
+            types[record["type"]] = types.get(record["type"], 0) + record["chunks"]
+        return {
+            "sources": sources,
+            "types": types,
+            "paths": {path: record["chunks"] for path, record in files},
+            "documents": len(files),
+            "chunks": sum(record["chunks"] for _, record in files),
+        }
+
+    def paths_with_prefix(self, prefix: str) -> List[str]:
+        """
+        Lists the indexed paths that start with a prefix.
+
+        Args:
+            prefix (str): The path prefix, e.g. 'knowledge_base/raw/pdf/'.
+
+        Returns:
+            List[str]: The matching paths, sorted.
+        """
+        with self.lock:
+            self._reload()
+            return sorted(path for path in self.files if path.startswith(prefix))
+
+
+# Chroma-style comparison operators supported in 'where' filters
+WHERE_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def matches_where(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """
+    Evaluates a Chroma-style metadata filter against one chunk's metadata.
+
+    Supports plain equality ({"type": "pdf"}), the operators in WHERE_OPERATORS
+    ({"page_start": {"$gte": 10}}) and the logical '$and' / '$or' combinators.
+
+    Args:
+        metadata (Dict[str, Any]): The chunk metadata.
+        where (Dict[str, Any]): The filter.
+
+    Returns:
+        bool: True if the metadata satisfies the filter.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if not WHERE_OPERATORS[op](value, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def build_where(
+    filters: Optional[Dict[str, Any]],
+    facets: Optional[FacetIndex] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Converts client filters into a Chroma-style 'where' clause.
+
+    Args:
+        filters (Dict[str, Any], optional): Any of 'source' and 'type' (lists of
+            accepted values), 'path_prefix', 'page_min' and 'page_max'. A page
+            range keeps chunks whose pages overlap it, so it only matches PDFs.
+        facets (FacetIndex, optional): Resolves 'path_prefix' into matching paths.
+
+    Returns:
+        Optional[Dict[str, Any]]: The clause, or None if no filter is set. A
+                                  prefix matching no file yields an empty '$in'
+                                  (see matches_nothing()).
+    """
+    if not filters:
+        return None
+
+    conditions: List[Dict[str, Any]] = []
+    for field in ("source", "type"):
+        values = filters.get(field)
+        if values:
+            conditions.append({field: {"$in": list(values)}})
+
+    prefix = filters.get("path_prefix")
+    if prefix:
+        paths = facets.paths_with_prefix(prefix) if facets is not None else []
+        conditions.append({"path": {"$in": paths}})
+
+    # Overlap: the chunk ends at or after page_min and starts at or before page_max
+    if filters.get("page_min") is not None:
+        conditions.append({"page_end": {"$gte": filters["page_min"]}})
+    if filters.get("page_max") is not None:
+        conditions.append({"page_start": {"$lte": filters["page_max"]}})
+
+    if not conditions:
+        return None
+    # Chroma requires at least two operands for '$and'
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def matches_nothing(where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether a clause can match no chunk because it has an empty '$in' list.
+
+    Such queries are answered without calling the store.
+    """
+    if not where:
+        return False
+    if "$and" in where:
+        return any(matches_nothing(condition) for condition in where["$and"])
+    return any(
+        isinstance(condition, dict) and condition.get("$in") == []
+        for condition in where.values()
+    )
+
+
+def get_facet_index(path: str) -> FacetIndex:
+    """
+    Returns the process-wide facet index stored in a file.
+
+    Args:
+        path (str): The JSON file holding the index.
+
+    Returns:
+        FacetIndex: The shared index instance.
+    """
+    with _open_indexes_lock:
+        if path not in _open_indexes:
+            _open_indexes[path] = FacetIndex(path)
+        return _open_indexes[path]
+
+
+def release_facet_index(path: str) -> None:
+    """
+    Forgets an index's open instance; the saved file is reloaded on next use.
+
+    Args:
+        path (str): The JSON file holding the index.
+    """
+    with _open_indexes_lock:
+        _open_indexes.pop(path, None)
+
+
+def drop_facet_index(path: str) -> None:
+    """
+    Deletes a facet index file and forgets its open instance.
+
+    Args:
+        path (str): The JSON file holding the index.
+    """
+    release_facet_index(path)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,520 @@
+"""
+In-process NumPy vector store for the RAG Assistant.
+
+This module provides an exact-search alternative to ChromaDB for corpora of up
+to a few hundred thousand chunks. Embeddings live in one contiguous,
+memory-mapped float32/float16 file and a query is a single batched matmul plus
+argpartition per block of rows, which gives exact recall and avoids Chroma's
+HNSW-plus-SQLite round trip.
+
+On-disk layout of a store directory:
+    vectors.bin    Raw row-major embedding matrix, appended to on every add.
+    chunks.jsonl   Metadata sidecar: one {"id", "document", "metadata"} line per
+                   row, plus {"delete": row} tombstone lines for deletions.
+    manifest.json  Format version, dimension, dtype, committed row count and
+                   sidecar size. Bytes past the committed sizes are discarded on
+                   load, so an interrupted add never leaves a half-written row.
+"""
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.retrieval.facets import matches_where
+from app.retrieval.vector_store import VectorStore
+
+FORMAT_VERSION = 1
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Set bits per byte value, for Hamming distances over packed sign bits
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact nearest-neighbour search over a memory-mapped embedding matrix.
+
+    Rows are only ever appended; deletes write tombstones, and compact() rewrites
+    the files without them. Chunk texts stay on disk and are read by offset only
+    for the rows a query returns, so resident memory is the mapped matrix pages,
+    one squared norm per row and the metadata used for filtering.
+
+    With quantization enabled, the first pass scans compact in-memory codes
+    instead of the full matrix: int8 scalar codes (one byte per dimension plus
+    a per-row scale) or binary sign codes (one bit per dimension, compared by
+    Hamming distance). The best n_results * rescore_factor candidates are then
+    rescored exactly against the full-precision rows on disk, so only those
+    rows are paged in.
+
+    Attributes:
+        path (str): The store directory.
+        dtype (np.dtype): The on-disk embedding dtype (float32 or float16).
+        dim (Optional[int]): The embedding dimension, set by the first add.
+        rows (int): The number of committed rows, including tombstoned ones.
+        block_rows (int): Rows scored per matmul, bounding float32 scratch memory.
+        quantization (str): First-pass codes: 'none', 'int8' or 'binary'.
+        rescore_factor (int): Candidates rescored exactly per requested result.
+    """
+
+    name = "numpy"
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "float32",
+        block_rows: Optional[int] = None,
+        quantization: Optional[str] = None,
+        rescore_factor: Optional[int] = None,
+    ):
+        """
+        Opens (or creates) a store directory and loads its sidecar.
+
+        Args:
+            path (str): The store directory.
+            dtype (str): 'float32' or 'float16'; ignored if the store already exists.
+            block_rows (int, optional): Rows per scoring block, defaults to NUMPY_STORE_BLOCK_ROWS.
+            quantization (str, optional): 'none', 'int8' or 'binary', defaults to
+                                          NUMPY_STORE_QUANTIZATION.
+            rescore_factor (int, optional): Candidate multiplier for exact rescoring,
+                                            defaults to NUMPY_STORE_RESCORE_FACTOR.
+
+        Raises:
+            ValueError: If the quantization mode is not supported.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.vectors_file = os.path.join(path, "vectors.bin")
+        self.sidecar_file = os.path.join(path, "chunks.jsonl")
+        self.manifest_file = os.path.join(path, "manifest.json")
+
+        self.block_rows = block_rows or int(os.getenv("NUMPY_STORE_BLOCK_ROWS", "65536"))
+        self.quantization = (
+            quantization or os.getenv("NUMPY_STORE_QUANTIZATION", "none")
+        ).lower()
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization mode: {self.quantization}")
+        self.rescore_factor = rescore_factor or int(
+            os.getenv("NUMPY_STORE_RESCORE_FACTOR", "8")
+        )
+        self.lock = threading.Lock()
+
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self.rows = 0
+        self._load()
+
+    def _load(self):
+        """
+        Reads the manifest and replays the sidecar into memory.
+        """
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.dtype = np.dtype(manifest["dtype"])
+            self.dim = manifest["dim"]
+            self.rows = manifest["rows"]
+
+            # Drop anything written after the last commit by an interrupted add
+            for path, size in (
+                (self.sidecar_file, manifest["sidecar_bytes"]),
+                (self.vectors_file, self.rows * (self.dim or 0) * self.dtype.itemsize),
+            ):
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+
+        self.ids: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.offsets: List[int] = []
+        alive: List[bool] = []
+        deleted_rows: List[int] = []
+
+        if os.path.exists(self.sidecar_file):
+            with open(self.sidecar_file, "rb") as f:
+                offset = 0
+                for line in f:
+                    record = json.loads(line)
+                    if "delete" in record:
+                        deleted_rows.append(record["delete"])
+                    elif len(self.ids) < self.rows:
+                        self.ids.append(record["id"])
+                        self.metadatas.append(record["metadata"])
+                        self.offsets.append(offset)
+                        alive.append(True)
+                    offset += len(line)
+
+        self.rows = len(self.ids)
+        self.alive = np.array(alive, dtype=bool)
+        for row in deleted_rows:
+            if row < self.rows:
+                self.alive[row] = False
+
+        self.id_to_row = {
+            chunk_id: row for row, chunk_id in enumerate(self.ids) if self.alive[row]
+        }
+
+        self._remap()
+        norms, codes, scales = [], [], []
+        for start in range(0, self.rows, self.block_rows):
+            block = np.asarray(self.vectors[start:start + self.block_rows], dtype=np.float32)
+            norms.append(np.einsum("ij,ij->i", block, block))
+            block_codes, block_scales = self._quantize(block)
+            codes.append(block_codes)
+            scales.append(block_scales)
+
+        self.norms = np.concatenate(norms) if norms else np.zeros(0, dtype=np.float32)
+        self.codes, self.scales = self._quantize(np.zeros((0, self.dim or 0), dtype=np.float32))
+        if codes:
+            self.codes = np.concatenate(codes)
+            self.scales = np.concatenate(scales)
+
+    def _quantize(self, block: np.ndarray):
+        """
+        Encodes float32 rows into the first-pass codes for the quantization mode.
+
+        int8 uses symmetric per-row scaling (x ~= code * scale); binary packs the
+        sign of each dimension into bits.
+
+        Args:
+            block (np.ndarray): Rows to encode, shape (n, dim).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The codes and the per-row int8 scales
+                                           (empty for other modes).
+        """
+        no_scales = np.zeros(0, dtype=np.float32)
+        if self.quantization == "int8":
+            scales = np.abs(block).max(axis=1) / 127.0 if len(block) else no_scales
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            codes = np.clip(np.rint(block / scales[:, None]), -127, 127).astype(np.int8)
+            return codes, scales
+        if self.quantization == "binary":
+            return np.packbits(block > 0, axis=1), no_scales
+        return np.zeros((len(block), 0), dtype=np.uint8), no_scales
+
+    def _remap(self):
+        """
+        Memory-maps the committed rows of the vector file.
+        """
+        if self.rows == 0 or self.dim is None:
+            self.vectors = np.zeros((0, self.dim or 0), dtype=self.dtype)
+        else:
+            self.vectors = np.memmap(
+                self.vectors_file,
+                dtype=self.dtype,
+                mode="r",
+                shape=(self.rows, self.dim),
+            )
+
+    def _write_manifest(self):
+        """
+        Atomically records the committed row count, sidecar size, dimension and dtype.
+        """
+        tmp_file = self.manifest_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": FORMAT_VERSION,
+                    "dim": self.dim,
+                    "dtype": self.dtype.name,
+                    "rows": self.rows,
+                    "sidecar_bytes": os.path.getsize(self.sidecar_file)
+                    if os.path.exists(self.sidecar_file) else 0,
+                },
+                f,
+            )
+        os.replace(tmp_file, self.manifest_file)
+
+    def _read_document(self, row: int) -> str:
+        """
+        Reads one chunk's text from the sidecar by byte offset.
+        """
+        with open(self.sidecar_file, "rb") as f:
+            f.seek(self.offsets[row])
+            return json.loads(f.readline())["document"]
+
+    def get_ids(self) -> Set[str]:
+        return set(self.id_to_row)
+
+    def count(self) -> int:
+        return len(self.id_to_row)
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        """
+        Appends rows to the vector file and sidecar, then commits the manifest.
+
+        Re-adding an existing ID tombstones its previous row.
+        """
+        if not ids:
+            return
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        with self.lock:
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+            if matrix.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {matrix.shape[1]} does not match store dimension {self.dim}"
+                )
+
+            replaced = [self.id_to_row[i] for i in ids if i in self.id_to_row]
+            if replaced:
+                self._tombstone(replaced)
+
+            with open(self.vectors_file, "ab") as f:
+                f.write(matrix.astype(self.dtype).tobytes())
+
+            with open(self.sidecar_file, "ab") as f:
+                for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                    line = json.dumps(
+                        {"id": chunk_id, "document": document, "metadata": metadata},
+                        ensure_ascii=False,
+                    ).encode("utf-8") + b"\n"
+                    self.offsets.append(f.tell())
+                    f.write(line)
+
+            start = self.rows
+            for offset, chunk_id in enumerate(ids):
+                self.id_to_row[chunk_id] = start + offset
+            self.ids.extend(ids)
+            self.metadatas.extend(metadatas)
+            self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+            stored = matrix.astype(self.dtype).astype(np.float32)
+            self.norms = np.concatenate([self.norms, np.einsum("ij,ij->i", stored, stored)])
+            codes, scales = self._quantize(stored)
+            self.codes = np.concatenate([self.codes, codes]) if len(self.codes) else codes
+            self.scales = np.concatenate([self.scales, scales])
+
+            self.rows += len(ids)
+            self._remap()
+            self._write_manifest()
+
+    def _tombstone(self, rows: List[int]):
+        """
+        Marks rows deleted in memory and in the sidecar. Caller holds the lock.
+        """
+        with open(self.sidecar_file, "ab") as f:
+            for row in rows:
+                f.write(json.dumps({"delete": row}).encode("utf-8") + b"\n")
+
+        alive = self.alive.copy()
+        for row in rows:
+            alive[row] = False
+            self.id_to_row.pop(self.ids[row], None)
+        self.alive = alive
+
+    def delete(self, ids=None, where=None) -> None:
+        with self.lock:
+            rows = {self.id_to_row[i] for i in (ids or []) if i in self.id_to_row}
+            if where:
+                rows.update(
+                    row for row in self.id_to_row.values()
+                    if matches_where(self.metadatas[row], where)
+                )
+            if rows:
+                self._tombstone(sorted(rows))
+                self._write_manifest()
+
+    def _first_pass(
+        self,
+        queries: np.ndarray,
+        query_norms: np.ndarray,
+        vectors: np.ndarray,
+        norms: np.ndarray,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        start: int,
+        end: int,
+    ) -> np.ndarray:
+        """
+        Scores rows [start, end) against all queries; lower is closer.
+
+        Without quantization this is the exact squared L2 distance (matching
+        Chroma's default). int8 approximates the dot product from the codes, and
+        binary returns the Hamming distance between sign bits.
+
+        Returns:
+            np.ndarray: Scores of shape (num_queries, end - start).
+        """
+        if self.quantization == "binary":
+            query_bits = np.packbits(queries > 0, axis=1)
+            block = codes[start:end]
+            return np.stack([
+                POPCOUNT[np.bitwise_xor(block, bits)].sum(axis=1, dtype=np.int32)
+                for bits in query_bits
+            ]).astype(np.float32)
+
+        if self.quantization == "int8":
+            dots = (queries @ codes[start:end].astype(np.float32).T) * scales[None, start:end]
+        else:
+            dots = queries @ np.asarray(vectors[start:end], dtype=np.float32).T
+
+        return query_norms[:, None] + norms[None, start:end] - 2.0 * dots
+
+    def query(self, query_embeddings, n_results, where=None):
+        """
+        Scores every live row against all queries, one matmul per block of rows.
+
+        With quantization, the codes pick n_results * rescore_factor candidates
+        which are then rescored exactly against the full-precision rows.
+        """
+        with self.lock:
+            vectors, norms, alive = self.vectors, self.norms, self.alive
+            codes, scales = self.codes, self.scales
+
+        num_queries = len(query_embeddings)
+        empty = {key: [[] for _ in range(num_queries)] for key in ("ids", "documents", "metadatas", "distances")}
+        if len(vectors) == 0 or n_results <= 0:
+            return empty
+
+        mask = alive
+        if where:
+            mask = alive & np.fromiter(
+                (matches_where(meta, where) for meta in self.metadatas[:len(alive)]),
+                dtype=bool,
+                count=len(alive),
+            )
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+
+        quantized = self.quantization != "none"
+        n_candidates = n_results * self.rescore_factor if quantized else n_results
+
+        candidate_dist = []
+        candidate_rows = []
+        for start in range(0, len(vectors), self.block_rows):
+            end = min(start + self.block_rows, len(vectors))
+
+            dist = self._first_pass(queries, query_norms, vectors, norms, codes, scales, start, end)
+            dist[:, ~mask[start:end]] = np.inf
+
+            k = min(n_candidates, end - start)
+            top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            candidate_dist.append(np.take_along_axis(dist, top, axis=1))
+            candidate_rows.append(top + start)
+
+        all_dist = np.concatenate(candidate_dist, axis=1)
+        all_rows = np.concatenate(candidate_rows, axis=1)
+
+        results = {key: [] for key in empty}
+        for q in range(num_queries):
+            order = np.argsort(all_dist[q])[:n_candidates]
+            order = order[np.isfinite(all_dist[q, order])]
+            rows = all_rows[q, order]
+            distances = all_dist[q, order]
+
+            if quantized and len(rows):
+                # Exact rescoring against the full-precision rows on disk
+                rows = np.sort(rows)
+                exact = np.asarray(vectors[rows], dtype=np.float32)
+                distances = query_norms[q] + norms[rows] - 2.0 * (exact @ queries[q])
+                best = np.argsort(distances)[:n_results]
+                rows, distances = rows[best], distances[best]
+
+            rows = [int(row) for row in rows[:n_results]]
+            results["ids"].append([self.ids[row] for row in rows])
+            results["documents"].append([self._read_document(row) for row in rows])
+            results["metadatas"].append([self.metadatas[row] for row in rows])
+            results["distances"].append([max(float(d), 0.0) for d in distances[:n_results]])
+        return results
+
+    def get(self, ids):
+        with self.lock:
+            vectors = self.vectors
+            rows = [self.id_to_row[chunk_id] for chunk_id in ids if chunk_id in self.id_to_row]
+        return {
+            "ids": [self.ids[row] for row in rows],
+            "embeddings": np.asarray(vectors[rows], dtype=np.float32),
+            "documents": [self._read_document(row) for row in rows],
+            "metadatas": [self.metadatas[row] for row in rows],
+        }
+
+    def iter_batches(self, batch_size=1000):
+        with self.lock:
+            vectors, live_rows = self.vectors, np.flatnonzero(self.alive)
+
+        with open(self.sidecar_file, "rb") as f:
+            for start in range(0, len(live_rows), batch_size):
+                rows = live_rows[start:start + batch_size]
+                documents = []
+                for row in rows:
+                    f.seek(self.offsets[row])
+                    documents.append(json.loads(f.readline())["document"])
+                yield {
+                    "ids": [self.ids[row] for row in rows],
+                    "embeddings": np.asarray(vectors[rows], dtype=np.float32),
+                    "documents": documents,
+                    "metadatas": [self.metadatas[row] for row in rows],
+                }
+
+    def drop(self) -> None:
+        with self.lock:
+            self.vectors = np.zeros((0, self.dim or 0), dtype=self.dtype)
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def compact(self) -> int:
+        """
+        Rewrites the store without tombstoned rows.
+
+        Returns:
+            int: The number of rows removed.
+        """
+        with self.lock:
+            live_rows = np.flatnonzero(self.alive)
+            removed = self.rows - len(live_rows)
+            if removed == 0:
+                return 0
+
+            tmp_vectors = self.vectors_file + ".tmp"
+            tmp_sidecar = self.sidecar_file + ".tmp"
+            with open(tmp_vectors, "wb") as vf, open(tmp_sidecar, "wb") as sf:
+                for start in range(0, len(live_rows), self.block_rows):
+                    rows = live_rows[start:start + self.block_rows]
+                    vf.write(np.ascontiguousarray(self.vectors[rows]).tobytes())
+                for row in live_rows:
+                    sf.write(json.dumps(
+                        {
+                            "id": self.ids[row],
+                            "document": self._read_document(row),
+                            "metadata": self.metadatas[row],
+                        },
+                        ensure_ascii=False,
+                    ).encode("utf-8") + b"\n")
+
+            self.vectors = None
+            os.replace(tmp_vectors, self.vectors_file)
+            os.replace(tmp_sidecar, self.sidecar_file)
+            self.rows = len(live_rows)
+            self._write_manifest()
+            self._load()
+            return removed
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Reports the bytes used by the store's main structures.
+
+        With quantization, 'resident_bytes' excludes the full-precision vectors,
+        which are only paged in for rescoring.
+
+        Returns:
+            Dict[str, int]: Rows, on-disk vector bytes and in-memory code/norm/mask bytes.
+        """
+        vector_bytes = self.rows * (self.dim or 0) * self.dtype.itemsize
+        code_bytes = int(self.codes.nbytes + self.scales.nbytes)
+        resident = code_bytes + int(self.norms.nbytes) + int(self.alive.nbytes)
+        if self.quantization == "none":
+            resident += vector_bytes
+
+        return {
+            "rows": self.rows,
+            "live_rows": self.count(),
+            "vector_bytes": vector_bytes,
+            "code_bytes": code_bytes,
+            "norm_bytes": int(self.norms.nbytes),
+            "mask_bytes": int(self.alive.nbytes),
+            "resident_bytes": resident,
+        }
@@ -0,0 +1,208 @@
+"""
+Portable index snapshots for the RAG Assistant.
+
+This module exports the contents of a vector store to a compact, versioned
+snapshot directory and imports it back, so a new replica can come up without
+copying a backend-specific database or re-embedding the knowledge base.
+
+Snapshot layout:
+    manifest.json  Format name and version, embedding model, chunking settings,
+                   dimension, dtype, chunk count and the ingest manifest (chunks
+                   per source file).
+    vectors.npy    All embeddings as one contiguous array, loaded memory-mapped.
+    chunks.jsonl   One {"id", "document", "metadata"} line per vector row.
+    dedup/         The near-duplicate index, if one was in use.
+
+Vectors are written as each batch is read from the store, so a chunk added or
+deleted during an export cannot leave vectors.npy out of step with chunks.jsonl.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import numpy as np
+
+from app.retrieval.dedup import NearDuplicateIndex
+
+SNAPSHOT_FORMAT = "rag-assistant-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def export_snapshot(vector_db, path: str, dtype: str = "float32", batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Writes every chunk of a VectorDB's store to a snapshot directory.
+
+    Args:
+        vector_db (VectorDB): The database to export.
+        path (str): The snapshot directory to create.
+        dtype (str): 'float32' or 'float16' for the stored vectors.
+        batch_size (int): Chunks read from the store per batch.
+
+    Returns:
+        Dict[str, Any]: The snapshot manifest.
+    """
+    os.makedirs(path, exist_ok=True)
+    store = vector_db.store
+
+    # Raw rows first; the .npy header needs the final row count
+    raw_path = os.path.join(path, "vectors.raw")
+    dim = 0
+    sources: Dict[str, int] = {}
+    row = 0
+    with open(os.path.join(path, "chunks.jsonl"), "w", encoding="utf-8") as f, open(raw_path, "wb") as raw:
+        for batch in store.iter_batches(batch_size):
+            embeddings = np.ascontiguousarray(batch["embeddings"], dtype=np.dtype(dtype))
+            dim = embeddings.shape[1]
+            raw.write(embeddings.tobytes())
+            row += len(embeddings)
+
+            for chunk_id, document, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"]):
+                f.write(json.dumps(
+                    {"id": chunk_id, "document": document, "metadata": metadata},
+                    ensure_ascii=False,
+                ) + "\n")
+                source_path = metadata.get("path", "")
+                sources[source_path] = sources.get(source_path, 0) + 1
+
+    if row:
+        with open(os.path.join(path, "vectors.npy"), "wb") as out, open(raw_path, "rb") as raw:
+            np.lib.format.write_array_header_1_0(out, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                "fortran_order": False,
+                "shape": (row, dim),
+            })
+            shutil.copyfileobj(raw, out)
+    os.remove(raw_path)
+
+    if vector_db.dedup is not None and os.path.isdir(vector_db.dedup.path):
+        vector_db.dedup.save()
+        shutil.copytree(vector_db.dedup.path, os.path.join(path, "dedup"), dirs_exist_ok=True)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "collection": vector_db.collection_name,
+        "embedding_model": vector_db.embedding_model_name,
+        "chunking": vector_db.recorded_chunking(),
+        "dim": dim,
+        "dtype": dtype,
+        "count": row,
+        "sources": sources,
+    }
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    vector_db.logger.event("snapshot_exported", path=path, chunks=row, dtype=dtype)
+    return manifest
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """
+    Reads and validates a snapshot manifest.
+
+    Args:
+        path (str): The snapshot directory.
+
+    Returns:
+        Dict[str, Any]: The manifest.
+
+    Raises:
+        ValueError: If the directory is not a supported snapshot.
+    """
+    with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a RAG Assistant snapshot")
+    if manifest.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Snapshot version {manifest['version']} is newer than supported version {SNAPSHOT_VERSION}"
+        )
+    return manifest
+
+
+def import_snapshot(vector_db, path: str, batch_size: int = 5000, force: bool = False) -> int:
+    """
+    Loads a snapshot into a VectorDB's store without running the embedding model.
+
+    The vector file is memory-mapped and copied in batches; chunks whose IDs
+    are already stored are skipped. The snapshot's near-duplicate index is
+    merged into the live one, keeping the links the collection already had.
+
+    Args:
+        vector_db (VectorDB): The database to import into.
+        path (str): The snapshot directory.
+        batch_size (int): Chunks written to the store per batch.
+        force (bool): Import even if the snapshot used a different embedding model
+                      or chunking settings.
+
+    Returns:
+        int: The number of chunks imported.
+
+    Raises:
+        ValueError: If the snapshot is invalid or its embedding model or chunking
+                    settings do not match the collection.
+    """
+    manifest = read_manifest(path)
+    if manifest["embedding_model"] != vector_db.embedding_model_name and not force:
+        raise ValueError(
+            f"Snapshot was built with {manifest['embedding_model']}, "
+            f"but this instance uses {vector_db.embedding_model_name}"
+        )
+
+    # Chunk IDs only match between snapshot and collection if both were split alike
+    chunking = manifest.get("chunking")
+    recorded = vector_db.recorded_chunking()
+    if chunking is not None and recorded is not None and chunking != recorded and not force:
+        raise ValueError(
+            f"Snapshot was chunked with {chunking}, but the collection was chunked with {recorded}"
+        )
+
+    if manifest["count"] == 0:
+        return 0
+
+    vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+    existing_ids = vector_db.store.get_ids()
+    imported = 0
+
+    def flush(rows, ids, documents, metadatas):
+        vector_db.store.add(
+            ids=ids,
+            embeddings=np.asarray(vectors[rows], dtype=np.float32),
+            documents=documents,
+            metadatas=metadatas,
+        )
+        return len(ids)
+
+    rows, ids, documents, metadatas = [], [], [], []
+    with open(os.path.join(path, "chunks.jsonl"), "r", encoding="utf-8") as f:
+        for row, line in enumerate(f):
+            record = json.loads(line)
+            if record["id"] in existing_ids:
+                continue
+            rows.append(row)
+            ids.append(record["id"])
+            documents.append(record["document"])
+            metadatas.append(record["metadata"])
+            if len(ids) >= batch_size:
+                imported += flush(rows, ids, documents, metadatas)
+                rows, ids, documents, metadatas = [], [], [], []
+
+    if ids:
+        imported += flush(rows, ids, documents, metadatas)
+
+    if recorded is None:
+        # Saved with the facet index VectorDB.import_snapshot() rebuilds
+        vector_db.facets.chunking = chunking
+
+    dedup_path = os.path.join(path, "dedup")
+    merged = None
+    if vector_db.dedup is not None and os.path.isdir(dedup_path):
+        merged = vector_db.dedup.merge(NearDuplicateIndex(dedup_path), stored_ids=existing_ids)
+        vector_db.dedup.save()
+
+    vector_db.logger.event("snapshot_imported", path=path, chunks=imported, dedup_merged=merged)
+    return imported
@@ -0,0 +1,267 @@
+"""
+Pluggable vector store backends for the RAG Assistant.
+
+This module defines the small storage interface VectorDB relies on (add, get
+IDs or chunks, delete, nearest-neighbour query, batched export) and the ChromaDB
+implementation of it, either embedded or talking to a Chroma server
+(CHROMA_MODE=http, see chroma_http.py).
+The backend is selected with the VECTOR_STORE environment variable, so the
+in-process NumPy store can be swapped in without touching the rest of the app.
+"""
+import os
+
+# Disable ChromaDB telemetry before any other imports
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import chromadb
+import numpy as np
+
+
+# Stores opened by this process, shared so every VectorDB sees the same data
+_open_stores: Dict[Tuple[str, str], "VectorStore"] = {}
+_open_stores_lock = threading.Lock()
+
+
+class VectorStore(ABC):
+    """
+    Interface for a collection of embedded chunks.
+
+    Query results follow Chroma's shape: one list per query embedding under
+    'ids', 'documents', 'metadatas' and 'distances', with distances being
+    squared L2 (lower is closer).
+    """
+
+    name: str
+
+    @abstractmethod
+    def get_ids(self) -> Set[str]:
+        """
+        Returns the IDs of every stored chunk.
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Returns the number of stored chunks.
+        """
+
+    @abstractmethod
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Appends chunks with their embeddings, texts and metadata.
+        """
+
+    @abstractmethod
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Deletes chunks by ID or by a metadata filter.
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Returns the n_results nearest chunks for each query embedding.
+        """
+
+    @abstractmethod
+    def get(self, ids: List[str]) -> Dict[str, Any]:
+        """
+        Returns the given chunks as 'ids', 'embeddings' (a float32 array),
+        'documents' and 'metadatas'; IDs that are not stored are skipped.
+        """
+
+    @abstractmethod
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Yields every stored chunk in batches of 'ids', 'embeddings' (a float32
+        array), 'documents' and 'metadatas'.
+        """
+
+    @abstractmethod
+    def drop(self) -> None:
+        """
+        Permanently deletes the collection and its data.
+        """
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    Vector store backed by a persistent ChromaDB collection.
+
+    Attributes:
+        client (chromadb.ClientAPI): The embedded PersistentClient, or the shared
+                                     client of a Chroma server.
+        collection (chromadb.Collection): The active collection object.
+    """
+
+    name = "chroma"
+
+    def __init__(self, collection_name: str, persist_path: Optional[str] = None, client: Any = None):
+        """
+        Opens (or creates) a collection in a local persistent ChromaDB or on a server.
+
+        Args:
+            collection_name (str): The name of the collection.
+            persist_path (str, optional): The directory where an embedded ChromaDB persists data.
+            client (chromadb.ClientAPI, optional): A client to use instead, e.g. of a Chroma server.
+        """
+        self.collection_name = collection_name
+        self.client = client or chromadb.PersistentClient(path=persist_path)
+        self.collection = self.client.get_or_create_collection(name=collection_name)
+
+    def get_ids(self) -> Set[str]:
+        try:
+            existing = self.collection.get(include=[])
+            return set(existing.get("ids", []))
+        except Exception:
+            # Collection may be empty
+            return set()
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas,
+        )
+
+    def delete(self, ids=None, where=None) -> None:
+        self.collection.delete(ids=ids, where=where)
+
+    def query(self, query_embeddings, n_results, where=None):
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+
+    def get(self, ids):
+        found = self.collection.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+        return {
+            "ids": found["ids"],
+            "embeddings": np.asarray(found["embeddings"], dtype=np.float32),
+            "documents": found["documents"],
+            "metadatas": found["metadatas"],
+        }
+
+    def iter_batches(self, batch_size=1000):
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset,
+            )
+            if not batch["ids"]:
+                return
+            yield {
+                "ids": batch["ids"],
+                "embeddings": np.asarray(batch["embeddings"], dtype=np.float32),
+                "documents": batch["documents"],
+                "metadatas": batch["metadatas"],
+            }
+            offset += len(batch["ids"])
+
+    def drop(self) -> None:
+        self.client.delete_collection(name=self.collection_name)
+
+
+def create_vector_store(collection_name: str, backend: Optional[str] = None) -> VectorStore:
+    """
+    Factory function to create the configured vector store backend.
+
+    Stores are opened once per process and backend/collection pair; later calls
+    return the same instance, so in-process backends never hold diverging copies.
+
+    Args:
+        collection_name (str): The name of the collection to open.
+        backend (str, optional): 'chroma' or 'numpy', defaults to VECTOR_STORE.
+
+    Returns:
+        VectorStore: The opened vector store.
+
+    Raises:
+        ValueError: If the backend name is not supported.
+    """
+    backend = (backend or os.getenv("VECTOR_STORE", "chroma")).lower()
+
+    with _open_stores_lock:
+        key = (backend, collection_name)
+        if key in _open_stores:
+            return _open_stores[key]
+
+        if backend == "chroma" and os.getenv("CHROMA_MODE", "embedded").lower() == "http":
+            from app.retrieval.chroma_http import get_chroma_http_client
+            store = ChromaVectorStore(collection_name=collection_name, client=get_chroma_http_client())
+        elif backend == "chroma":
+            store = ChromaVectorStore(
+                collection_name=collection_name,
+                persist_path=os.getenv("CHROMA_PATH", "./backend/chroma_db"),
+            )
+        elif backend == "numpy":
+            from app.retrieval.numpy_store import NumpyVectorStore
+            store = NumpyVectorStore(
+                path=os.path.join(
+                    os.getenv("NUMPY_STORE_PATH", "./backend/numpy_store"),
+                    collection_name,
+                ),
+                dtype=os.getenv("NUMPY_STORE_DTYPE", "float32"),
+            )
+        else:
+            raise ValueError(f"Unsupported VECTOR_STORE backend: {backend}")
+
+        _open_stores[key] = store
+        return store
+
+
+def release_vector_store(collection_name: str, backend: Optional[str] = None) -> None:
+    """
+    Forgets a collection's open instance so its memory can be reclaimed.
+
+    The data stays on disk; the next create_vector_store() call reopens it.
+
+    Args:
+        collection_name (str): The name of the collection to release.
+        backend (str, optional): 'chroma' or 'numpy', defaults to VECTOR_STORE.
+    """
+    backend = (backend or os.getenv("VECTOR_STORE", "chroma")).lower()
+    with _open_stores_lock:
+        _open_stores.pop((backend, collection_name), None)
+
+
+def drop_vector_store(collection_name: str, backend: Optional[str] = None) -> None:
+    """
+    Deletes a collection and forgets its open instance.
+
+    Args:
+        collection_name (str): The name of the collection to drop.
+        backend (str, optional): 'chroma' or 'numpy', defaults to VECTOR_STORE.
+    """
+    backend = (backend or os.getenv("VECTOR_STORE", "chroma")).lower()
+    store = create_vector_store(collection_name, backend)
+    with _open_stores_lock:
+        _open_stores.pop((backend, collection_name), None)
+    store.drop()
@@ -1,28 +1,97 @@
 """
 Vector database management module for the RAG Assistant.
 
-This module provides a wrapper around ChromaDB for storing and retrieving
-document embeddings. It handles model initialization, document chunking,
-idempotent ingestion, and semantic search.
+This module provides a wrapper around a pluggable vector store (ChromaDB by
+default, or the in-process NumPy store) for storing and retrieving document
+embeddings. It handles model initialization, document chunking, idempotent
+ingestion, and semantic search with optional metadata filters.
 """
 import os
 
 # Disable ChromaDB telemetry before any other imports
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 
-from typing import List, Dict, Any
+import bisect
+import random
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
-import chromadb
+import numpy as np
 import torch
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.logging.logger import StructuredLogger
+from app.retrieval import snapshot
+from app.retrieval.chunking import BOUNDARY_SETTINGS, CHAR_CHUNK_OVERLAP, CHAR_CHUNK_SIZE, build_splitter
+from app.retrieval.aliases import get_collection_aliases
+from app.retrieval.dedup import (
+    drop_near_duplicate_index,
+    get_near_duplicate_index,
+    release_near_duplicate_index,
+)
+from app.retrieval.embedding_server import EmbeddingClient
+from app.retrieval.facets import (
+    build_where,
+    drop_facet_index,
+    get_facet_index,
+    matches_nothing,
+    release_facet_index,
+)
+from app.retrieval.vector_store import create_vector_store, drop_vector_store, release_vector_store
+from app.retrieval.write_lock import get_index_write_lock
+
+
+def dedup_index_path(collection_name: str) -> str:
+    """
+    Returns the near-duplicate index directory of a physical collection.
+    """
+    return os.path.join(
+        os.getenv("DEDUP_INDEX_PATH", "./backend/dedup_index"),
+        collection_name,
+    )
+
+
+def facet_index_path(collection_name: str) -> str:
+    """
+    Returns the facet index file of a physical collection.
+    """
+    return os.path.join(
+        os.getenv("FACET_INDEX_PATH", "./backend/facet_index"),
+        f"{collection_name}.json",
+    )
+
+
+def load_embedding_model(model_name: str) -> Tuple[HuggingFaceEmbeddings, str]:
+    """
+    Loads a sentence-transformers model on the best available device.
+
+    Args:
+        model_name (str): The HuggingFace model name.
+
+    Returns:
+        Tuple[HuggingFaceEmbeddings, str]: The model and the device it runs on
+                                           ('cuda', 'mps' or 'cpu').
+    """
+    device = (
+        "cuda"
+        if torch.cuda.is_available()
+        else "mps"
+        if torch.backends.mps.is_available()
+        else "cpu"
+    )
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"device": device},
+    )
+    return embeddings, device
 
 
 class VectorDB:
     """
-    A class to interact with a persistent ChromaDB instance.
+    A class to interact with a persistent vector store.
 
     This class encapsulates all vector database operations, including:
     - Initializing the local embedding model (sentence-transformers).
@@ -31,145 +100,642 @@ class VectorDB:
     - Performing semantic searches to find relevant context for user queries.
 
     Attributes:
-        collection_name (str): The name of the ChromaDB collection.
-        persist_path (str): The file path where ChromaDB persists data.
+        collection_name (str): The logical name of the vector store collection.
+        active_collection (str): The physical collection generation currently in use.
         embedding_model_name (str): The name of the HuggingFace model used for embeddings.
-        embeddings (HuggingFaceEmbeddings): The initialized embedding model instance.
-        client (chromadb.PersistentClient): The ChromaDB client.
-        collection (chromadb.Collection): The active collection object.
-        splitter (RecursiveCharacterTextSplitter): Utility for chunking text before indexing.
+        embeddings (Optional[Embeddings]): The embedding model, a client of the shared
+                                           embedding server, or None if not loaded.
+        store (VectorStore): The active vector store backend (see VECTOR_STORE).
+        splitter (RecursiveCharacterTextSplitter): Utility for chunking text before indexing,
+                                                   sized in the embedding model's tokens.
+        chunking (Dict[str, Any]): The splitter's 'unit', 'chunk_size', 'chunk_overlap'
+                                   and the model's 'max_tokens'.
+        embed_batch_size (int): Number of chunks embedded and stored per batch.
+        stage_seconds (Dict[str, float]): Cumulative time spent chunking, embedding and storing.
+        dedup (Optional[NearDuplicateIndex]): Near-duplicate index, if DEDUP_ENABLED.
+        facets (FacetIndex): Per-file chunk counts, for filter values and path prefixes.
         logger (StructuredLogger): Logger for tracking DB operations.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        collection_name: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        load_embeddings: bool = True,
+    ):
         """
         Initializes the VectorDB with configuration from environment variables.
 
-        Sets up the embedding model (using CPU, CUDA, or MPS), initializes the
-        persistent ChromaDB client, and prepares the document splitter.
+        Sets up the embedding model (using CPU, CUDA, or MPS, or a client of the
+        shared embedding server when EMBEDDING_SERVER_SOCKET is set), opens the
+        configured vector store backend, and prepares the document splitter.
+
+        Args:
+            collection_name (str, optional): Logical collection to use, defaults to
+                                             CHROMA_COLLECTION_NAME.
+            embeddings (Embeddings, optional): An already loaded embedding model to
+                                               share instead of loading one.
+            load_embeddings (bool): If False, no embedding model is loaded, for tools
+                                    that only move stored vectors (e.g. snapshots);
+                                    ingestion and search are then unavailable.
         """
         self.logger = StructuredLogger(component="vectordb")
 
-        self.collection_name = os.getenv("CHROMA_COLLECTION_NAME", "rag_docs")
-        self.persist_path = os.getenv("CHROMA_PATH", "./backend/chroma_db")
-
-        device = (
-            "cuda"
-            if torch.cuda.is_available()
-            else "mps"
-            if torch.backends.mps.is_available()
-            else "cpu"
-        )
+        self.collection_name = collection_name or os.getenv("CHROMA_COLLECTION_NAME", "rag_docs")
 
         self.embedding_model_name = os.getenv(
             "EMBEDDING_MODEL",
             "sentence-transformers/all-MiniLM-L6-v2",
         )
 
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=self.embedding_model_name,
-            model_kwargs={"device": device},
-        )
-
-        self.client = chromadb.PersistentClient(path=self.persist_path)
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name
-        )
+        embedding_server_socket = os.getenv("EMBEDDING_SERVER_SOCKET")
+        if embeddings is not None:
+            device = "shared"
+            self.embeddings = embeddings
+        elif not load_embeddings:
+            device = "none"
+            self.embeddings = None
+        elif embedding_server_socket:
+            # The model lives in a shared embedding server process
+            device = "embedding-server"
+            self.embeddings = EmbeddingClient(embedding_server_socket)
+        else:
+            self.embeddings, device = load_embedding_model(self.embedding_model_name)
+
+        self.splitter, self.chunking = build_splitter(self.embedding_model_name, self.embeddings)
+        if self.chunking["fallback"]:
+            self.logger.event(
+                "chunking_fallback",
+                model=self.embedding_model_name,
+                message="Tokenizer or sequence limit unavailable; ingestion is refused until it loads "
+                        "(or CHUNK_LENGTH_UNIT=chars is set)",
+            )
+        self.embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+        self.stage_seconds = {"chunk": 0.0, "embed": 0.0, "store": 0.0}
+        self.dedup_enabled = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
 
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ". ", " ", ""],
-        )
+        self.aliases = get_collection_aliases()
+        self._bind(self.aliases.resolve(self.collection_name))
 
         self.logger.event(
             "vectordb_initialized",
             collection=self.collection_name,
+            active_collection=self.active_collection,
+            backend=self.store.name,
             device=device,
+            chunking=self.chunking,
         )
 
+    def _bind(self, active_collection: str):
+        """
+        Points the store and near-duplicate index at a physical collection.
+
+        Args:
+            active_collection (str): The physical collection to use.
+        """
+        self.dedup = None
+        if self.dedup_enabled:
+            self.dedup = get_near_duplicate_index(dedup_index_path(active_collection))
+        self.facets = get_facet_index(facet_index_path(active_collection))
+        self.store = create_vector_store(active_collection)
+        self.active_collection = active_collection
+
+    def _ensure_facets(self):
+        """
+        Builds the facet index once for collections indexed before it existed.
+        """
+        if self.facets.loaded:
+            return
+        if self.store.count() == 0:
+            self.facets.save()
+            return
+        self.facets.rebuild(self.store.iter_batches(), self._linked_metadata())
+        self.logger.event("facet_index_rebuilt", collection=self.active_collection)
+
+    def _linked_metadata(self) -> List[Dict[str, Any]]:
+        """
+        Returns the metadata of chunks linked as near-duplicates, which facets count too.
+        """
+        if self.dedup is None:
+            return []
+        return self.dedup.linked_metadata()
+
+    def _follow_alias(self, force: bool = False):
+        """
+        Re-binds to the active generation if a reindex swapped it since the last call.
+
+        Args:
+            force (bool): Re-read the alias file now rather than at most once a second.
+        """
+        active_collection = self.aliases.resolve(self.collection_name, force=force)
+        if active_collection != self.active_collection:
+            self._bind(active_collection)
+            self.logger.event(
+                "active_collection_changed",
+                collection=self.collection_name,
+                active_collection=active_collection,
+            )
+
+    def current_collection(self) -> str:
+        """
+        Returns the physical collection serving this logical one, following a
+        reindex swap made since the last call.
+
+        Returns:
+            str: The active collection generation.
+        """
+        self._follow_alias()
+        return self.active_collection
+
+    def index_version(self) -> str:
+        """
+        Identifies the current state of the index, including writes made by
+        other processes (the ingest CLI, other API workers).
+
+        Returns:
+            str: The active collection generation and its facet index version.
+        """
+        return f"{self.current_collection()}@{self.facets.version()}"
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Holds the index write lock and catches up with other processes' writes.
+
+        Follows a swap made elsewhere and re-reads the facet and near-duplicate
+        indexes if another process saved them, so this write extends their
+        latest state instead of overwriting it.
+
+        Raises:
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        with get_index_write_lock().hold():
+            self._follow_alias(force=True)
+            self.facets.refresh()
+            if self.dedup is not None:
+                self.dedup.refresh(force=True)
+            yield
+
+    def chunking_settings(self) -> Dict[str, Any]:
+        """
+        Returns the settings this instance splits documents with, as recorded per collection.
+
+        Returns:
+            Dict[str, Any]: The 'embedding_model', 'unit', 'chunk_size' and 'chunk_overlap'.
+        """
+        return {
+            "embedding_model": self.embedding_model_name,
+            **{key: self.chunking[key] for key in BOUNDARY_SETTINGS},
+        }
+
+    def recorded_chunking(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the settings the collection's stored chunks were split with.
+
+        Returns:
+            Optional[Dict[str, Any]]: See chunking_settings(); the original character
+                                      settings for a collection indexed before they were
+                                      recorded, or None for an empty one.
+        """
+        if self.facets.chunking is not None:
+            return self.facets.chunking
+        if self.store.count() == 0:
+            return None
+        return {
+            "embedding_model": self.embedding_model_name,
+            "unit": "chars",
+            "chunk_size": CHAR_CHUNK_SIZE,
+            "chunk_overlap": CHAR_CHUNK_OVERLAP,
+        }
+
+    def check_chunking(self):
+        """
+        Makes sure new chunks are split the way the collection's stored ones were.
+
+        Chunk IDs are '<doc>_chunk_<i>', so a document chunked with other
+        settings would skip the IDs already stored and end up with a mix of old
+        and new boundaries. The settings are recorded in the facet index when a
+        collection gets its first chunks. Collections indexed before they were
+        recorded are taken to use the original character-based chunks.
+
+        Raises:
+            ValueError: If the collection was chunked with other settings; only a
+                        reindex into a new generation can change them. Also if
+                        chunks are configured in tokens but the tokenizer could not
+                        be loaded, so the fallback is never recorded for a collection.
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        if self.chunking["fallback"]:
+            raise ValueError(
+                f"Chunks are sized in tokens, but the tokenizer or sequence limit of "
+                f"{self.embedding_model_name} could not be loaded; make the model available "
+                f"(e.g. download it once while online) or set CHUNK_LENGTH_UNIT=chars"
+            )
+        with self._writing():
+            self._ensure_facets()
+            settings = self.chunking_settings()
+            recorded = self.recorded_chunking()
+            if recorded is not None and recorded != settings:
+                self.logger.event(
+                    "chunking_mismatch",
+                    collection=self.active_collection,
+                    recorded=recorded,
+                    configured=settings,
+                )
+                raise ValueError(
+                    f"Collection {self.active_collection} was chunked with {recorded}, but this "
+                    f"instance chunks with {settings}; rebuild it with scripts/reindex.py "
+                    f"(or POST /ingest?mode=reindex) to apply the new settings"
+                )
+
+            if self.facets.chunking is None:
+                self.facets.chunking = settings
+                self.facets.save()
+
+    def _iter_chunks(self, doc: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Splits a document into chunks, streaming over its segments if it has any.
+
+        Documents either carry their full 'text' or a 'segments' iterable of
+        {'text', 'pages'} dicts, where 'pages' lists (char offset, page number)
+        pairs. For segmented documents each chunk's metadata gets the page_start
+        and page_end it spans. Documents already split by prepare_document()
+        carry their 'chunks' directly.
+
+        Args:
+            doc (Dict[str, Any]): The document to split.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: Each chunk and its metadata.
+        """
+        metadata = doc.get("metadata", {})
+
+        if "chunks" in doc:
+            yield from doc["chunks"]
+            return
+
+        if "segments" not in doc:
+            for chunk in self.splitter.split_text(doc["text"]):
+                yield chunk, metadata
+            return
+
+        for segment in doc["segments"]:
+            text = segment["text"]
+            page_offsets = [offset for offset, _ in segment["pages"]]
+            page_numbers = [page for _, page in segment["pages"]]
+
+            search_from = 0
+            for chunk in self.splitter.split_text(text):
+                start = text.find(chunk, search_from)
+                if start < 0:
+                    start = search_from
+                search_from = start + 1
+
+                first = bisect.bisect_right(page_offsets, start) - 1
+                last = bisect.bisect_right(page_offsets, start + len(chunk) - 1) - 1
+                yield chunk, {
+                    **metadata,
+                    "page_start": page_numbers[max(first, 0)],
+                    "page_end": page_numbers[max(last, 0)],
+                }
+
+    def prepare_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Splits a document into chunks ahead of add_documents().
+
+        Lets ingestion workers parse and chunk files in parallel while the main
+        thread embeds. The returned document holds its chunks in memory.
+
+        Args:
+            doc (Dict[str, Any]): The document to split.
+
+        Returns:
+            Dict[str, Any]: The document with 'chunks' instead of 'text' or 'segments'.
+        """
+        prepared = {key: value for key, value in doc.items() if key not in ("text", "segments")}
+        prepared["chunks"] = list(self._iter_chunks(doc))
+        return prepared
+
     def add_documents(self, documents: List[Dict[str, Any]], verbose: bool = False) -> int:
         """
         Chunks and inserts multiple documents into the vector database.
 
         This method is idempotent: it checks for existing chunk IDs before inserting
-        to avoid duplicates. It only generates embeddings for new chunks.
+        to avoid duplicates. It only generates embeddings for new chunks. Chunks are
+        embedded and stored in batches of EMBED_BATCH_SIZE as they are produced, so
+        streamed documents never need to be held in memory whole. When
+        near-duplicate detection is enabled, chunks whose text nearly matches an
+        already stored chunk are linked to it instead of being embedded.
 
         Args:
             documents (List[Dict[str, Any]]): A list of dictionaries, where each dict
-                contains 'id' (filename), 'text' (content), and 'metadata'.
+                contains 'id' (filename), 'metadata' and either 'text' (content),
+                'segments' (streamed page groups) or 'chunks' (see _iter_chunks).
             verbose (bool): If True, prints progress details to the console.
 
         Returns:
             int: The total number of new chunks added to the collection.
+
+        Raises:
+            ValueError: If the collection was chunked with other settings (see check_chunking).
+            IndexWriteLocked: If another process is writing to the index.
         """
+        with self._writing():
+            return self._add_documents(documents, verbose)
 
+    def _add_documents(self, documents: List[Dict[str, Any]], verbose: bool) -> int:
+        """
+        Implements add_documents(); the caller holds the index write lock.
+        """
+        self.check_chunking()
+        started = time.perf_counter()
+        embed_store_before = self.stage_seconds["embed"] + self.stage_seconds["store"]
         total_chunks_added = 0
+        total_duplicates = 0
 
-        # 1️⃣ Fetch existing IDs once
-        existing_ids = set()
-        try:
-            existing = self.collection.get(include=[])
-            existing_ids = set(existing.get("ids", []))
-        except Exception:
-            # Collection may be empty
-            existing_ids = set()
+        # 1️⃣ Fetch existing IDs once (linked duplicates count as indexed)
+        stored_ids = self.store.get_ids()
+        existing_ids = set(stored_ids)
+        if self.dedup is not None:
+            if not stored_ids and self.dedup.ids:
+                # The collection was wiped without its near-duplicate index
+                self.facets.remove(self.dedup.remove_ids(list(self.dedup.ids)))
+            existing_ids.update(self.dedup.linked_ids())
 
         for doc in documents:
-            chunks = self.splitter.split_text(doc["text"])
-            num_chunks = len(chunks)
-
-            ids = [f"{doc['id']}_chunk_{i}" for i in range(num_chunks)]
-            metadatas = [doc.get("metadata", {}) for _ in chunks]
-
-            # 2️⃣ Filter only NEW chunks
             new_chunks = []
             new_ids = []
             new_metas = []
-
-            for i, chunk_id in enumerate(ids):
-                if chunk_id not in existing_ids:
-                    new_chunks.append(chunks[i])
-                    new_ids.append(chunk_id)
-                    new_metas.append(metadatas[i])
-                elif verbose:
-                    print(f"  ⏭️  Chunk {i+1}/{num_chunks} already exists, skipping.")
-
-            if not new_chunks:
-                continue
-
-            # 3️⃣ Embed only NEW chunks
-            if verbose:
-                print(f"  🏗️  Indexing {len(new_chunks)} new chunks for {doc['id']}...")
-            
-            embeddings = self.embeddings.embed_documents(new_chunks)
-
-            # 4️⃣ Add to Chroma
-            for i, (chunk, chunk_id, meta, embedding) in enumerate(zip(new_chunks, new_ids, new_metas, embeddings)):
-                if verbose:
-                    # Find original chunk index for logging
-                    orig_idx = int(chunk_id.split("_")[-1]) + 1
-                    print(f"    ✅ Chunk {orig_idx}/{num_chunks} indexed.")
-                
-                self.collection.add(
-                    documents=[chunk],
-                    embeddings=[embedding],
-                    metadatas=[meta],
-                    ids=[chunk_id],
+            doc_chunks_added = 0
+
+            # 2️⃣ Filter only NEW chunks, flushing full batches as we go
+            for i, (chunk, meta) in enumerate(self._iter_chunks(doc)):
+                chunk_id = f"{doc['id']}_chunk_{i}"
+                if chunk_id in existing_ids:
+                    if verbose:
+                        print(f"  ⏭️  Chunk {i+1} already exists, skipping.")
+                    continue
+
+                if self.dedup is not None:
+                    signature = self.dedup.signature(chunk)
+                    canonical_id = self.dedup.find_duplicate(signature, chunk_id, stored_ids)
+                    if canonical_id is not None:
+                        self.dedup.link(chunk_id, canonical_id, meta)
+                        # Counted like a stored chunk, since filters can find it
+                        self.facets.add([meta])
+                        total_duplicates += 1
+                        if verbose:
+                            print(f"  🔗 Chunk {i+1} duplicates {canonical_id}, linked.")
+                        continue
+                    self.dedup.add(chunk_id, signature, meta.get("path", ""))
+                    # Stored with this batch, so later chunks may link to it
+                    stored_ids.add(chunk_id)
+
+                new_chunks.append(chunk)
+                new_ids.append(chunk_id)
+                new_metas.append(meta)
+
+                if len(new_chunks) >= self.embed_batch_size:
+                    doc_chunks_added += self._embed_and_store(
+                        doc["id"], new_chunks, new_ids, new_metas, verbose
+                    )
+                    new_chunks, new_ids, new_metas = [], [], []
+
+            if new_chunks:
+                doc_chunks_added += self._embed_and_store(
+                    doc["id"], new_chunks, new_ids, new_metas, verbose
                 )
 
-            total_chunks_added += len(new_chunks)
-            existing_ids.update(new_ids)
+            total_chunks_added += doc_chunks_added
+
+        if self.dedup is not None:
+            self.dedup.save()
+        self.facets.save()
+
+        # Whatever was not embedding or storing was splitting and dedup
+        embed_store = self.stage_seconds["embed"] + self.stage_seconds["store"] - embed_store_before
+        self.stage_seconds["chunk"] += time.perf_counter() - started - embed_store
 
         self.logger.event(
             "documents_indexed",
             documents=len(documents),
             chunks_added=total_chunks_added,
+            duplicates_linked=total_duplicates,
         )
 
         return total_chunks_added
 
-    def search(self, query: str, n_results: int = 3, session_id: str | None = None) -> Dict[str, Any]:
+    def _embed_and_store(
+        self,
+        doc_id: str,
+        chunks: List[str],
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        verbose: bool = False,
+    ) -> int:
+        """
+        Embeds a batch of new chunks and adds them to the collection.
+
+        Args:
+            doc_id (str): The document the chunks belong to, for progress output.
+            chunks (List[str]): The chunk texts.
+            ids (List[str]): The chunk IDs.
+            metadatas (List[Dict[str, Any]]): The chunk metadata.
+            verbose (bool): If True, prints progress details to the console.
+
+        Returns:
+            int: The number of chunks stored.
+        """
+        # 3️⃣ Embed only NEW chunks
+        if verbose:
+            print(f"  🏗️  Indexing {len(chunks)} new chunks for {doc_id}...")
+
+        started = time.perf_counter()
+        try:
+            embeddings = self.embeddings.embed_documents(chunks)
+            embedded = time.perf_counter()
+
+            # 4️⃣ Add to the vector store
+            self.store.add(
+                documents=chunks,
+                embeddings=embeddings,
+                metadatas=metadatas,
+                ids=ids,
+            )
+        except Exception:
+            # Never stored, so later near-duplicates must not link to them
+            if self.dedup is not None:
+                self.facets.remove(self.dedup.remove_ids(ids))
+            raise
+        self.facets.add(metadatas)
+        self.stage_seconds["embed"] += embedded - started
+        self.stage_seconds["store"] += time.perf_counter() - embedded
+
+        if verbose:
+            for chunk_id in ids:
+                # Original chunk index for logging
+                orig_idx = int(chunk_id.split("_")[-1]) + 1
+                print(f"    ✅ Chunk {orig_idx} indexed.")
+
+        return len(chunks)
+
+    def delete_by_path(self, path: str) -> Set[str]:
+        """
+        Removes every chunk that was indexed from the given source file.
+
+        Args:
+            path (str): The 'path' metadata value recorded at ingestion time.
+
+        Returns:
+            Set[str]: Paths of other files whose duplicate chunks were linked to the
+                      removed chunks and must be re-indexed to stay searchable.
+
+        Raises:
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        with self._writing():
+            self.store.delete(where={"path": path})
+            self.facets.remove_path(path)
+            self.facets.save()
+
+            orphaned = set()
+            if self.dedup is not None:
+                orphaned = self.dedup.remove_path(path)
+                self.dedup.save()
+
+        self.logger.event(
+            "document_deleted",
+            path=path,
+            orphaned_duplicates=sorted(orphaned),
+        )
+        return orphaned
+
+    def export_snapshot(self, path: str, dtype: str = "float32") -> Dict[str, Any]:
+        """
+        Exports all chunks, vectors and metadata to a portable snapshot directory.
+
+        Args:
+            path (str): The snapshot directory to create.
+            dtype (str): 'float32' or 'float16' for the stored vectors.
+
+        Returns:
+            Dict[str, Any]: The snapshot manifest.
+        """
+        self._follow_alias()
+        return snapshot.export_snapshot(self, path, dtype=dtype)
+
+    def import_snapshot(self, path: str, force: bool = False) -> int:
+        """
+        Loads a snapshot into the vector store without re-embedding any text.
+
+        Args:
+            path (str): The snapshot directory.
+            force (bool): Import even if the snapshot used a different embedding model
+                          or chunking settings.
+
+        Returns:
+            int: The number of chunks imported.
+
+        Raises:
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        with self._writing():
+            imported = snapshot.import_snapshot(self, path, force=force)
+            if imported:
+                self.facets.rebuild(self.store.iter_batches(), self._linked_metadata())
+        return imported
+
+    def verify(self, sample_size: int = 5) -> Dict[str, Any]:
+        """
+        Sanity-checks a collection before it is put into service.
+
+        Samples stored chunks and searches for each one's own text, which should
+        return that chunk among the top results of a healthy index.
+
+        Args:
+            sample_size (int): Number of chunks to probe.
+
+        Returns:
+            Dict[str, Any]: The chunk 'count' and 'self_recall' (fraction of probes
+                            that found themselves in the top 3).
+        """
+        count = self.store.count()
+        if count == 0:
+            return {"count": 0, "self_recall": 0.0}
+
+        batch = next(self.store.iter_batches(batch_size=1000))
+        probes = random.sample(range(len(batch["ids"])), min(sample_size, len(batch["ids"])))
+        query_embeddings = self.embeddings.embed_documents([batch["documents"][i] for i in probes])
+        results = self.store.query(query_embeddings=query_embeddings, n_results=3)
+
+        hits = sum(
+            batch["ids"][i] in found for i, found in zip(probes, results["ids"])
+        )
+        return {"count": count, "self_recall": hits / len(probes)}
+
+    def drop_collection(self, collection_name: str):
+        """
+        Deletes a physical collection and its near-duplicate index.
+
+        Args:
+            collection_name (str): The physical collection to delete.
+
+        Raises:
+            IndexWriteLocked: If another process is writing to the index.
+        """
+        with get_index_write_lock().hold():
+            drop_vector_store(collection_name)
+            drop_near_duplicate_index(dedup_index_path(collection_name))
+            drop_facet_index(facet_index_path(collection_name))
+        self.logger.event("collection_dropped", collection=collection_name)
+
+    def close(self):
+        """
+        Releases the process-wide store and near-duplicate index instances.
+
+        The data stays on disk. Only call this when no other VectorDB uses the
+        same collection, e.g. when a tenant's handle is evicted.
+        """
+        release_vector_store(self.active_collection, self.store.name)
+        if self.dedup is not None:
+            release_near_duplicate_index(dedup_index_path(self.active_collection))
+        release_facet_index(facet_index_path(self.active_collection))
+        self.logger.event("vectordb_closed", collection=self.collection_name)
+
+    def facet_counts(self) -> Dict[str, Any]:
+        """
+        Returns the available filter values and their chunk counts.
+
+        Returns:
+            Dict[str, Any]: See FacetIndex.counts().
+        """
+        self._follow_alias()
+        self._ensure_facets()
+        return self.facets.counts()
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embeds several search queries in one model call where possible.
+
+        Args:
+            queries (List[str]): The queries to embed.
+
+        Returns:
+            List[List[float]]: One embedding per query.
+        """
+        if len(queries) == 1 or getattr(self.embeddings, "query_encode_kwargs", None):
+            # Models with query-specific prompts must embed queries one by one
+            return [self.embeddings.embed_query(q) for q in queries]
+        return self.embeddings.embed_documents(queries)
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 3,
+        session_id: str | None = None,
+        query_embedding: Optional[List[float]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """
         Performs a semantic search to find the most relevant document chunks.
 
@@ -177,24 +743,88 @@ class VectorDB:
             query (str): The search query (user's question).
             n_results (int): The number of top results to return.
             session_id (str, optional): The session ID for logging.
+            query_embedding (List[float], optional): The query's embedding, if already computed.
+            filters (Dict[str, Any], optional): Metadata filters (see facets.build_where).
 
         Returns:
-            Dict[str, Any]: A dictionary containing lists of 'documents',
-                            'metadatas', and 'distances' for the top matches.
+            Dict[str, Any]: A dictionary containing lists of 'ids', 'documents',
+                            'metadatas', and 'distances' for the top matches. Metadata
+                            of chunks with linked near-duplicates gets a
+                            'duplicate_sources' list.
         """
-        self.logger.event(
-            "search_initiated",
+        return self.search_batch(
+            [query],
+            n_results=n_results,
             session_id=session_id,
-            query=query[:100] + ("..." if len(query) > 100 else ""),
-        )
+            query_embeddings=[query_embedding] if query_embedding is not None else None,
+            filters=filters,
+        )[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        session_id: str | None = None,
+        timings: Optional[Dict[str, float]] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Searches for several queries with one embedding pass and one store query.
+
+        Filters are pushed down into the store query as a 'where' clause, so only
+        matching chunks are scored; a path prefix is resolved into the matching
+        paths through the facet index. Chunks linked as near-duplicates are not
+        stored, so they are matched against the filter here (see _add_linked_matches).
+
+        Args:
+            queries (List[str]): The search queries.
+            n_results (int): The number of top results to return per query.
+            session_id (str, optional): The session ID for logging.
+            timings (Dict[str, float], optional): Filled with 'embed_ms' and 'query_ms'.
+            query_embeddings (List[List[float]], optional): The queries' embeddings, if
+                                                            already computed (see embed_queries).
+            filters (Dict[str, Any], optional): Metadata filters applied to every query.
+
+        Returns:
+            List[Dict[str, Any]]: One search() result per query, in order.
+        """
+        self._follow_alias()
+        if filters and filters.get("path_prefix"):
+            self._ensure_facets()
+        where = build_where(filters, self.facets)
+        if len(queries) == 1:
+            query = queries[0]
+            self.logger.event(
+                "search_initiated",
+                session_id=session_id,
+                query=query[:100] + ("..." if len(query) > 100 else ""),
+                where=where,
+            )
+        else:
+            self.logger.event("search_initiated", session_id=session_id, queries=len(queries), where=where)
 
-        query_embedding = self.embeddings.embed_query(query)
+        if matches_nothing(where):
+            self.logger.event("search_completed", session_id=session_id, results_count=0)
+            return [{"ids": [], "documents": [], "metadatas": [], "distances": []} for _ in queries]
 
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
+        started = time.perf_counter()
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        embedded = time.perf_counter()
+
+        results = self.store.query(
+            query_embeddings=query_embeddings,
             n_results=n_results,
-            include=["documents", "metadatas", "distances"],
+            where=where,
         )
+        if where and self.dedup is not None:
+            results = self._add_linked_matches(results, where, query_embeddings, n_results)
+        queried = time.perf_counter()
+
+        if timings is not None:
+            timings["embed_ms"] = round((embedded - started) * 1000, 2)
+            timings["query_ms"] = round((queried - embedded) * 1000, 2)
 
         if not results or not results.get("documents"):
             self.logger.event(
@@ -202,16 +832,106 @@ class VectorDB:
                 session_id=session_id,
                 results_count=0,
             )
-            return {"documents": [], "metadatas": [], "distances": []}
+            return [{"ids": [], "documents": [], "metadatas": [], "distances": []} for _ in queries]
 
         self.logger.event(
             "search_completed",
             session_id=session_id,
-            results_count=len(results["documents"][0]),
+            results_count=sum(len(docs) for docs in results["documents"]),
         )
 
-        return {
-            "documents": results["documents"][0],
-            "metadatas": results["metadatas"][0],
-            "distances": results["distances"][0],
-        }
\ No newline at end of file
+        duplicates = {}
+        if self.dedup is not None:
+            # Links saved by a writer in another process
+            self.dedup.refresh()
+            if self.dedup.links:
+                duplicates = self.dedup.duplicates_of([i for ids in results["ids"] for i in ids])
+
+        batch = []
+        for q in range(len(queries)):
+            ids = results["ids"][q]
+            metadatas = [
+                {
+                    **meta,
+                    "duplicate_sources": sorted({d["source"] for d in duplicates[chunk_id]}),
+                } if chunk_id in duplicates and "duplicate_sources" not in meta else meta
+                for chunk_id, meta in zip(ids, results["metadatas"][q])
+            ]
+            batch.append({
+                "ids": ids,
+                "documents": results["documents"][q],
+                "metadatas": metadatas,
+                "distances": results["distances"][q],
+            })
+
+        return batch
+
+    def _add_linked_matches(
+        self,
+        results: Dict[str, List[List[Any]]],
+        where: Dict[str, Any],
+        query_embeddings: List[List[float]],
+        n_results: int,
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Merges in chunks whose stored copy misses the filter but a linked
+        near-duplicate matches it, e.g. a PDF whose text was first ingested as
+        markdown under a type=pdf filter.
+
+        The canonical chunks are scored against the queries here and reported
+        with the matching duplicate's metadata.
+
+        Args:
+            results (Dict[str, List[List[Any]]]): The filtered store query results.
+            where (Dict[str, Any]): The 'where' clause of the query.
+            query_embeddings (List[List[float]]): The queries' embeddings.
+            n_results (int): The number of top results to keep per query.
+
+        Returns:
+            Dict[str, List[List[Any]]]: The merged results, closest first.
+        """
+        # Links saved by a writer in another process
+        self.dedup.refresh()
+        matching = self.dedup.canonicals_matching(where)
+        if not matching:
+            return results
+        found = self.store.get(list(matching))
+        if not found["ids"]:
+            return results
+
+        duplicates = self.dedup.duplicates_of(found["ids"])
+        linked = []
+        for chunk_id, document, canonical_meta in zip(found["ids"], found["documents"], found["metadatas"]):
+            meta = matching[chunk_id]
+            sources = {canonical_meta["source"]} | {d["source"] for d in duplicates.get(chunk_id, ())}
+            sources.discard(meta["source"])
+            linked.append((chunk_id, document, {**meta, "duplicate_sources": sorted(sources)}))
+
+        # Squared L2, like the stores report
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        vectors = found["embeddings"]
+        distances = (
+            np.einsum("ij,ij->i", queries, queries)[:, None]
+            + np.einsum("ij,ij->i", vectors, vectors)[None, :]
+            - 2.0 * (queries @ vectors.T)
+        )
+
+        merged = {key: [] for key in ("ids", "documents", "metadatas", "distances")}
+        for q in range(len(queries)):
+            hits = {}
+            if results and results.get("documents"):
+                for chunk_id, document, meta, distance in zip(
+                    results["ids"][q], results["documents"][q], results["metadatas"][q], results["distances"][q]
+                ):
+                    hits[chunk_id] = (distance, document, meta)
+            for row, (chunk_id, document, meta) in enumerate(linked):
+                # A stored copy that matches the filter itself keeps its own metadata
+                if chunk_id not in hits:
+                    hits[chunk_id] = (max(float(distances[q, row]), 0.0), document, meta)
+
+            best = sorted(hits.items(), key=lambda hit: hit[1][0])[:n_results]
+            merged["ids"].append([chunk_id for chunk_id, _ in best])
+            merged["documents"].append([document for _, (_, document, _) in best])
+            merged["metadatas"].append([meta for _, (_, _, meta) in best])
+            merged["distances"].append([distance for _, (distance, _, _) in best])
+        return merged
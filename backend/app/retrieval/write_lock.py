@@ -0,0 +1,141 @@
+"""
+Cross-process write lock for the RAG Assistant's index files.
+
+Besides the vectors themselves, an index has state in local files: the alias
+map (INDEX_ALIAS_PATH) and each collection's facet and near-duplicate indexes
+(FACET_INDEX_PATH, DEDUP_INDEX_PATH). Every process keeps them in memory and
+rewrites them whole, so two processes writing at once (API replicas sharing a
+Chroma server, or the ingest CLI next to a running server) would silently drop
+each other's updates.
+
+Every write to an index (adding and deleting documents, importing snapshots,
+swapping, rolling back and dropping generations) therefore holds this lock,
+an exclusive flock() on INDEX_WRITE_LOCK_PATH, and re-reads the shared files
+after taking it. Within one process the lock is re-entrant and writers simply
+queue; a process that cannot take it from another one within
+INDEX_WRITE_LOCK_TIMEOUT seconds is refused with IndexWriteLocked.
+
+Replicas on several hosts must keep the lock and index files on a shared
+filesystem that supports flock() (e.g. NFSv4). Without fcntl (Windows) only
+writers within one process are serialized.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_write_lock: Optional["IndexWriteLock"] = None
+_write_lock_guard = threading.Lock()
+
+
+class IndexWriteLocked(RuntimeError):
+    """
+    Raised when another process keeps writing to the index past the lock timeout.
+    """
+
+
+class IndexWriteLock:
+    """
+    A re-entrant lock serializing index writes across threads and processes.
+
+    Attributes:
+        path (str): The lock file (INDEX_WRITE_LOCK_PATH).
+        timeout (float): Seconds to wait for another process (INDEX_WRITE_LOCK_TIMEOUT).
+        lock (threading.RLock): Serializes writers within this process.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Configures the lock; the lock file is opened on first use.
+
+        Args:
+            path (str, optional): The lock file, defaults to INDEX_WRITE_LOCK_PATH.
+            timeout (float, optional): Seconds to wait for another process, defaults
+                                       to INDEX_WRITE_LOCK_TIMEOUT.
+        """
+        self.path = path or os.getenv("INDEX_WRITE_LOCK_PATH", "./backend/index_write.lock")
+        self.timeout = timeout if timeout is not None else float(
+            os.getenv("INDEX_WRITE_LOCK_TIMEOUT", "30")
+        )
+        self.lock = threading.RLock()
+        self._depth = 0
+        self._file: Optional[IO[str]] = None
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """
+        Holds the lock for the duration of the block.
+
+        Nested holds in the same thread are free; the lock file is released when
+        the outermost one exits.
+
+        Raises:
+            IndexWriteLocked: If another process held the lock for longer than the timeout.
+        """
+        with self.lock:
+            if self._depth == 0:
+                self._file = self._acquire_file()
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and self._file is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_UN)
+                    self._file.close()
+                    self._file = None
+
+    def _acquire_file(self) -> Optional[IO[str]]:
+        """
+        Takes the exclusive flock() on the lock file, polling until the timeout.
+        """
+        if fcntl is None:
+            return None
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        lock_file = open(self.path, "a+", encoding="utf-8")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    lock_file.seek(0)
+                    holder = lock_file.read().strip() or "unknown"
+                    lock_file.close()
+                    raise IndexWriteLocked(
+                        f"Another process (pid {holder}) is writing to the index; "
+                        f"gave up after {self.timeout:g}s"
+                    )
+                time.sleep(0.1)
+
+        # Record the holder for the error message of processes that wait on it
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        return lock_file
+
+
+def get_index_write_lock() -> IndexWriteLock:
+    """
+    Returns the process-wide index write lock.
+
+    Returns:
+        IndexWriteLock: The shared lock.
+    """
+    global _write_lock
+    with _write_lock_guard:
+        if _write_lock is None:
+            _write_lock = IndexWriteLock()
+        return _write_lock
@@ -3,8 +3,26 @@ const API_BASE = "http://localhost:8000";
 let allSessions = [];
 let currentSessionId = null;
 let currentSessionLogs = [];
+let debugFiltered = false;
+let logStream = null;
+
+// Live log tail (Server-Sent Events); only new lines are sent by the backend
+function openLogStream(params, onEntry) {
+    closeLogStream();
+    const query = new URLSearchParams(params).toString();
+    logStream = new EventSource(`${API_BASE}/logs/stream${query ? `?${query}` : ''}`);
+    logStream.onmessage = (message) => onEntry(JSON.parse(message.data));
+}
+
+function closeLogStream() {
+    if (logStream) {
+        logStream.close();
+        logStream = null;
+    }
+}
 
 function showView(viewName) {
+    closeLogStream();
     document.querySelectorAll('.view').forEach(v => v.classList.remove('active'));
     document.querySelectorAll('.nav-item').forEach(v => v.classList.remove('active'));
 
@@ -25,17 +43,18 @@ async function loadSessions() {
     try {
         const response = await fetch(`${API_BASE}/logs/sessions`);
         allSessions = await response.json();
-        renderSessions(allSessions);
+        filterSessions();
+        openLogStream({}, updateSessionFromLog);
     } catch (error) {
         console.error("Error loading sessions:", error);
-        tbody.innerHTML = `<tr><td colspan="4" style="text-align:center; color:red;">Error loading sessions. Make sure backend is running.</td></tr>`;
+        tbody.innerHTML = `<tr><td colspan="5" style="text-align:center; color:red;">Error loading sessions. Make sure backend is running.</td></tr>`;
     }
 }
 
 function renderSessions(sessions) {
     const tbody = document.getElementById('sessions-body');
     if (sessions.length === 0) {
-        tbody.innerHTML = `<tr><td colspan="4" style="text-align:center;">No sessions found.</td></tr>`;
+        tbody.innerHTML = `<tr><td colspan="5" style="text-align:center;">No sessions found.</td></tr>`;
         return;
     }
 
@@ -45,10 +64,53 @@ function renderSessions(sessions) {
       <td>${formatDate(s.start_time)}</td>
       <td>${formatDate(s.last_activity)}</td>
       <td><span class="badge">${s.event_count}</span></td>
+      <td>${formatTokens(s)}</td>
     </tr>
   `).join('');
 }
 
+function formatTokens(usage) {
+    if (!usage.prompt_tokens && !usage.completion_tokens) return '-';
+    const cost = usage.cost_usd ? ` ($${usage.cost_usd.toFixed(4)})` : '';
+    return `${usage.prompt_tokens} / ${usage.completion_tokens}${cost}`;
+}
+
+function addUsage(usage, entry) {
+    if (entry.event !== 'llm_usage') return;
+    usage.prompt_tokens += entry.prompt_tokens || 0;
+    usage.completion_tokens += entry.completion_tokens || 0;
+    usage.cost_usd += entry.cost_usd || 0;
+}
+
+function renderSessionUsage(logs) {
+    const usage = { prompt_tokens: 0, completion_tokens: 0, cost_usd: 0 };
+    logs.forEach(log => addUsage(usage, log));
+    document.getElementById('detail-usage').innerText = `Tokens (in / out): ${formatTokens(usage)}`;
+}
+
+function updateSessionFromLog(entry) {
+    if (!entry.session_id) return;
+
+    let session = allSessions.find(s => s.session_id === entry.session_id);
+    if (!session) {
+        session = {
+            session_id: entry.session_id,
+            start_time: entry.timestamp,
+            event_count: 0,
+            prompt_tokens: 0,
+            completion_tokens: 0,
+            cost_usd: 0,
+        };
+        allSessions.push(session);
+    }
+    session.last_activity = entry.timestamp;
+    session.event_count += 1;
+    addUsage(session, entry);
+
+    allSessions.sort((a, b) => (a.last_activity < b.last_activity ? 1 : -1));
+    filterSessions();
+}
+
 function filterSessions() {
     const query = document.getElementById('session-search').value.toLowerCase();
     const filtered = allSessions.filter(s => s.session_id.toLowerCase().includes(query));
@@ -59,6 +121,7 @@ async function openSession(sessionId) {
     currentSessionId = sessionId;
     showView('detail');
     document.getElementById('detail-session-id').innerText = `Session: ${sessionId}`;
+    document.getElementById('detail-usage').innerText = "";
 
     const chatMessages = document.getElementById('chat-messages');
     const debugEvents = document.getElementById('debug-events');
@@ -70,9 +133,18 @@ async function openSession(sessionId) {
         const response = await fetch(`${API_BASE}/logs/sessions/${sessionId}`);
         const data = await response.json();
         currentSessionLogs = data.logs;
+        debugFiltered = false;
 
         renderChatHistory(currentSessionLogs);
         renderDebugLogs(currentSessionLogs); // Show all logs initially
+        renderSessionUsage(currentSessionLogs);
+
+        openLogStream({ session_id: sessionId }, (entry) => {
+            currentSessionLogs.push(entry);
+            renderChatHistory(currentSessionLogs);
+            renderSessionUsage(currentSessionLogs);
+            if (!debugFiltered) renderDebugLogs(currentSessionLogs);
+        });
     } catch (error) {
         console.error("Error loading session details:", error);
         chatMessages.innerHTML = "Error loading history.";
@@ -134,6 +206,7 @@ function renderChatHistory(logs) {
 
 function filterLogs(start, end) {
     const filtered = currentSessionLogs.slice(start, end);
+    debugFiltered = true;
     renderDebugLogs(filtered);
     // Open the logs pane if it's hidden
     document.getElementById('debug-logs-pane').classList.remove('hidden');
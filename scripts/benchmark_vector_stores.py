@@ -0,0 +1,153 @@
+"""
+CLI script to benchmark the vector store backends against each other.
+
+This script fills the ChromaDB and NumPy backends (optionally with int8 or
+binary quantization) with the same random unit vectors, then reports build
+time, query latency (p50/p95), resident memory, the NumPy store's in-memory
+index size and recall@k against exact search. Each backend runs in its own process so memory
+numbers do not bleed into each other. No embedding model is loaded.
+
+Usage:
+    python scripts/benchmark_vector_stores.py --rows 100000 --dim 384 --queries 200
+    python scripts/benchmark_vector_stores.py --backends numpy:float32,numpy:float32:int8,numpy:float32:binary
+"""
+import os
+import warnings
+
+# Disable ChromaDB telemetry and suppress warnings
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+import numpy as np
+
+
+def rss_mb() -> float:
+    """
+    Returns the current resident set size of this process in MB.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    import resource
+    # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if peak > 1 << 30 else peak / 1024
+
+
+def make_data(rows: int, dim: int, queries: int, seed: int = 0):
+    """
+    Generates normalized random corpus and query vectors.
+    """
+    rng = np.random.default_rng(seed)
+    corpus = rng.standard_normal((rows, dim), dtype=np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    query = rng.standard_normal((queries, dim), dtype=np.float32)
+    query /= np.linalg.norm(query, axis=1, keepdims=True)
+    return corpus, query
+
+
+def run_backend(backend: str, args) -> dict:
+    """
+    Builds one backend and times its queries. Runs in a fresh worker process.
+    """
+    from app.retrieval.vector_store import ChromaVectorStore
+    from app.retrieval.numpy_store import NumpyVectorStore
+
+    corpus, queries = make_data(args.rows, args.dim, args.queries)
+    baseline_rss = rss_mb()
+
+    path = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    if backend == "chroma":
+        store = ChromaVectorStore(collection_name="bench", persist_path=path)
+    else:
+        _, dtype, *quantization = backend.split(":")
+        store = NumpyVectorStore(
+            path=path,
+            dtype=dtype,
+            quantization=quantization[0] if quantization else "none",
+        )
+
+    started = time.perf_counter()
+    for start in range(0, args.rows, args.batch):
+        end = min(start + args.batch, args.rows)
+        store.add(
+            ids=[str(i) for i in range(start, end)],
+            embeddings=corpus[start:end].tolist(),
+            documents=[f"chunk {i}" for i in range(start, end)],
+            metadatas=[{"source": f"doc{i % 100}"} for i in range(start, end)],
+        )
+    build_seconds = time.perf_counter() - started
+
+    latencies = []
+    found = []
+    for q in queries:
+        started = time.perf_counter()
+        result = store.query(query_embeddings=[q.tolist()], n_results=args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append([int(i) for i in result["ids"][0]])
+
+    # Exact ground truth
+    truth = np.argsort(-(queries @ corpus.T), axis=1)[:, :args.k]
+    recall = np.mean([
+        len(set(f) & set(t.tolist())) / args.k for f, t in zip(found, truth)
+    ])
+
+    return {
+        "backend": backend,
+        "build_s": build_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "rss_mb": rss_mb() - baseline_rss,
+        "index_mb": (
+            store.memory_usage()["resident_bytes"] / (1024 * 1024)
+            if hasattr(store, "memory_usage") else None
+        ),
+        "recall": float(recall),
+    }
+
+
+def main():
+    """
+    Parses arguments, runs each backend in a subprocess and prints a table.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark vector store backends.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument(
+        "--backends",
+        default="chroma,numpy:float32,numpy:float16,numpy:float32:int8,numpy:float32:binary",
+        help="Comma-separated list of chroma or numpy:<dtype>[:<int8|binary>]",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for backend in args.backends.split(","):
+        with multiprocessing.Pool(processes=1) as pool:
+            results.append(pool.apply(run_backend, (backend, args)))
+
+    print(f"{args.rows} rows x {args.dim} dims, {args.queries} queries, k={args.k}")
+    print(
+        f"{'backend':<24}{'build s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'RSS MB':>10}{'index MB':>10}{f'recall@{args.k}':>11}"
+    )
+    for r in results:
+        index_mb = f"{r['index_mb']:>10.1f}" if r["index_mb"] is not None else f"{'-':>10}"
+        print(
+            f"{r['backend']:<24}{r['build_s']:>10.2f}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['rss_mb']:>10.1f}{index_mb}{r['recall']:>11.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
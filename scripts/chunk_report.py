@@ -0,0 +1,74 @@
+"""
+CLI script to report chunks longer than the embedding model reads.
+
+The embedding model only embeds the first max_seq_length tokens of a chunk;
+the rest is stored and sent to the LLM but never searched. This script
+measures every chunk of the active collection with the model's tokenizer and
+reports how many are truncated and which files they come from. Chunks
+indexed before tokenizer-aware chunking are usually the culprits; a reindex
+re-splits them.
+
+Usage:
+    python scripts/chunk_report.py
+    python scripts/chunk_report.py --tenant acme --top 20
+"""
+import os
+import sys
+import warnings
+
+# Disable ChromaDB telemetry and suppress warnings
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+import argparse
+
+from app.core.tenants import parse_tenants, tenant_collection
+from app.retrieval.chunking import embedding_max_tokens, get_token_counter, load_tokenizer, truncation_report
+from app.retrieval.vectordb import VectorDB
+
+def main():
+    """
+    Measures the active collection's chunks and prints the truncation report.
+    """
+    parser = argparse.ArgumentParser(description="Report chunks truncated by the embedding model.")
+    parser.add_argument("--tenant", help="Report on this tenant's collection")
+    parser.add_argument("--top", type=int, default=10, help="Number of files to list")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks measured per tokenizer call")
+    args = parser.parse_args()
+
+    collection = None
+    if args.tenant:
+        try:
+            parse_tenants(args.tenant)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+        collection = tenant_collection(args.tenant)
+
+    # Only the tokenizer is needed, whatever unit chunks are currently sized in
+    vector_db = VectorDB(collection_name=collection, load_embeddings=False)
+    tokenizer = load_tokenizer(vector_db.embedding_model_name)
+    counter = get_token_counter(vector_db.embedding_model_name, tokenizer)
+    max_tokens = embedding_max_tokens(vector_db.embedding_model_name, tokenizer=tokenizer)
+    if counter is None or max_tokens is None:
+        sys.exit(f"❌ Could not load the tokenizer or sequence limit of {vector_db.embedding_model_name}")
+
+    limit = max_tokens - counter.special_tokens
+    report = truncation_report(vector_db.store.iter_batches(args.batch_size), counter, limit, top=args.top)
+
+    print(f"📚 Collection: {vector_db.active_collection}")
+    print(f"🔤 Model: {vector_db.embedding_model_name} (embeds {limit} content tokens)")
+    print(f"✂️  Current chunking: {vector_db.chunking['chunk_size']} {vector_db.chunking['unit']}, "
+          f"overlap {vector_db.chunking['chunk_overlap']}")
+    print(f"Chunks: {report['chunks']}")
+    print(f"Truncated: {report['truncated']} ({report['truncated_ratio']:.1%})")
+    print(f"Tokens never embedded: {report['tokens_not_embedded']} of {report['tokens']}")
+    print(f"Chunk length: p50 {report['p50_tokens']}, p95 {report['p95_tokens']}, max {report['max_tokens']} tokens")
+
+    if report["top_files"]:
+        print("Files with the most truncated chunks:")
+        for path, count in report["top_files"]:
+            print(f"  {count:6d}  {path}")
+        print("Run `PYTHONPATH=backend python scripts/reindex.py` to re-split them.")
+
+if __name__ == "__main__":
+    main()
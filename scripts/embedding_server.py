@@ -0,0 +1,65 @@
+"""
+Standalone embedding server for multi-worker deployments.
+
+This script loads the embedding model once and serves it over a Unix domain
+socket. API workers started with EMBEDDING_SERVER_SOCKET pointing at the same
+socket send their embedding requests here instead of loading their own copy
+of the model, and concurrent requests from all workers are batched together.
+
+Usage:
+    python scripts/embedding_server.py
+    python scripts/embedding_server.py --socket /tmp/rag-embed.sock --max-batch 256 --max-wait-ms 10
+"""
+import os
+import warnings
+
+# Disable ChromaDB telemetry and suppress warnings
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+import argparse
+
+from app.retrieval.embedding_server import EmbeddingServer
+from app.retrieval.vectordb import load_embedding_model
+
+def main():
+    """
+    Loads the embedding model and serves it until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="Serve the embedding model over a Unix socket.")
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("EMBEDDING_SERVER_SOCKET", "/tmp/rag-assistant-embed.sock"),
+        help="Unix socket to listen on (default: EMBEDDING_SERVER_SOCKET)",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        help="Maximum texts per model call (default: EMBEDDING_SERVER_MAX_BATCH or 128)",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        help="How long to wait for more requests to batch (default: EMBEDDING_SERVER_MAX_WAIT_MS or 5)",
+    )
+    args = parser.parse_args()
+
+    model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    embeddings, device = load_embedding_model(model_name)
+
+    server = EmbeddingServer(
+        socket_path=args.socket,
+        embeddings=embeddings,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+    )
+
+    print(f"🧠 Serving {model_name} on {device} at {args.socket} (Ctrl+C to stop)...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Embedding server stopped ({server.stats['requests']} requests, "
+              f"{server.stats['batches']} batches, {server.stats['texts']} texts)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+CLI script for zero-downtime reindexing.
+
+This script rebuilds the index into a new, versioned collection while the
+current one keeps serving, verifies it (chunk count and sampled self-retrieval),
+and swaps it in atomically. Running servers pick up the swap on their next
+request. The replaced collection is kept so the swap can be rolled back.
+
+Usage:
+    python scripts/reindex.py
+    python scripts/reindex.py --rollback
+"""
+import os
+import warnings
+
+# Disable ChromaDB telemetry and suppress warnings
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+import argparse
+
+from app.core.rag_engine import RAGEngine
+
+def main():
+    """
+    Rebuilds and swaps the index, or rolls back to the previous generation.
+    """
+    parser = argparse.ArgumentParser(description="Blue/green reindex of the vector store.")
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Switch back to the previous collection generation instead of rebuilding",
+    )
+    args = parser.parse_args()
+
+    rag = RAGEngine()
+
+    if args.rollback:
+        print(f"Rolled back. Active collection: {rag.rollback()}")
+        return
+
+    stats = rag.reindex()
+    verification = stats.get("verification", {})
+
+    print(f"Built collection: {stats['collection']}")
+    print(f"Documents processed: {stats['documents']}")
+    print(f"Chunks created: {stats['chunks']}")
+    if verification:
+        print(
+            f"Verification: {verification['count']} chunks "
+            f"(previous {verification['previous_count']}), "
+            f"self-recall {verification['self_recall']:.0%}"
+        )
+    print("Swapped in." if stats["swapped"] else "Not swapped; the current collection is still serving.")
+
+if __name__ == "__main__":
+    main()
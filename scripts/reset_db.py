@@ -1,26 +1,55 @@
 """
 CLI script to reset the vector database.
 
-This script deletes the persistence directory used by ChromaDB. This is useful
-when you want to wipe all indexed documents and start from scratch.
+This script deletes the persistence directory used by ChromaDB (or, with
+CHROMA_MODE=http, every collection on the Chroma server), the NumPy store, and
+the files describing the index: collection aliases, facet indexes and
+near-duplicate indexes. This is useful when you want to wipe all indexed
+documents and start from scratch.
 
 Usage:
     python scripts/reset_db.py
+    PYTHONPATH=backend python scripts/reset_db.py   # with CHROMA_MODE=http
 """
 import shutil
 import os
 
-CHROMA_PATH = "./backend/chroma_db"
+CHROMA_PATH = os.getenv("CHROMA_PATH", "./backend/chroma_db")
+NUMPY_STORE_PATH = os.getenv("NUMPY_STORE_PATH", "./backend/numpy_store")
+FACET_INDEX_PATH = os.getenv("FACET_INDEX_PATH", "./backend/facet_index")
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "./backend/dedup_index")
+INDEX_ALIAS_PATH = os.getenv("INDEX_ALIAS_PATH", "./backend/index_aliases.json")
 
 def main():
     """
-    Checks if the database directory exists and deletes it if it does.
+    Deletes the vector store and the index files that describe it.
     """
-    if os.path.exists(CHROMA_PATH):
+    if os.getenv("CHROMA_MODE", "embedded").lower() == "http":
+        from app.retrieval.chroma_http import get_chroma_http_client
+
+        client = get_chroma_http_client()
+        names = client.list_collections()
+        for name in names:
+            client.delete_collection(name=name)
+        print(f"Deleted {len(names)} collection(s) on the Chroma server.")
+    elif os.path.exists(CHROMA_PATH):
         shutil.rmtree(CHROMA_PATH)
         print("Chroma DB reset successfully.")
     else:
         print("Chroma DB does not exist.")
 
+    if os.path.exists(NUMPY_STORE_PATH):
+        shutil.rmtree(NUMPY_STORE_PATH)
+        print("NumPy store reset successfully.")
+
+    # These would otherwise describe chunks that no longer exist: stale
+    # near-duplicate rows would make new chunks link to themselves
+    for index_path in (FACET_INDEX_PATH, DEDUP_INDEX_PATH):
+        if os.path.exists(index_path):
+            shutil.rmtree(index_path)
+    # Aliases would point at deleted generations
+    if os.path.exists(INDEX_ALIAS_PATH):
+        os.remove(INDEX_ALIAS_PATH)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
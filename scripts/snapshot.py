@@ -0,0 +1,66 @@
+"""
+CLI script to export and import portable index snapshots.
+
+A snapshot holds every chunk's vector (as one contiguous array), text and
+metadata plus the ingest manifest. Importing one fills the configured vector
+store with a bulk memory-mapped read and no embedding, so a new replica can
+come up without copying 'backend/chroma_db' or re-running ingestion.
+
+Usage:
+    python scripts/snapshot.py export ./snapshots/2026-10-19 [--dtype float16]
+    python scripts/snapshot.py import ./snapshots/2026-10-19 [--force]
+"""
+import os
+import warnings
+
+# Disable ChromaDB telemetry and suppress warnings
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+import argparse
+import time
+
+from app.retrieval.vectordb import VectorDB
+
+def main():
+    """
+    Parses arguments and exports or imports a snapshot.
+    """
+    parser = argparse.ArgumentParser(description="Export or import index snapshots.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write the index to a snapshot")
+    export_parser.add_argument("path", help="Snapshot directory to create")
+    export_parser.add_argument(
+        "--dtype",
+        choices=["float32", "float16"],
+        default="float32",
+        help="Precision of the stored vectors",
+    )
+
+    import_parser = subparsers.add_parser("import", help="Load a snapshot into the index")
+    import_parser.add_argument("path", help="Snapshot directory to load")
+    import_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Import even if the snapshot used a different embedding model or chunking settings",
+    )
+
+    args = parser.parse_args()
+    # Snapshots move stored vectors, so the embedding model is never needed
+    vector_db = VectorDB(load_embeddings=False)
+    started = time.perf_counter()
+
+    if args.command == "export":
+        manifest = vector_db.export_snapshot(args.path, dtype=args.dtype)
+        print("Snapshot exported")
+        print(f"Chunks: {manifest['count']} from {len(manifest['sources'])} files")
+    else:
+        imported = vector_db.import_snapshot(args.path, force=args.force)
+        print("Snapshot imported")
+        print(f"Chunks: {imported}")
+
+    print(f"Took {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
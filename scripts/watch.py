@@ -0,0 +1,45 @@
+"""
+Standalone CLI script that watches the knowledge base and indexes changes.
+
+This script polls the 'knowledge_base/raw' directory and incrementally indexes
+files that are added, modified or deleted, without running the FastAPI server.
+Bursts of changes are debounced before indexing.
+
+Usage:
+    python scripts/watch.py
+"""
+import os
+import warnings
+
+# Disable ChromaDB telemetry and suppress warnings
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+import time
+
+from app.core.rag_engine import RAGEngine
+from app.core.watcher import KnowledgeBaseWatcher
+
+def main():
+    """
+    Initializes the RAG engine and polls the knowledge base until interrupted.
+    """
+    rag = RAGEngine()
+    watcher = KnowledgeBaseWatcher(rag)
+    watcher.snapshot = watcher.scan()
+
+    print(f"👀 Watching {len(watcher.snapshot)} files (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(watcher.interval)
+            stats = watcher.poll()
+            if stats:
+                print(
+                    f"Indexed {stats['documents']} documents "
+                    f"({stats['chunks']} chunks), removed {stats['deleted']}"
+                )
+    except KeyboardInterrupt:
+        print("Watcher stopped")
+
+if __name__ == "__main__":
+    main()